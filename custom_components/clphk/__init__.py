@@ -1,16 +1,24 @@
 import asyncio
 import base64
+import functools
 import logging
 
 import aiohttp
-import asyncio
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import padding
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
+from .clock import Clock
+from .metrics import Metrics
+from .tokens import TokenWriter
+from .services import async_setup_services
+from .websocket import async_setup_websocket
+from .transport import Payload, RecordingSession
 from .const import (
+    API_BASE_URL,
+    API_PATH_OTP_REQUEST,
+    API_PATH_OTP_VERIFY,
     CONF_CLP_PUBLIC_KEY,
     CONF_DOMAIN,
 )
@@ -29,45 +37,67 @@ API_DEFAULT_HEADERS = {
     "sec-ch-ua-platform": '"Linux"',
 }
 
-async def request_otp(session, email, timeout=30):
-    """Request OTP for an email address."""
-    url = "https://api.clp.com.hk/ts1/ms/profile/register/eligibilityCheckAndLogin"
-    public_key = serialization.load_pem_public_key(CONF_CLP_PUBLIC_KEY.encode())
-    json_payload = {
-        "email": base64.b64encode(public_key.encrypt(
-            email.encode("utf-8"),
+@functools.cache
+def _clp_public_key():
+    """Parse the CLP public key once; cryptography is only imported by the OTP login."""
+    from cryptography.hazmat.primitives import serialization
+
+    return serialization.load_pem_public_key(CONF_CLP_PUBLIC_KEY.encode())
+
+def encrypt_otp_request(email):
+    """Return the body of an OTP request, with the fields encrypted for CLP.
+
+    RSA-OAEP is CPU bound, run it in the executor.
+    """
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import padding
+
+    public_key = _clp_public_key()
+
+    def encrypt(value):
+        return base64.b64encode(public_key.encrypt(
+            value.encode("utf-8"),
             padding.OAEP(
                 mgf=padding.MGF1(algorithm=hashes.SHA256()),
                 algorithm=hashes.SHA256(),
                 label=None,
             ),
-        )).decode(),
+        )).decode()
+
+    return {
+        "email": encrypt(email),
         "phone": "",
-        "type": base64.b64encode(public_key.encrypt(
-            "email".encode("utf-8"),
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                algorithm=hashes.SHA256(),
-                label=None,
-            ),
-        )).decode(),
+        "type": encrypt("email"),
     }
+
+async def _post_json(session, url, json_payload):
+    """POST through ``session.request``, the one method the record and replay sessions provide."""
+    response = await session.request("POST", url, json=json_payload, headers=API_DEFAULT_HEADERS)
+    try:
+        response.raise_for_status()
+        return await response.json()
+    finally:
+        response.release()
+
+async def request_otp(session, email, timeout=30, base_url=API_BASE_URL):
+    """Request OTP for an email address."""
+    url = base_url + API_PATH_OTP_REQUEST
+    loop = asyncio.get_running_loop()
+    json_payload = await loop.run_in_executor(None, encrypt_otp_request, email)
     try:
         async with asyncio.timeout(timeout):
-            async with session.post(url, json=json_payload, headers=API_DEFAULT_HEADERS) as response:
-                response.raise_for_status()
-                data = await response.json()
-                if not data or "data" not in data:
-                    raise ValueError("Invalid OTP request response data")
-                _LOGGER.debug("OTP request response: %s", data)
-                return data["data"]
+            data = await _post_json(session, url, json_payload)
+            if not data or "data" not in data:
+                raise ValueError("Invalid OTP request response data")
+            _LOGGER.debug("OTP request response: %s", Payload(data))
+            return data["data"]
     except Exception as ex:
         _LOGGER.error("OTP request failed: %s", ex)
         raise
 
-async def verify_otp(session, email, otp, timeout=30):
+async def verify_otp(session, email, otp, timeout=30, base_url=API_BASE_URL):
     """Verify OTP and return token data or raise exception."""
-    url = "https://api.clp.com.hk/ts1/ms/profile/accountManagement/passwordlesslogin/otpverify"
+    url = base_url + API_PATH_OTP_VERIFY
     json_payload = {
         "type": "email",
         "email": email,
@@ -75,43 +105,94 @@ async def verify_otp(session, email, otp, timeout=30):
     }
     try:
         async with asyncio.timeout(timeout):
-            async with session.post(url, json=json_payload, headers=API_DEFAULT_HEADERS) as response:
-                response.raise_for_status()
-                data = await response.json()
-                if not data or 'data' not in data:
-                    raise ValueError('Invalid response data')
-                _LOGGER.debug(f"OTP verification response: {data}")
-                return data['data']
+            data = await _post_json(session, url, json_payload)
+            if not data or 'data' not in data:
+                raise ValueError('Invalid response data')
+            _LOGGER.debug("OTP verification response: %s", Payload(data))
+            return data['data']
     except Exception as ex:
         _LOGGER.error(f"OTP verification failed: {ex}")
         raise
 
 async def async_setup(hass: HomeAssistant, config: dict):
     session = async_get_clientsession(hass)
-    hass.data[CONF_DOMAIN] = {
-        "session": session
-    }
+    domain_data = hass.data.setdefault(CONF_DOMAIN, {})
+    domain_data["session"] = session
+    domain_data.setdefault("clock", Clock())
+
+    async_setup_services(hass)
+    async_setup_websocket(hass)
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry):
-    if CONF_DOMAIN not in hass.data:
-        session = async_get_clientsession(hass)
-        hass.data[CONF_DOMAIN] = {
-            "session": session,
-            "access_token": entry.data.get("access_token"),
-            "refresh_token": entry.data.get("refresh_token"),
-            "access_token_expiry_time": entry.data.get("access_token_expiry_time"),
-            "token_lock": asyncio.Lock(),
-        }
+    # Session, clock, request scheduler and endpoint health are shared; tokens belong to each entry
+    domain_data = hass.data.setdefault(CONF_DOMAIN, {})
+    domain_data.setdefault("session", async_get_clientsession(hass))
+    clock = domain_data.setdefault("clock", Clock())
+    domain_data.setdefault("entries", {})[entry.entry_id] = {
+        "session": domain_data["session"],
+        "access_token": entry.data.get("access_token"),
+        "refresh_token": entry.data.get("refresh_token"),
+        "access_token_expiry_time": entry.data.get("access_token_expiry_time"),
+        "metrics": Metrics(),
+        "token_writer": TokenWriter(hass, entry.entry_id, clock=clock),
+    }
+
+    @callback
+    def flush_tokens(event: Event):
+        entry_state = domain_data.get("entries", {}).get(entry.entry_id)
+        if entry_state:
+            entry_state["token_writer"].async_flush()
+
+    # Rotated tokens still waiting for the debounced write must not be lost on shutdown
+    entry.async_on_unload(hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, flush_tokens))
     await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
     return True
 
+async def async_migrate_entry(hass: HomeAssistant, entry):
+    """Migrate an entry from an older version."""
+    if entry.version > 1:
+        return False
+    if entry.minor_version < 2:
+        # Unique IDs of the main and renewable sensors were derived from their name, so two entries could clash
+        @callback
+        def migrate_unique_id(entity_entry: er.RegistryEntry):
+            for sensor_type in ("main", "renewable_energy"):
+                if entity_entry.unique_id.startswith(f"clphk_{sensor_type}_"):
+                    return {"new_unique_id": f"clphk_{entry.entry_id}_{sensor_type}"}
+            return None
+
+        await er.async_migrate_entries(hass, entry.entry_id, migrate_unique_id)
+        hass.config_entries.async_update_entry(entry, minor_version=2)
+    return True
+
 async def async_unload_entry(hass: HomeAssistant, entry):
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, ["sensor"])
     if unload_ok and CONF_DOMAIN in hass.data:
-        hass.data.pop(CONF_DOMAIN)
+        entries = hass.data[CONF_DOMAIN].get("entries", {})
+        # Retries, backfills and refreshes must not outlive the entities they update,
+        # and finish while the entry state they read is still there
+        if "tasks" in entries.get(entry.entry_id, {}):
+            await entries[entry.entry_id]["tasks"].async_cancel_all()
+        entry_state = entries.pop(entry.entry_id, None) or {}
+        if "auth" in entry_state:
+            await entry_state["auth"].async_stop()
+        if "token_writer" in entry_state:
+            entry_state["token_writer"].async_flush()
+        if "scheduler" in hass.data[CONF_DOMAIN]:
+            hass.data[CONF_DOMAIN]["scheduler"].remove_limits(entry.entry_id)
+        # An archive is closed once no entry left writes to it
+        in_use = {archive.path for state in entries.values() for archive in state.get("archives", {}).values()}
+        for archive in entry_state.get("archives", {}).values():
+            if archive.path not in in_use:
+                hass.data[CONF_DOMAIN].get("archives", {}).pop(archive.path, None)
+                await hass.async_add_executor_job(archive.close)
+        if isinstance(entry_state.get("session"), RecordingSession):
+            await entry_state["session"].async_close()
+        if not entries:
+            hass.data.pop(CONF_DOMAIN)
     return unload_ok
 
 async def async_reload_entry(hass: HomeAssistant, entry):
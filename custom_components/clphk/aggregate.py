@@ -0,0 +1,190 @@
+"""Roll-ups, percentiles, load-duration curves and heatmaps over a series archive.
+
+NumPy is used when it is installed (it is with most Home Assistant installs)
+and a pure Python implementation is used otherwise. Both return the same
+plain lists and dicts, ready for a service response.
+
+Hong Kong has no daylight saving time, so local time is epoch seconds plus a
+fixed ``utc_offset``.
+"""
+from __future__ import annotations
+
+import datetime
+import functools
+import math
+
+from .archive import RECORD, SeriesArchive
+from .clock import HK_UTC_OFFSET
+
+OPERATIONS = ("rollup", "percentiles", "load_duration", "heatmap")
+PERIODS = ("day", "week", "month")
+DAY = 86400
+
+
+@functools.cache
+def _numpy():
+    """Return NumPy, or None if it is not installed. Imported on first use, as it is slow to load."""
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover - depends on the install
+        return None
+    return numpy
+
+
+def _period_start(local: int, period: str) -> int:
+    day = local - local % DAY
+    if period == "day":
+        return day
+    if period == "week":
+        # 1970-01-01 was a Thursday, weeks start on Monday.
+        return day - ((day // DAY + 3) % 7) * DAY
+    date = datetime.datetime.fromtimestamp(day, datetime.timezone.utc)
+    return int(date.replace(day=1).timestamp())
+
+
+def _label(local: int) -> str:
+    return datetime.datetime.fromtimestamp(local, datetime.timezone.utc).strftime("%Y-%m-%d")
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    """Linear interpolation between closest ranks, like ``numpy.percentile``."""
+    position = (len(ordered) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class _PurePython:
+    @staticmethod
+    def rollup(ts, kwh, period):
+        totals = {}
+        for stamp, value in zip(ts, kwh):
+            key = _period_start(stamp, period)
+            totals[key] = totals.get(key, 0.0) + value
+        return sorted(totals.items())
+
+    @staticmethod
+    def percentiles(kwh, qs):
+        ordered = sorted(kwh)
+        return [_percentile(ordered, q) for q in qs]
+
+    @staticmethod
+    def load_duration(kwh, points):
+        ordered = sorted(kwh, reverse=True)
+        step = max(1, math.ceil(len(ordered) / points))
+        return ordered[::step]
+
+    @staticmethod
+    def heatmap(ts, kwh):
+        sums = [[0.0] * 24 for _ in range(7)]
+        counts = [[0] * 24 for _ in range(7)]
+        for stamp, value in zip(ts, kwh):
+            weekday = (stamp // DAY + 3) % 7
+            hour = stamp % DAY // 3600
+            sums[weekday][hour] += value
+            counts[weekday][hour] += 1
+        return [
+            [sums[weekday][hour] / counts[weekday][hour] if counts[weekday][hour] else None for hour in range(24)]
+            for weekday in range(7)
+        ]
+
+
+class _NumPy:
+    @staticmethod
+    def rollup(ts, kwh, period):
+        np = _numpy()
+        if period == "month":
+            starts = ts.astype("datetime64[s]").astype("datetime64[M]").astype("datetime64[s]").astype(np.int64)
+        else:
+            starts = ts - ts % DAY
+            if period == "week":
+                starts = starts - ((starts // DAY + 3) % 7) * DAY
+        keys, index = np.unique(starts, return_inverse=True)
+        totals = np.bincount(index, weights=kwh)
+        return list(zip(keys.tolist(), totals.tolist()))
+
+    @staticmethod
+    def percentiles(kwh, qs):
+        np = _numpy()
+        return np.percentile(kwh, qs).tolist()
+
+    @staticmethod
+    def load_duration(kwh, points):
+        np = _numpy()
+        ordered = np.sort(kwh)[::-1]
+        step = max(1, math.ceil(len(ordered) / points))
+        return ordered[::step].tolist()
+
+    @staticmethod
+    def heatmap(ts, kwh):
+        np = _numpy()
+        cells = ((ts // DAY + 3) % 7) * 24 + ts % DAY // 3600
+        sums = np.bincount(cells, weights=kwh, minlength=168)
+        counts = np.bincount(cells, minlength=168)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums / counts
+        return [
+            [None if math.isnan(value) else value for value in row]
+            for row in means.reshape(7, 24).tolist()
+        ]
+
+
+def _columns(archive: SeriesArchive, start: int | None, end: int | None, utc_offset: int, use_numpy: bool):
+    if use_numpy:
+        np = _numpy()
+        records = archive.as_numpy(start, end)
+        return records["ts"] + utc_offset, records["kwh"].astype(np.float64)
+    ts = []
+    kwh = []
+    for stamp, value, _ in RECORD.iter_unpack(archive.view(start, end)):
+        ts.append(stamp + utc_offset)
+        kwh.append(value)
+    return ts, kwh
+
+
+def aggregate(
+        archive: SeriesArchive,
+        operation: str,
+        start: int | None = None,
+        end: int | None = None,
+        utc_offset: int = HK_UTC_OFFSET,
+        period: str = "day",
+        percentiles: list[float] = (50, 90, 95, 99),
+        points: int = 100,
+        use_numpy: bool | None = None,
+) -> dict:
+    """Run ``operation`` over the readings with ``start <= ts < end``.
+
+    Blocking, run it in the executor.
+    """
+    if operation not in OPERATIONS:
+        raise ValueError(f"Unknown operation {operation}")
+    if use_numpy is None:
+        use_numpy = _numpy() is not None
+    engine = _NumPy if use_numpy else _PurePython
+
+    ts, kwh = _columns(archive, start, end, utc_offset, use_numpy)
+    result = {"operation": operation, "count": len(kwh)}
+    if not len(kwh):
+        return result
+
+    if operation == "rollup":
+        result["period"] = period
+        result["totals"] = [
+            {"start": _label(key), "ts": key - utc_offset, "kwh": round(total, 3)}
+            for key, total in engine.rollup(ts, kwh, period)
+        ]
+    elif operation == "percentiles":
+        result["percentiles"] = {
+            str(q): round(value, 3)
+            for q, value in zip(percentiles, engine.percentiles(kwh, list(percentiles)))
+        }
+    elif operation == "load_duration":
+        result["kwh"] = [round(value, 3) for value in engine.load_duration(kwh, points)]
+    else:
+        result["weekdays"] = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+        result["mean_kwh"] = [
+            [None if value is None else round(value, 3) for value in row]
+            for row in engine.heatmap(ts, kwh)
+        ]
+    return result
@@ -0,0 +1,175 @@
+"""Append-only binary archive of one consumption series."""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import threading
+from collections.abc import Iterable, Iterator
+
+MAGIC = b"CLPA"
+VERSION = 1
+HEADER = struct.Struct("<4sHH8x")
+# Epoch seconds, kWh, flags. Matches ``NUMPY_DTYPE`` byte for byte.
+RECORD = struct.Struct("<qfI")
+NUMPY_DTYPE = [("ts", "<i8"), ("kwh", "<f4"), ("flags", "<u4")]
+
+FLAG_UNVALIDATED = 1
+
+
+class SeriesArchive:
+    """Fixed-width records sorted by timestamp, memory-mapped for reads.
+
+    New readings are appended. A reading for a timestamp already on file
+    overwrites it in place (CLP revises figures and validates renewable rows
+    later), and the rare reading older than the last one on file is merged by
+    rewriting the tail from its position. Lookups bisect the mapping, so a
+    range costs O(log n) plus the records it returns.
+
+    All methods do blocking file I/O and belong in the executor.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self._map = None
+
+    def _open(self):
+        if self._file is not None:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        exists = os.path.exists(self.path) and os.path.getsize(self.path) >= HEADER.size
+        self._file = open(self.path, "r+b" if exists else "w+b")
+        if exists:
+            magic, version, record_size = HEADER.unpack(self._file.read(HEADER.size))
+            if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+                self._file.close()
+                self._file = None
+                raise ValueError(f"{self.path} is not a CLPHK series archive")
+            # Drop a partial record left behind by an interrupted write.
+            size = os.path.getsize(self.path)
+            self._file.truncate(size - (size - HEADER.size) % RECORD.size)
+        else:
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+            self._file.flush()
+
+    def _mapping(self) -> mmap.mmap:
+        self._open()
+        if self._map is None:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _unmap(self):
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # A reader still holds a view; the old mapping goes once it is released.
+                pass
+            self._map = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return (len(self._mapping()) - HEADER.size) // RECORD.size
+
+    def _count(self, mapped) -> int:
+        return (len(mapped) - HEADER.size) // RECORD.size
+
+    def _ts_at(self, mapped, index: int) -> int:
+        return struct.unpack_from("<q", mapped, HEADER.size + index * RECORD.size)[0]
+
+    def _bisect(self, mapped, ts: int) -> int:
+        """Return the index of the first record at or after ``ts``."""
+        low, high = 0, self._count(mapped)
+        while low < high:
+            middle = (low + high) // 2
+            if self._ts_at(mapped, middle) < ts:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _bounds(self, mapped, start: int | None, end: int | None) -> tuple[int, int]:
+        first = 0 if start is None else self._bisect(mapped, start)
+        last = self._count(mapped) if end is None else self._bisect(mapped, end)
+        return first, max(first, last)
+
+    def last_ts(self) -> int | None:
+        with self._lock:
+            mapped = self._mapping()
+            count = self._count(mapped)
+            return self._ts_at(mapped, count - 1) if count else None
+
+    def write(self, records: Iterable[tuple[int, float, int]]) -> int:
+        """Store ``(ts, kwh, flags)`` records and return how many were new."""
+        records = sorted({ts: (ts, kwh, flags) for ts, kwh, flags in records}.values())
+        if not records:
+            return 0
+
+        with self._lock:
+            mapped = self._mapping()
+            count = self._count(mapped)
+            last = self._ts_at(mapped, count - 1) if count else None
+            tail = records if last is None else [record for record in records if record[0] > last]
+            older = records[:len(records) - len(tail)]
+
+            overwrites = []
+            inserts = []
+            for record in older:
+                index = self._bisect(mapped, record[0])
+                if index < count and self._ts_at(mapped, index) == record[0]:
+                    overwrites.append((index, record))
+                else:
+                    inserts.append(record)
+
+            if inserts:
+                # Merge from the first insertion point onwards and rewrite that part.
+                first = self._bisect(mapped, older[0][0])
+                existing = {
+                    row[0]: row
+                    for row in RECORD.iter_unpack(mapped[HEADER.size + first * RECORD.size:])
+                }
+                existing.update((record[0], record) for record in older)
+                existing.update((record[0], record) for record in tail)
+                self._unmap()
+                self._file.seek(HEADER.size + first * RECORD.size)
+                self._file.write(b"".join(RECORD.pack(*row) for _, row in sorted(existing.items())))
+                self._file.truncate()
+            else:
+                self._unmap()
+                for index, record in overwrites:
+                    self._file.seek(HEADER.size + index * RECORD.size)
+                    self._file.write(RECORD.pack(*record))
+                self._file.seek(0, os.SEEK_END)
+                self._file.write(b"".join(RECORD.pack(*record) for record in tail))
+
+            self._file.flush()
+            return len(tail) + len(inserts)
+
+    def view(self, start: int | None = None, end: int | None = None) -> memoryview:
+        """Return the raw records with ``start <= ts < end`` without copying.
+
+        The view is only valid until the next write.
+        """
+        with self._lock:
+            mapped = self._mapping()
+            first, last = self._bounds(mapped, start, end)
+            return memoryview(mapped)[HEADER.size + first * RECORD.size:HEADER.size + last * RECORD.size]
+
+    def read(self, start: int | None = None, end: int | None = None) -> Iterator[tuple[int, float, int]]:
+        """Yield ``(ts, kwh, flags)`` for ``start <= ts < end``."""
+        return RECORD.iter_unpack(self.view(start, end))
+
+    def as_numpy(self, start: int | None = None, end: int | None = None):
+        """Return a NumPy structured array over the mapping, without copying."""
+        import numpy as np
+
+        return np.frombuffer(self.view(start, end), dtype=np.dtype(NUMPY_DTYPE))
+
+    def close(self):
+        with self._lock:
+            self._unmap()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,161 @@
+"""Background OTP login, run once per config entry while entities keep serving cached data."""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+from collections.abc import Awaitable, Callable
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .clock import Clock
+from .const import OTP_ENTITY_ID
+
+_LOGGER = logging.getLogger(__name__)
+
+IDLE = 'idle'
+OTP_REQUESTED = 'otp_requested'
+VERIFYING = 'verifying'
+AUTHENTICATED = 'authenticated'
+FAILED = 'failed'
+
+# How long to wait for the OTP email to be picked up by the IMAP sensor.
+OTP_TIMEOUT = datetime.timedelta(seconds=85)
+
+
+class AuthManager:
+    """Log in with an emailed OTP without blocking the update cycle.
+
+    ``idle -> otp_requested -> verifying -> authenticated``, or ``failed``
+    from any step. Sensors call :meth:`async_start` at the start of every
+    cycle and carry on without a token; the login runs as a background task,
+    at most one per entry, and waits for ``sensor.clp_email_otp`` to change
+    instead of polling it. Listeners are told about every state change, so
+    sensors can refresh as soon as a token is available. After a failure
+    the next attempt waits ``retry_delay``, on ``clock`` like the OTP wait.
+    """
+
+    def __init__(
+            self,
+            hass: HomeAssistant,
+            has_token: Callable[[], bool],
+            request_otp: Callable[[], Awaitable[None]],
+            verify_otp: Callable[[str], Awaitable[None]],
+            retry_delay: datetime.timedelta,
+            clock: Clock | None = None,
+    ):
+        self._hass = hass
+        self._clock = clock or Clock()
+        self._has_token = has_token
+        self._request_otp = request_otp
+        self._verify_otp = verify_otp
+        self._retry_delay = retry_delay
+        self._listeners = []
+        self._task = None
+        self._retry_at = None
+
+        self.state = AUTHENTICATED if has_token() else IDLE
+        self.last_error = None
+        self.changed_at = None
+
+    @callback
+    def async_add_listener(self, listener: Callable[[str], None]) -> CALLBACK_TYPE:
+        self._listeners.append(listener)
+
+        @callback
+        def remove():
+            self._listeners.remove(listener)
+
+        return remove
+
+    @callback
+    def _set_state(self, state: str, error: str | None = None):
+        self.state = state
+        self.last_error = error
+        self.changed_at = self._clock.now()
+        for listener in list(self._listeners):
+            listener(state)
+
+    @callback
+    def async_start(self) -> bool:
+        """Return whether a token is available, starting a login in the background if not."""
+        if self._has_token():
+            # Tokens set up front or refreshed by a sensor; nothing to announce
+            self.state = AUTHENTICATED
+            return True
+
+        if self._task is not None or self._hass.states.get(OTP_ENTITY_ID) is None:
+            return False
+        if self._retry_at is not None and self._clock.now() < self._retry_at:
+            return False
+
+        self._task = self._hass.async_create_background_task(self._async_login(), "clphk otp login")
+        self._task.add_done_callback(self._login_done)
+        return False
+
+    @callback
+    def _login_done(self, task: asyncio.Task):
+        self._task = None
+
+    async def _async_login(self):
+        state = self._hass.states.get(OTP_ENTITY_ID)
+        original_otp = state.state if state else None
+        received = self._hass.loop.create_future()
+
+        @callback
+        def otp_changed(event: Event):
+            new_state = event.data.get("new_state")
+            otp = new_state.state if new_state else None
+            if otp and otp not in (original_otp, STATE_UNKNOWN, STATE_UNAVAILABLE) and not received.done():
+                received.set_result(otp)
+
+        # Listen before asking for the email, so a fast delivery is not missed
+        remove = async_track_state_change_event(self._hass, [OTP_ENTITY_ID], otp_changed)
+        try:
+            _LOGGER.debug("Requesting OTP")
+            self._set_state(OTP_REQUESTED)
+            await self._request_otp()
+
+            try:
+                async with self._clock.timeout(OTP_TIMEOUT.total_seconds()):
+                    otp = await received
+            except TimeoutError:
+                raise Exception(f"OTP not received from {OTP_ENTITY_ID}") from None
+            finally:
+                remove()
+                remove = None
+
+            self._set_state(VERIFYING)
+            await self._verify_otp(otp)
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            _LOGGER.error("OTP login failed: %s. Please check your email/IMAP integration.", ex)
+            self._retry_at = self._clock.now() + self._retry_delay
+            self._set_state(FAILED, str(ex))
+            return
+        finally:
+            if remove is not None:
+                remove()
+
+        _LOGGER.debug("Access token obtained")
+        self._retry_at = None
+        self._set_state(AUTHENTICATED)
+
+    async def async_stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "last_error": self.last_error,
+            "changed_at": self.changed_at.isoformat() if self.changed_at else None,
+            "retry_at": self._retry_at.isoformat() if self._retry_at else None,
+        }
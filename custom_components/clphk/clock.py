@@ -0,0 +1,50 @@
+"""The one clock every timer of the integration reads, and Hong Kong time."""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import time
+from collections.abc import Callable
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.helpers.event import async_call_later
+
+# Hong Kong has kept UTC+8 without DST since 1979, so a fixed offset is enough
+HK_UTC_OFFSET = 8 * 3600
+HKT = datetime.timezone(datetime.timedelta(seconds=HK_UTC_OFFSET))
+
+
+def day_start(day: datetime.date) -> int:
+    """Return the epoch seconds of midnight in Hong Kong on ``day``."""
+    return int(datetime.datetime.combine(day, datetime.time.min, HKT).timestamp())
+
+
+class Clock:
+    """Wall time, monotonic time, timers and timeouts of the integration.
+
+    A single instance is kept in ``hass.data[DOMAIN]["clock"]`` and handed to
+    everything that reads the time or waits: the sensors (publication lag,
+    negative cache, update throttle), :class:`AuthManager`,
+    :class:`CircuitBreaker`, :class:`RequestScheduler`,
+    :class:`BackgroundTasks` (retry timers) and :class:`TokenWriter`.
+    Putting another clock there before the first entry is set up moves all of
+    them together, which is how the simulation harness in ``tests`` runs
+    weeks of polling in seconds.
+
+    Only waits for something other than a network response go through the
+    clock. Request timeouts and measured latencies stay on real time.
+    """
+
+    def now(self, tz: datetime.tzinfo = datetime.timezone.utc) -> datetime.datetime:
+        return datetime.datetime.now(tz)
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def call_later(self, hass: HomeAssistant, delay: float, action: Callable[[datetime.datetime], None]) -> CALLBACK_TYPE:
+        """Call ``action`` with the current time after ``delay`` seconds, and return the cancel callback."""
+        return async_call_later(hass, delay, action)
+
+    def timeout(self, delay: float | None):
+        """Async context manager raising TimeoutError once ``delay`` seconds have passed."""
+        return asyncio.timeout(delay)
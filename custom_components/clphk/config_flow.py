@@ -28,6 +28,9 @@ from homeassistant.helpers.selector import (
 )
 
 from .const import (
+    API_BASE_URL,
+    API_PATH_ACCOUNT_DETAIL,
+    CONF_API_BASE_URL,
     CONF_GET_ACCT,
     CONF_GET_BILL,
     CONF_GET_BIMONTHLY,
@@ -35,6 +38,13 @@ from .const import (
     CONF_GET_ESTIMATION,
     CONF_GET_HOURLY,
     CONF_GET_HOURLY_DAYS,
+    CONF_DAILY_INTERVAL,
+    CONF_HEDGE_REQUESTS,
+    CONF_SERIES_ATTRIBUTES,
+    CONF_BACKFILL_DAYS,
+    CONF_HOURLY_INTERVAL,
+    CONF_RATE_BURST,
+    CONF_RATE_LIMIT,
     CONF_RES_ENABLE,
     CONF_RES_GET_BILL,
     CONF_RES_GET_DAILY,
@@ -110,6 +120,34 @@ def _build_options_schema(defaults: dict[str, Any]) -> vol.Schema:
                 CONF_GET_HOURLY_DAYS,
                 default=defaults.get(CONF_GET_HOURLY_DAYS, 1),
             ): NumberSelector(NumberSelectorConfig(min=1, max=2, mode=NumberSelectorMode.BOX)),
+            vol.Optional(
+                CONF_HOURLY_INTERVAL,
+                default=defaults.get(CONF_HOURLY_INTERVAL, 30),
+            ): NumberSelector(NumberSelectorConfig(min=5, max=720, mode=NumberSelectorMode.BOX)),
+            vol.Optional(
+                CONF_DAILY_INTERVAL,
+                default=defaults.get(CONF_DAILY_INTERVAL, 720),
+            ): NumberSelector(NumberSelectorConfig(min=30, max=2880, mode=NumberSelectorMode.BOX)),
+            vol.Optional(
+                CONF_RATE_LIMIT,
+                default=defaults.get(CONF_RATE_LIMIT, 20),
+            ): NumberSelector(NumberSelectorConfig(min=1, max=120, mode=NumberSelectorMode.BOX)),
+            vol.Optional(
+                CONF_RATE_BURST,
+                default=defaults.get(CONF_RATE_BURST, 10),
+            ): NumberSelector(NumberSelectorConfig(min=1, max=60, mode=NumberSelectorMode.BOX)),
+            vol.Optional(
+                CONF_HEDGE_REQUESTS,
+                default=defaults.get(CONF_HEDGE_REQUESTS, False),
+            ): BooleanSelector(),
+            vol.Optional(
+                CONF_SERIES_ATTRIBUTES,
+                default=defaults.get(CONF_SERIES_ATTRIBUTES, True),
+            ): BooleanSelector(),
+            vol.Optional(
+                CONF_BACKFILL_DAYS,
+                default=defaults.get(CONF_BACKFILL_DAYS, 0),
+            ): NumberSelector(NumberSelectorConfig(min=0, max=60, mode=NumberSelectorMode.BOX)),
             vol.Optional(
                 CONF_RES_ENABLE,
                 default=defaults.get(CONF_RES_ENABLE, False),
@@ -216,7 +254,7 @@ def _classify_access_token_error(status: int, body: str) -> str:
     return "invalid_auth"
 
 
-async def _validate_access_token(session, token: str, timeout: int = 30) -> tuple[str | None, str]:
+async def _validate_access_token(session, token: str, timeout: int = 30, base_url: str = API_BASE_URL) -> tuple[str | None, str]:
     """Return (normalized token, error key)."""
     normalized, format_error = _normalize_token(token)
     if not normalized:
@@ -230,7 +268,7 @@ async def _validate_access_token(session, token: str, timeout: int = 30) -> tupl
     try:
         async with asyncio.timeout(timeout):
             async with session.get(
-                "https://api.clp.com.hk/ts1/ms/profile/accountdetails/myServicesCA",
+                base_url + API_PATH_ACCOUNT_DETAIL,
                 headers=headers,
             ) as response:
                 body = await response.text()
@@ -266,6 +304,7 @@ class CLPHKOptionsFlowHandler(config_entries.OptionsFlow):
                 session=session,
                 token=access_token_input,
                 timeout=timeout,
+                base_url=merged.get(CONF_API_BASE_URL, API_BASE_URL),
             )
             if not normalized_access_token:
                 errors["base"] = error_key
@@ -316,6 +355,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain="clphk"):
     """Setup flow: tokens -> options."""
 
     VERSION = 1
+    # 1.2: sensor unique IDs derived from the entry ID instead of the name
+    MINOR_VERSION = 2
 
     def __init__(self) -> None:
         self._pending: dict[str, Any] = {}
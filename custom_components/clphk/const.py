@@ -1,5 +1,20 @@
 CONF_DOMAIN = 'clphk'
 
+CONF_API_BASE_URL = 'api_base_url'
+CONF_TRANSPORT_MODE = 'transport_mode'
+CONF_TRANSPORT_ARCHIVE = 'transport_archive'
+DEFAULT_TRANSPORT_ARCHIVE = 'clphk_traffic.jsonl.gz'
+
+API_BASE_URL = 'https://api.clp.com.hk'
+API_PATH_OTP_REQUEST = '/ts1/ms/profile/register/eligibilityCheckAndLogin'
+API_PATH_OTP_VERIFY = '/ts1/ms/profile/accountManagement/passwordlesslogin/otpverify'
+API_PATH_REFRESH_TOKEN = '/ts1/ms/profile/identity/manage/account/refresh_token'
+API_PATH_ACCOUNT_DETAIL = '/ts1/ms/profile/accountdetails/myServicesCA'
+API_PATH_BILLING_HISTORY = '/ts1/ms/billing/transaction/historyBilling'
+API_PATH_CONSUMPTION_INFO = '/ts1/ms/consumption/info'
+API_PATH_CONSUMPTION_HISTORY = '/ts1/ms/consumption/history'
+API_PATH_RENEW_DASHBOARD = '/ts1/ms/renew/fit/dashboard'
+
 CONF_RETRY_DELAY = 'retry_delay'
 
 CONF_GET_ACCT = 'get_account'
@@ -10,6 +25,21 @@ CONF_GET_DAILY = 'get_daily'
 CONF_GET_HOURLY = 'get_hourly'
 CONF_GET_HOURLY_DAYS = 'get_hourly_days'
 
+CONF_HOURLY_INTERVAL = 'hourly_interval'
+CONF_DAILY_INTERVAL = 'daily_interval'
+
+CONF_RATE_LIMIT = 'rate_limit'
+CONF_RATE_BURST = 'rate_burst'
+CONF_HEDGE_REQUESTS = 'hedge_requests'
+CONF_SERIES_ATTRIBUTES = 'series_attributes'
+CONF_BACKFILL_DAYS = 'backfill_days'
+
+ARCHIVE_DIR = 'clphk'
+ARCHIVE_SERIES = ('hourly', 'daily', 'renewable_hourly', 'renewable_daily')
+
+# IMAP sensor that receives the CLP login OTP
+OTP_ENTITY_ID = 'sensor.clp_email_otp'
+
 CONF_RES_ENABLE = 'renewable_energy_sensor_enable'
 CONF_RES_NAME = 'renewable_energy_sensor_name'
 CONF_RES_TYPE = 'renewable_energy_sensor_type'
@@ -0,0 +1,39 @@
+"""Diagnostics support for CLPHK."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_DOMAIN
+
+TO_REDACT = {
+    "access_token",
+    "refresh_token",
+    "access_token_expiry_time",
+    "email",
+    "email_address",
+}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    domain_data = hass.data.get(CONF_DOMAIN, {})
+    entry_state = domain_data.get("entries", {}).get(entry.entry_id, {})
+    scheduler = domain_data.get("scheduler")
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "metrics": entry_state["metrics"].as_dict() if "metrics" in entry_state else None,
+        "auth": entry_state["auth"].stats() if "auth" in entry_state else None,
+        "token_writer": entry_state["token_writer"].stats() if "token_writer" in entry_state else None,
+        "tasks": entry_state["tasks"].stats() if "tasks" in entry_state else None,
+        "scheduler": scheduler.stats() if scheduler else None,
+        "circuits": {endpoint: circuit.stats() for endpoint, circuit in domain_data.get("circuits", {}).items()},
+        "latency": {endpoint: tracker.stats() for endpoint, tracker in domain_data.get("latency", {}).items()},
+    }
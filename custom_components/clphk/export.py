@@ -0,0 +1,140 @@
+"""Streaming export of consumption and billing history."""
+from __future__ import annotations
+
+import asyncio
+import csv
+import datetime
+import json
+import logging
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+
+from .archive import SeriesArchive
+from .clock import HKT, day_start
+
+_LOGGER = logging.getLogger(__name__)
+
+FORMATS = ("csv", "ndjson")
+COLUMNS = ("series", "start", "end", "date", "kwh", "amount", "flags")
+
+# Series kept in an archive, with the sensor that owns them and the length of a reading
+ARCHIVED = {
+    "hourly": ("main", datetime.timedelta(hours=1)),
+    "daily": ("main", datetime.timedelta(days=1)),
+    "renewable_hourly": ("renewable_energy", datetime.timedelta(hours=1)),
+    "renewable_daily": ("renewable_energy", datetime.timedelta(days=1)),
+}
+# Series only kept in memory by a sensor
+CACHED = {
+    "bimonthly": "main",
+    "bills": "main",
+    "payments": "main",
+    "fit": "renewable_energy",
+}
+EXPORT_SERIES = tuple(ARCHIVED) + tuple(CACHED)
+
+
+def missing_days(archive: SeriesArchive, first: datetime.date, last: datetime.date) -> list[datetime.date]:
+    """Return the days from ``first`` to ``last`` without any reading in ``archive``."""
+    present = {
+        datetime.datetime.fromtimestamp(ts, HKT).date()
+        for ts, _, _ in archive.read(day_start(first), day_start(last + datetime.timedelta(days=1)))
+    }
+    days = []
+    day = first
+    while day <= last:
+        if day not in present:
+            days.append(day)
+        day += datetime.timedelta(days=1)
+    return days
+
+
+async def async_fetch_days(
+        fetch: Callable[[datetime.date], Awaitable[int]],
+        days: Iterable[datetime.date],
+        concurrency: int,
+) -> tuple[int, int]:
+    """Fetch ``days`` with at most ``concurrency`` requests in flight.
+
+    Workers pull from one shared iterator, so memory does not grow with the
+    number of days. Returns how many days were fetched and how many failed.
+    """
+    pending = iter(days)
+    fetched = 0
+    failed = 0
+
+    async def worker():
+        nonlocal fetched, failed
+        for day in pending:
+            try:
+                await fetch(day)
+                fetched += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failed += 1
+                _LOGGER.warning("Could not fetch %s: %s", day, e)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return fetched, failed
+
+
+def archived_rows(
+        series: str,
+        archive: SeriesArchive,
+        start: int | None,
+        end: int | None,
+) -> Iterator[dict]:
+    step = ARCHIVED[series][1]
+    for ts, kwh, flags in archive.read(start, end):
+        begin = datetime.datetime.fromtimestamp(ts, HKT)
+        yield {
+            "series": series,
+            "start": begin.isoformat(),
+            "end": (begin + step).isoformat(),
+            "kwh": round(kwh, 3),
+            "flags": flags,
+        }
+
+
+def _iso(value) -> str | None:
+    return value.isoformat() if isinstance(value, (datetime.date, datetime.datetime)) else value
+
+
+def cached_rows(series: str, rows: list[dict], start: datetime.date | None, end: datetime.date | None) -> Iterator[dict]:
+    for row in rows:
+        begin = row.get("start") or row.get("from_date")
+        finish = row.get("end") or row.get("to_date")
+        date = row.get("transaction_date")
+        when = (date or begin or finish).date()
+        if (start and when < start) or (end and when > end):
+            continue
+        yield {
+            "series": series,
+            "start": _iso(begin),
+            "end": _iso(finish),
+            "date": _iso(date),
+            "kwh": row.get("kwh"),
+            "amount": row.get("total"),
+        }
+
+
+def write_export(path: str, fmt: str, sources: Iterable[Iterator[dict]]) -> int:
+    """Stream the rows of every source to ``path`` and return how many were written.
+
+    Blocking, run it in the executor.
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        if fmt == "csv":
+            writer = csv.DictWriter(file, fieldnames=COLUMNS, restval="")
+            writer.writeheader()
+            for source in sources:
+                for row in source:
+                    writer.writerow(row)
+                    count += 1
+        else:
+            for source in sources:
+                for row in source:
+                    file.write(json.dumps(row, separators=(",", ":")) + "\n")
+                    count += 1
+    return count
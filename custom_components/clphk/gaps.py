@@ -0,0 +1,52 @@
+"""Find holes in an archived hourly series and plan the requests that fill them."""
+from __future__ import annotations
+
+import datetime
+
+from .archive import FLAG_UNVALIDATED, SeriesArchive
+from .clock import HKT
+
+HOUR = 3600
+
+
+def find_gaps(archive: SeriesArchive, start: int, end: int) -> list[tuple[int, int]]:
+    """Return ``[gap_start, gap_end)`` ranges of hours in ``[start, end)`` that are missing or unvalidated.
+
+    Adjacent holes are merged into one range. Blocking, run it in the executor.
+    """
+    gaps = []
+    expected = start - start % HOUR
+    for ts, _, flags in archive.read(expected, end):
+        if ts > expected:
+            gaps.append((expected, ts))
+        if flags & FLAG_UNVALIDATED:
+            gaps.append((ts, ts + HOUR))
+        expected = max(expected, ts + HOUR)
+    if expected < end:
+        gaps.append((expected, end))
+
+    merged = []
+    for gap_start, gap_end in gaps:
+        if merged and gap_start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], gap_end))
+        else:
+            merged.append((gap_start, gap_end))
+    return merged
+
+
+def gap_days(gaps: list[tuple[int, int]]) -> list[datetime.date]:
+    """Return the days touched by ``gaps``, oldest first.
+
+    CLP serves hourly data one day per request, so a day is the smallest
+    request that covers any gap inside it, and every gap within the same day
+    shares that request.
+    """
+    days = []
+    for gap_start, gap_end in gaps:
+        day = datetime.datetime.fromtimestamp(gap_start, HKT).date()
+        last = datetime.datetime.fromtimestamp(gap_end - 1, HKT).date()
+        while day <= last:
+            if not days or days[-1] != day:
+                days.append(day)
+            day += datetime.timedelta(days=1)
+    return days
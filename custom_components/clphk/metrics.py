@@ -0,0 +1,82 @@
+"""In-process metrics for requests to CLP and update cycles."""
+from __future__ import annotations
+
+import bisect
+import collections
+import time
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram:
+    """Per-bucket (non-cumulative) counts plus count, sum and max."""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = None
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.last = value
+
+    def as_dict(self) -> dict:
+        labels = [f"le_{bucket}" for bucket in self.buckets] + ["inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "max": round(self.max, 3),
+            "last": None if self.last is None else round(self.last, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class Metrics:
+    """Counters and histograms for one config entry."""
+
+    def __init__(self):
+        self.requests = collections.Counter()
+        self.statuses = collections.defaultdict(collections.Counter)
+        self.errors = collections.defaultdict(collections.Counter)
+        self.bytes_received = collections.Counter()
+        self.latency = collections.defaultdict(Histogram)
+        self.token_refreshes = 0
+        self.retries_scheduled = 0
+        self.backfilled_days = 0
+        self.update_cycle = Histogram()
+        # Seconds from entry setup to the end of the first update cycle
+        self.started = time.monotonic()
+        self.first_update = None
+
+    def record_request(self, endpoint: str, status: int, seconds: float):
+        self.requests[endpoint] += 1
+        self.statuses[endpoint][status] += 1
+        self.latency[endpoint].observe(seconds)
+
+    def record_bytes(self, endpoint: str, size: int):
+        self.bytes_received[endpoint] += size
+
+    def record_error(self, endpoint: str, kind: str):
+        self.requests[endpoint] += 1
+        self.errors[endpoint][kind] += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": dict(self.requests),
+            "statuses": {endpoint: dict(counter) for endpoint, counter in self.statuses.items()},
+            "errors": {endpoint: dict(counter) for endpoint, counter in self.errors.items()},
+            "bytes_received": dict(self.bytes_received),
+            "latency": {endpoint: histogram.as_dict() for endpoint, histogram in self.latency.items()},
+            "token_refreshes": self.token_refreshes,
+            "retries_scheduled": self.retries_scheduled,
+            "backfilled_days": self.backfilled_days,
+            "update_cycle": self.update_cycle.as_dict(),
+            "first_update": None if self.first_update is None else round(self.first_update, 3),
+        }
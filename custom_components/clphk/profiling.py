@@ -0,0 +1,80 @@
+"""Profile a single update cycle and attribute where its time goes."""
+from __future__ import annotations
+
+import cProfile
+import pstats
+import time
+from collections.abc import Awaitable, Callable
+
+SELECTOR_WAITS = (
+    "<method 'poll' of 'select.epoll' objects>",
+    "<method 'poll' of 'select.poll' objects>",
+    "<method 'control' of 'select.kqueue' objects>",
+    "<built-in method select.select>",
+)
+
+# (category, statistic, predicate on (filename, line, function name))
+CATEGORIES = (
+    ("network_wait", "tottime", lambda file, line, name: file.endswith("selectors.py") or name in SELECTOR_WAITS),
+    ("json_decode", "cumtime", lambda file, line, name: file.endswith("json/__init__.py") and name == "loads"),
+    ("strptime", "cumtime", lambda file, line, name: file.endswith("_strptime.py") and name == "_strptime_datetime"),
+    ("sorting", "cumtime", lambda file, line, name: name in ("<built-in method builtins.sorted>", "<method 'sort' of 'list' objects>")),
+    ("state_write", "cumtime", lambda file, line, name: name == "async_write_ha_state"),
+)
+
+
+def _frame_label(func: tuple) -> str:
+    file, line, name = func
+    return name if file == "~" else f"{file}:{line}({name})"
+
+
+def summarize(stats: pstats.Stats, wall_time: float, top: int) -> dict:
+    """Break the profile down into categories and list the most expensive frames."""
+    breakdown = {category: 0.0 for category, _, _ in CATEGORIES}
+    frames = []
+    for func, (_, calls, tottime, cumtime, _) in stats.stats.items():
+        file, line, name = func
+        for category, statistic, predicate in CATEGORIES:
+            if predicate(file, line, name):
+                breakdown[category] += tottime if statistic == "tottime" else cumtime
+                break
+        frames.append((cumtime, tottime, calls, func))
+
+    breakdown = {category: round(seconds, 4) for category, seconds in breakdown.items()}
+    breakdown["other"] = round(max(0.0, wall_time - sum(breakdown.values())), 4)
+
+    frames.sort(key=lambda frame: frame[0], reverse=True)
+    return {
+        "wall_time": round(wall_time, 4),
+        "breakdown": breakdown,
+        "top": [
+            {
+                "function": _frame_label(func),
+                "calls": calls,
+                "tottime": round(tottime, 4),
+                "cumtime": round(cumtime, 4),
+            }
+            for cumtime, tottime, calls, func in frames[:top]
+        ],
+    }
+
+
+async def async_profile(
+        run: Callable[[], Awaitable[None]],
+        top: int = 25,
+) -> tuple[cProfile.Profile, dict]:
+    """Run ``run`` under cProfile on the event loop thread.
+
+    Everything the loop does meanwhile is captured too, including waiting in
+    the selector, which is how network wait shows up.
+    """
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        await run()
+    finally:
+        profiler.disable()
+    wall_time = time.perf_counter() - started
+
+    return profiler, summarize(pstats.Stats(profiler), wall_time, top)
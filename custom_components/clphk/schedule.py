@@ -0,0 +1,126 @@
+"""Polling schedule for CLP data series."""
+from __future__ import annotations
+
+import datetime
+
+
+class PublicationTracker:
+    """Learn when CLP publishes a series and decide when it is worth polling.
+
+    CLP publishes a period (an hour, a day) some time after it has ended. Each
+    time a newer ``startDate`` shows up, the delay between the end of that
+    period and the moment it was first seen is folded into a moving estimate.
+    Polling is dense around the expected arrival of the next period and sparse
+    otherwise.
+    """
+
+    def __init__(
+            self,
+            period: datetime.timedelta,
+            default_lag: datetime.timedelta,
+            sparse_interval: datetime.timedelta,
+            dense_interval: datetime.timedelta,
+            dense_window: datetime.timedelta,
+            max_lag: datetime.timedelta = datetime.timedelta(days=1),
+            smoothing: float = 0.3,
+    ):
+        self.period = period
+        self.lag = default_lag
+        self.sparse_interval = sparse_interval
+        self.dense_interval = dense_interval
+        self.dense_window = dense_window
+        self.max_lag = max_lag
+        self.smoothing = smoothing
+
+        self.latest_start = None
+        self.last_poll = None
+        self._last_observed = None
+
+    def observe(self, latest_start: datetime.datetime, now: datetime.datetime):
+        """Record the newest period start returned by CLP and mark the series as polled."""
+        if self.latest_start is not None and latest_start > self.latest_start and self._last_observed is not None:
+            # The period appeared somewhere between the previous look and now.
+            period_end = latest_start + self.period
+            seen_after = max(self._last_observed, period_end)
+            arrival = seen_after + (now - seen_after) / 2
+            sample = min(max(arrival - period_end, datetime.timedelta(0)), self.max_lag)
+            self.lag = self.lag + (sample - self.lag) * self.smoothing
+
+        if self.latest_start is None or latest_start > self.latest_start:
+            self.latest_start = latest_start
+
+        self._last_observed = now
+        self.mark_polled(now)
+
+    def mark_polled(self, now: datetime.datetime):
+        self.last_poll = now
+
+    def expected_arrival(self) -> datetime.datetime | None:
+        """Return when the period following the latest known one should be published."""
+        if self.latest_start is None:
+            return None
+        return self.latest_start + 2 * self.period + self.lag
+
+    def is_due(self, now: datetime.datetime) -> bool:
+        if self.last_poll is None:
+            return True
+
+        elapsed = now - self.last_poll
+        expected = self.expected_arrival()
+        if expected is not None and expected - self.dense_window <= now <= expected + self.dense_window:
+            return elapsed >= self.dense_interval
+        return elapsed >= self.sparse_interval
+
+    def data_day(self, now: datetime.datetime) -> datetime.datetime:
+        """Return the most recent day CLP is expected to have data for.
+
+        Until the first period of today has had time to be published, the
+        latest day with data is still yesterday.
+        """
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        if now < midnight + self.period + self.lag:
+            return now + datetime.timedelta(days=-1)
+        return now
+
+
+class NegativeCache:
+    """Hold off requests that recently came back empty or not yet validated.
+
+    Each key gets its own delay, which grows every time the same request is
+    empty again and is dropped as soon as it returns data.
+    """
+
+    def __init__(
+            self,
+            min_delay: datetime.timedelta,
+            max_delay: datetime.timedelta,
+            factor: float = 2.0,
+    ):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def is_suppressed(self, key, now: datetime.datetime) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and now < entry[0]
+
+    def record(self, key, now: datetime.datetime) -> datetime.timedelta:
+        """Record an empty result for ``key`` and return how long it is held off."""
+        entry = self._entries.get(key)
+        delay = self.min_delay if entry is None else min(self.max_delay, entry[1] * self.factor)
+        self._entries[key] = (now + delay, delay)
+        self._prune(now)
+        return delay
+
+    def clear(self, key):
+        self._entries.pop(key, None)
+
+    def _prune(self, now: datetime.datetime):
+        # Windows roll over daily, so drop keys nobody has asked about in a while.
+        stale = [key for key, (retry_at, _) in self._entries.items() if now > retry_at + self.max_delay]
+        for key in stale:
+            del self._entries[key]
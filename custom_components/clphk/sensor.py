@@ -1,23 +1,22 @@
 from __future__ import annotations
 
 import asyncio
-import base64
 import datetime
 import json as jsonlib
 import logging
+import time
+from collections.abc import Callable
+from typing import Any
+from dataclasses import dataclass
 
 import aiohttp
 import homeassistant.helpers.config_validation as cv
-import pytz
 import voluptuous as vol
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import padding
-from dateutil import relativedelta
-from homeassistant.components.lock import PLATFORM_SCHEMA
 from homeassistant.components.sensor import (
+    PLATFORM_SCHEMA,
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
@@ -25,18 +24,55 @@ from homeassistant.const import (
     CONF_NAME,
     CONF_TIMEOUT,
     CONF_TYPE,
+    EntityCategory,
     UnitOfEnergy,
+    UnitOfInformation,
+    UnitOfTime,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers import aiohttp_client
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import STORAGE_DIR
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
-from homeassistant.util import Throttle
 
-from . import verify_otp
+from . import encrypt_otp_request, verify_otp
+from .auth import AUTHENTICATED, AuthManager
+from .archive import FLAG_UNVALIDATED, SeriesArchive
+from .clock import HKT, Clock, day_start
+from .gaps import find_gaps, gap_days
+from .metrics import Metrics
+from .schedule import NegativeCache, PublicationTracker
+from .tasks import BackgroundTasks
+from .transport import (
+    PRIORITY_ACCOUNT,
+    PRIORITY_AUTH,
+    PRIORITY_BACKGROUND,
+    PRIORITY_BILLS,
+    PRIORITY_DEFAULT,
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    LogSampler,
+    Payload,
+    RecordingSession,
+    ReplaySession,
+    RequestScheduler,
+    endpoint_of,
+)
 from .const import (
-    CONF_CLP_PUBLIC_KEY,
+    API_BASE_URL,
+    API_PATH_ACCOUNT_DETAIL,
+    API_PATH_BILLING_HISTORY,
+    API_PATH_CONSUMPTION_HISTORY,
+    API_PATH_CONSUMPTION_INFO,
+    API_PATH_OTP_REQUEST,
+    API_PATH_REFRESH_TOKEN,
+    API_PATH_RENEW_DASHBOARD,
+    ARCHIVE_DIR,
+    CONF_API_BASE_URL,
+    CONF_TRANSPORT_MODE,
+    CONF_TRANSPORT_ARCHIVE,
+    DEFAULT_TRANSPORT_ARCHIVE,
     CONF_DOMAIN,
     CONF_RETRY_DELAY,
 
@@ -47,6 +83,13 @@ from .const import (
     CONF_GET_DAILY,
     CONF_GET_HOURLY,
     CONF_GET_HOURLY_DAYS,
+    CONF_HOURLY_INTERVAL,
+    CONF_DAILY_INTERVAL,
+    CONF_RATE_LIMIT,
+    CONF_RATE_BURST,
+    CONF_HEDGE_REQUESTS,
+    CONF_SERIES_ATTRIBUTES,
+    CONF_BACKFILL_DAYS,
 
     CONF_RES_ENABLE,
     CONF_RES_NAME,
@@ -59,8 +102,14 @@ from .const import (
 
 _LOGGER = logging.getLogger(__name__)
 
+# Full response payloads are only dumped for a sample of requests per endpoint.
+_PAYLOAD_SAMPLER = LogSampler(every=10)
+
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({
     vol.Optional(CONF_TIMEOUT, default=30): cv.positive_int,
+    vol.Optional(CONF_API_BASE_URL, default=API_BASE_URL): cv.url,
+    vol.Optional(CONF_TRANSPORT_MODE, default=''): vol.In(['', 'record', 'replay']),
+    vol.Optional(CONF_TRANSPORT_ARCHIVE, default=DEFAULT_TRANSPORT_ARCHIVE): cv.string,
     vol.Optional(CONF_RETRY_DELAY, default=300): cv.positive_int,
     vol.Optional(CONF_NAME, default='CLP'): cv.string,
     vol.Optional(CONF_TYPE, default=''): cv.string,
@@ -71,6 +120,13 @@ PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({
     vol.Optional(CONF_GET_DAILY, default=False): cv.boolean,
     vol.Optional(CONF_GET_HOURLY, default=False): cv.boolean,
     vol.Optional(CONF_GET_HOURLY_DAYS, default=1): vol.Clamp(min=1, max=2),
+    vol.Optional(CONF_HOURLY_INTERVAL, default=30): cv.positive_int,
+    vol.Optional(CONF_DAILY_INTERVAL, default=720): cv.positive_int,
+    vol.Optional(CONF_RATE_LIMIT, default=20): cv.positive_int,
+    vol.Optional(CONF_RATE_BURST, default=10): cv.positive_int,
+    vol.Optional(CONF_HEDGE_REQUESTS, default=False): cv.boolean,
+    vol.Optional(CONF_SERIES_ATTRIBUTES, default=True): cv.boolean,
+    vol.Optional(CONF_BACKFILL_DAYS, default=0): vol.Clamp(min=0, max=60),
 
     vol.Optional(CONF_RES_ENABLE, default=False): cv.boolean,
     vol.Optional(CONF_RES_NAME, default='CLP Renewable Energy'): cv.string,
@@ -82,10 +138,63 @@ PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({
 })
 
 MIN_TIME_BETWEEN_UPDATES = datetime.timedelta(seconds=300)
-DAILY_TASK_INTERVAL = datetime.timedelta(hours=12)
-HOURLY_TASK_INTERVAL = datetime.timedelta(minutes=30)
+# Initial guesses of how long after a period ends CLP publishes it, refined at runtime.
+# An hourly lag of 3 hours means the first hour of a day shows up at about 4 AM.
+HOURLY_PUBLICATION_LAG = datetime.timedelta(hours=3)
+DAILY_PUBLICATION_LAG = datetime.timedelta(hours=4)
+HOURLY_DENSE_WINDOW = datetime.timedelta(minutes=15)
+DAILY_DENSE_WINDOW = datetime.timedelta(hours=2)
+DAILY_DENSE_INTERVAL = datetime.timedelta(minutes=30)
+# Hold-off for windows that came back empty or not yet validated, doubling on every repeat.
+NEGATIVE_CACHE_MIN_DELAY = datetime.timedelta(minutes=10)
+NEGATIVE_CACHE_MAX_DELAY = datetime.timedelta(hours=2)
+# Backfill runs at most once per interval, fetches a few days per run and holds off days CLP cannot fill.
+BACKFILL_INTERVAL = datetime.timedelta(hours=1)
+BACKFILL_MAX_DAYS = 4
+BACKFILL_HOLD_MIN_DELAY = datetime.timedelta(hours=6)
+BACKFILL_HOLD_MAX_DELAY = datetime.timedelta(days=7)
 USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/145.0.0.0 Safari/537.36"
 HTTP_4xx_ERROR_RETRY_LIMIT = 3
+# Requests to CLP running at the same time, across all entries
+MAX_IN_FLIGHT = 4
+
+# Data a CLPData keeps in memory, each read by the CLPSensor attributes and by CLPDataSensor entities
+DATA_SOURCES = ("account", "bills", "estimation", "bimonthly", "daily", "hourly")
+
+
+@dataclass(frozen=True)
+class Fetch:
+    """One request of an update cycle: how often it is due and what reads its result."""
+
+    name: str
+    method: str
+    # "once" (account detail, again every daily_task interval while read),
+    # "daily_task" (bills and estimation interval), "daily" or "hourly"
+    schedule: str
+    source: str
+    state_type: str | None = None
+
+
+# Every request a sensor can make and its consumers. Everything but the account
+# detail needs the account number, so the account detail comes first.
+FETCH_GRAPH = {
+    "main": (
+        Fetch("account detail", "main_get_account_detail", "once", "account"),
+        Fetch("bill", "main_get_bill", "daily_task", "bills"),
+        Fetch("estimation", "main_get_estimation", "daily_task", "estimation"),
+        Fetch("bimonthly", "main_get_bimonthly", "daily_task", "bimonthly", "BIMONTHLY"),
+        Fetch("daily", "main_get_daily", "daily", "daily", "DAILY"),
+        Fetch("hourly", "main_get_hourly", "hourly", "hourly", "HOURLY"),
+    ),
+    "renewable_energy": (
+        Fetch("renewable account detail", "main_get_account_detail", "once", "account"),
+        Fetch("renewable bimonthly", "renewable_get_bimonthly", "daily_task", "bills", "BIMONTHLY"),
+        Fetch("renewable daily", "renewable_get_daily", "daily", "daily", "DAILY"),
+        Fetch("renewable hourly", "renewable_get_hourly", "hourly", "hourly", "HOURLY"),
+    ),
+}
+# Without a configured type the most detailed one with data becomes the state
+AUTO_STATE_TYPES = ("HOURLY", "DAILY", "BIMONTHLY")
 
 DOMAIN = CONF_DOMAIN
 
@@ -117,59 +226,133 @@ async def async_setup_platform(
 
     session = aiohttp_client.async_get_clientsession(hass)
 
-    # Shared token state in hass.data[DOMAIN]
-    hass.data[DOMAIN]["session"] = session
+    transport_mode = discovery_info.get(CONF_TRANSPORT_MODE, '')
+    if transport_mode:
+        archive = hass.config.path(discovery_info.get(CONF_TRANSPORT_ARCHIVE, DEFAULT_TRANSPORT_ARCHIVE))
+        if transport_mode == 'record':
+            _LOGGER.warning("Recording CLP traffic to %s", archive)
+            session = RecordingSession(hass, session, archive)
+        elif transport_mode == 'replay':
+            _LOGGER.warning("Replaying CLP traffic from %s", archive)
+            session = await hass.async_add_executor_job(ReplaySession.load, archive)
+
+    # Token state is kept per config entry, so several CLP accounts can run side by side
+    entry_id = discovery_info.get("entry_id")
+    entry_state = hass.data[DOMAIN].setdefault("entries", {}).setdefault(entry_id, {})
+    entry_state["session"] = session
     # Set tokens on restart (if not already set)
     for k in ("access_token", "refresh_token", "access_token_expiry_time"):
         if discovery_info.get(k) is not None and discovery_info.get(k) != "":
-            hass.data[DOMAIN][k] = discovery_info.get(k)
-    hass.data[DOMAIN]["token_lock"] = asyncio.Lock()
+            entry_state[k] = discovery_info.get(k)
+    metrics = entry_state.setdefault("metrics", Metrics())
+    clock = hass.data[DOMAIN].setdefault("clock", Clock())
+    entry_state.setdefault("tasks", BackgroundTasks(hass, clock=clock))
+
+    # One scheduler for every request to CLP, whichever sensor or entry makes it.
+    # The strictest rate limit among the entries applies to all of them.
+    rate = int(discovery_info.get(CONF_RATE_LIMIT, 20)) / 60
+    burst = int(discovery_info.get(CONF_RATE_BURST, 10))
+    if "scheduler" not in hass.data[DOMAIN]:
+        hass.data[DOMAIN]["scheduler"] = RequestScheduler(rate=rate, burst=burst, max_in_flight=MAX_IN_FLIGHT, clock=clock)
+    hass.data[DOMAIN]["scheduler"].set_limits(entry_id, rate=rate, burst=burst)
+    hass.data[DOMAIN].setdefault("circuits", {})
+    hass.data[DOMAIN].setdefault("latency", {})
+
+    main_data = CLPData(
+        hass=hass,
+        entry_id=entry_id,
+        sensor_type='main',
+        name=discovery_info.get(CONF_NAME, "CLP"),
+        email=discovery_info.get("email_address", discovery_info.get("email", None)),
+        timeout=int(discovery_info.get(CONF_TIMEOUT, 30)),
+        retry_delay=int(discovery_info.get(CONF_RETRY_DELAY, 300)),
+        api_base_url=discovery_info.get(CONF_API_BASE_URL, API_BASE_URL),
+        hedge_requests=discovery_info.get(CONF_HEDGE_REQUESTS, False),
+        series_attributes=discovery_info.get(CONF_SERIES_ATTRIBUTES, True),
+        type=discovery_info.get(CONF_TYPE, ""),
+        get_acct=discovery_info.get(CONF_GET_ACCT, False),
+        get_bill=discovery_info.get(CONF_GET_BILL, False),
+        get_estimation=discovery_info.get(CONF_GET_ESTIMATION, False),
+        get_bimonthly=discovery_info.get(CONF_GET_BIMONTHLY, False),
+        get_daily=discovery_info.get(CONF_GET_DAILY, False),
+        get_hourly=discovery_info.get(CONF_GET_HOURLY, False),
+        get_hourly_days=int(discovery_info.get(CONF_GET_HOURLY_DAYS, 1)),
+        hourly_interval=int(discovery_info.get(CONF_HOURLY_INTERVAL, 30)),
+        backfill_days=int(discovery_info.get(CONF_BACKFILL_DAYS, 0)),
+        daily_interval=int(discovery_info.get(CONF_DAILY_INTERVAL, 720)),
+        clock=clock,
+        metrics=metrics,
+    )
+    # Login runs in the background and is shared by both sensors of the entry
+    entry_state["auth"] = AuthManager(
+        hass,
+        has_token=lambda: bool(entry_state.get("access_token")),
+        request_otp=main_data.async_request_otp,
+        verify_otp=main_data.async_verify_otp,
+        retry_delay=datetime.timedelta(seconds=int(discovery_info.get(CONF_RETRY_DELAY, 300))),
+        clock=clock,
+    )
+    entry_state["data"] = [main_data]
+
+    if discovery_info.get(CONF_RES_ENABLE, False):
+        renewable_data = CLPData(
+            hass=hass,
+            entry_id=entry_id,
+            sensor_type='renewable_energy',
+            name=discovery_info.get(CONF_RES_NAME, "CLP Renewable Energy"),
+            email=discovery_info.get("email_address", discovery_info.get("email", None)),
+            timeout=int(discovery_info.get(CONF_TIMEOUT, 30)),
+            retry_delay=int(discovery_info.get(CONF_RETRY_DELAY, 300)),
+            api_base_url=discovery_info.get(CONF_API_BASE_URL, API_BASE_URL),
+            hedge_requests=discovery_info.get(CONF_HEDGE_REQUESTS, False),
+            series_attributes=discovery_info.get(CONF_SERIES_ATTRIBUTES, True),
+            type=discovery_info.get(CONF_RES_TYPE, ""),
+            get_acct=False,
+            get_bill=discovery_info.get(CONF_RES_GET_BILL, False),
+            get_estimation=False,
+            get_bimonthly=False,
+            get_daily=discovery_info.get(CONF_RES_GET_DAILY, False),
+            get_hourly=discovery_info.get(CONF_RES_GET_HOURLY, False),
+            get_hourly_days=int(discovery_info.get(CONF_RES_GET_HOURLY_DAYS, 1)),
+            hourly_interval=int(discovery_info.get(CONF_HOURLY_INTERVAL, 30)),
+            backfill_days=int(discovery_info.get(CONF_BACKFILL_DAYS, 0)),
+            daily_interval=int(discovery_info.get(CONF_DAILY_INTERVAL, 720)),
+            clock=clock,
+            metrics=metrics,
+        )
+        entry_state["data"].append(renewable_data)
+
+    for data in entry_state["data"]:
+        data.async_start()
+    # The data keeps fetching for the data entities when the main sensor is disabled
+    async_add_entities([CLPSensor(data) for data in entry_state["data"]])
+
+    async_add_entities(
+        [
+            CLPDataSensor(
+                entry_id=entry_id,
+                source=data,
+                description=description,
+            )
+            for data in entry_state["data"]
+            for description in DATA_SENSORS
+            if description.sensor_type == data.sensor_type
+        ]
+    )
 
     async_add_entities(
         [
-            CLPSensor(
+            CLPMetricSensor(
                 hass=hass,
-                sensor_type='main',
+                entry_id=entry_id,
                 name=discovery_info.get(CONF_NAME, "CLP"),
-                email=discovery_info.get("email_address", discovery_info.get("email", None)),
-                timeout=int(discovery_info.get(CONF_TIMEOUT, 30)),
-                retry_delay=int(discovery_info.get(CONF_RETRY_DELAY, 300)),
-                type=discovery_info.get(CONF_TYPE, ""),
-                get_acct=discovery_info.get(CONF_GET_ACCT, False),
-                get_bill=discovery_info.get(CONF_GET_BILL, False),
-                get_estimation=discovery_info.get(CONF_GET_ESTIMATION, False),
-                get_bimonthly=discovery_info.get(CONF_GET_BIMONTHLY, False),
-                get_daily=discovery_info.get(CONF_GET_DAILY, False),
-                get_hourly=discovery_info.get(CONF_GET_HOURLY, False),
-                get_hourly_days=int(discovery_info.get(CONF_GET_HOURLY_DAYS, 1)),
-            ),
-        ],
-        update_before_add=True,
+                metrics=metrics,
+                description=description,
+            )
+            for description in METRIC_SENSORS
+        ]
     )
 
-    if discovery_info.get(CONF_RES_ENABLE, False):
-        async_add_entities(
-            [
-                CLPSensor(
-                    hass=hass,
-                    sensor_type='renewable_energy',
-                    name=discovery_info.get(CONF_RES_NAME, "CLP Renewable Energy"),
-                    email=discovery_info.get("email_address", discovery_info.get("email", None)),
-                    timeout=int(discovery_info.get(CONF_TIMEOUT, 30)),
-                    retry_delay=int(discovery_info.get(CONF_RETRY_DELAY, 300)),
-                    type=discovery_info.get(CONF_RES_TYPE, ""),
-                    get_acct=False,
-                    get_bill=discovery_info.get(CONF_RES_GET_BILL, False),
-                    get_estimation=False,
-                    get_bimonthly=False,
-                    get_daily=discovery_info.get(CONF_RES_GET_DAILY, False),
-                    get_hourly=discovery_info.get(CONF_RES_GET_HOURLY, False),
-                    get_hourly_days=int(discovery_info.get(CONF_RES_GET_HOURLY_DAYS, 1)),
-                ),
-            ],
-            update_before_add=True,
-        )
-
 
 async def async_setup_entry(
         hass: HomeAssistant,
@@ -178,7 +361,7 @@ async def async_setup_entry(
 ) -> None:
     """Set up the sensor platform from a config entry."""
     # Merge config_entry.data and config_entry.options, options take precedence
-    merged = {**config_entry.data, **config_entry.options}
+    merged = {**config_entry.data, **config_entry.options, "entry_id": config_entry.entry_id}
     await async_setup_platform(
         hass,
         {},
@@ -187,15 +370,20 @@ async def async_setup_entry(
     )
 
 
-def get_dates(timezone):
+def get_dates(timezone, now: datetime.datetime | None = None):
+    # Imported here, dateutil is only needed once the first update runs
+    from dateutil import relativedelta
+
+    if now is None:
+        now = datetime.datetime.now(timezone)
     return {
-        "yesterday": datetime.datetime.now(timezone) + datetime.timedelta(days=-1),
-        "today": datetime.datetime.now(timezone),
-        "tomorrow": datetime.datetime.now(timezone) + datetime.timedelta(days=1),
-        "one_year_two_months_ago": (datetime.datetime.now(timezone) - relativedelta.relativedelta(years=1, months=2)).replace(day=datetime.datetime.now(timezone).day),
-        "last_month": (datetime.datetime.now(timezone).replace(day=1) + relativedelta.relativedelta(months=-1)),
-        "this_month": datetime.datetime.now(timezone).replace(day=1),
-        "next_month": (datetime.datetime.now(timezone).replace(day=1) + relativedelta.relativedelta(months=1)),
+        "yesterday": now + datetime.timedelta(days=-1),
+        "today": now,
+        "tomorrow": now + datetime.timedelta(days=1),
+        "one_year_two_months_ago": now - relativedelta.relativedelta(years=1, months=2),
+        "last_month": (now.replace(day=1) + relativedelta.relativedelta(months=-1)),
+        "this_month": now.replace(day=1),
+        "next_month": (now.replace(day=1) + relativedelta.relativedelta(months=1)),
     }
 
 
@@ -235,33 +423,56 @@ def handle_errors(func):
         except Exception as e:
             error_msg = str(e)
             self._error = error_msg
-            _LOGGER.error(f"{self._name} ERROR: {error_msg}", exc_info=True)
+            tasks = self._tasks
+            if tasks is None:
+                # Entry unloaded under the request, its state is gone and nothing is retried
+                _LOGGER.debug("%s: %s ended after unload: %s", self._name, func.__name__, error_msg)
+                return None
+            if isinstance(e, CircuitOpenError):
+                _LOGGER.warning("%s: %s", self._name, error_msg)
+            else:
+                _LOGGER.error("%s ERROR: %s", self._name, error_msg, exc_info=True)
 
             if isinstance(e, FatalAuthError):
                 _LOGGER.error("%s: Fatal auth error. Integration has been stopped.", self._name)
                 return None
-            
-            # Schedule next retry with exponential backoff
+
+            # Schedule next retry with exponential backoff, unless one is already pending
             next_retry_delay = self._backoff.increment()
-            _LOGGER.info(f"{self._name}: Scheduling retry in {next_retry_delay} seconds")
-            async_call_later(self.hass, next_retry_delay, self.async_update)
+            if tasks.async_call_later(next_retry_delay, self.async_update, f"{DOMAIN} retry {self._name}"):
+                self._metrics.retries_scheduled += 1
+                _LOGGER.info("%s: Scheduling retry in %s seconds", self._name, next_retry_delay)
             
             return None
 
     return wrapper
 
 
-class CLPSensor(SensorEntity):
-    _timezone = pytz.timezone('Asia/Hong_Kong')
+class CLPData:
+    """Fetch and hold the data of one sensor type of an entry, for the entities reading it.
+
+    The main :class:`CLPSensor` reads its state and attributes from here and
+    the :class:`CLPDataSensor` entities one value each. Listeners are called
+    after an update cycle only for what changed. Home Assistant polls the
+    main sensor, which runs :meth:`async_update`; while the main sensor is
+    disabled the data polls by itself for the other entities, and a new
+    reader with nothing to show yet gets a fetch straight away.
+    """
+
+    _timezone = HKT
 
     def __init__(
             self,
             hass,
+            entry_id: str | None,
             sensor_type: str,
             name: str,
             email: str,
             timeout: int,
             retry_delay: int,
+            api_base_url: str = API_BASE_URL,
+            hedge_requests: bool = False,
+            series_attributes: bool = True,
             type: str = None,
             get_acct: bool = False,
             get_bill: bool = False,
@@ -270,14 +481,26 @@ class CLPSensor(SensorEntity):
             get_daily: bool = False,
             get_hourly: bool = False,
             get_hourly_days: int = 1,
+            hourly_interval: int = 30,
+            daily_interval: int = 720,
+            backfill_days: int = 0,
+            clock: Clock | None = None,
+            metrics: Metrics | None = None,
     ) -> None:
-        _LOGGER.debug(f"[SENSOR INIT] type={sensor_type}, name={name}, email={email}, tokens={{'access_token': {getattr(self, '_access_token', None)}, 'expiry': {getattr(self, '_access_token_expiry_time', None)}}}")
+        _LOGGER.debug("[DATA INIT] type=%s name=%s", sensor_type, name)
         self.hass = hass
+        self._entry_id = entry_id
+        # Held directly, so a request finishing after an unload still has somewhere to count
+        self._metrics = metrics if metrics is not None else Metrics()
+        self._clock = clock or Clock()
         self._sensor_type = sensor_type
         self._name = name
         self._email = email
         self._timeout = timeout
         self._retry_delay = retry_delay
+        self._api_base_url = api_base_url.rstrip('/')
+        self._hedge_requests = hedge_requests
+        self._series_attributes = series_attributes
         self._type = type
         self._get_acct = get_acct
         self._get_bill = get_bill
@@ -289,12 +512,10 @@ class CLPSensor(SensorEntity):
         self._account_number = None
         self._state_data_type = None
         self._error = None
-        self._attr_device_class = SensorDeviceClass.ENERGY
-        self._attr_native_value = None
-        self._attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
-        self._attr_state_class = SensorStateClass.TOTAL
-        self._attr_name = name
-        self._attr_unique_id = f"clphk_{sensor_type}_{name.replace(' ', '_').lower()}"
+        self._native_value = None
+        self._last_reset = None
+        # Unique ID of the main sensor reading this data
+        self.key = f"clphk_{entry_id}_{sensor_type}"
 
         self._account = None
         self._bills = None
@@ -304,26 +525,164 @@ class CLPSensor(SensorEntity):
         self._hourly = None
 
         self._single_task_last_fetch_time = None
-        self._hourly_task_last_fetch_time = None
         self._daily_task_last_fetch_time = None
+        self._daily_task_interval = datetime.timedelta(minutes=daily_interval)
+        self._hourly_tracker = PublicationTracker(
+            period=datetime.timedelta(hours=1),
+            default_lag=HOURLY_PUBLICATION_LAG,
+            sparse_interval=datetime.timedelta(minutes=hourly_interval),
+            dense_interval=MIN_TIME_BETWEEN_UPDATES,
+            dense_window=HOURLY_DENSE_WINDOW,
+        )
+        self._daily_tracker = PublicationTracker(
+            period=datetime.timedelta(days=1),
+            default_lag=DAILY_PUBLICATION_LAG,
+            sparse_interval=datetime.timedelta(minutes=daily_interval),
+            dense_interval=DAILY_DENSE_INTERVAL,
+            dense_window=DAILY_DENSE_WINDOW,
+        )
+        self._negative_cache = NegativeCache(
+            min_delay=NEGATIVE_CACHE_MIN_DELAY,
+            max_delay=NEGATIVE_CACHE_MAX_DELAY,
+        )
+        self._backfill_days = backfill_days
+        self._backfill_hold = NegativeCache(
+            min_delay=BACKFILL_HOLD_MIN_DELAY,
+            max_delay=BACKFILL_HOLD_MAX_DELAY,
+        )
+        self._backfill_last_run = None
+        self._backfill_task = None
         self._4xx_error_retry = 0
+        # Held for the whole of an update cycle, so two never fetch at once
+        self._update_lock = asyncio.Lock()
+        self._last_update = None
 
-    @property
-    def unique_id(self):
-        return self._attr_unique_id
+        self._consumers = {source: [] for source in DATA_SOURCES}
+        # Listeners of the main sensor, whose state needs data while it is enabled
+        self._state_listeners = []
+        # Sources whose first consumer arrived after the last fetch; fetched in the next cycle
+        self._first_fetch = set()
 
     @property
     def name(self):
-        return self._attr_name
+        return self._name
 
     @property
-    def state(self):
-        return self._attr_native_value
+    def sensor_type(self):
+        return self._sensor_type
 
     @property
-    def _token_state(self):
+    def native_value(self):
+        return self._native_value
+
+    @property
+    def last_reset(self):
+        return self._last_reset
+
+    @property
+    def _state_consumed(self) -> bool:
+        return bool(self._state_listeners)
+
+    @callback
+    def async_start(self):
+        """Refresh as soon as a login completes. The login is dropped with the entry, and the listener with it."""
+        self._auth.async_add_listener(self._async_auth_changed)
+
+    @callback
+    def _async_auth_changed(self, state: str):
+        # Refresh straight away instead of waiting for the next poll
+        if state == AUTHENTICATED and self._tasks is not None:
+            self._tasks.async_create(self.async_update_now(), f"{DOMAIN} update {self._name}")
+
+    def data(self, source: str) -> Any:
+        """Return the latest data of ``source``, one of :data:`DATA_SOURCES`, or None."""
+        return getattr(self, f"_{source}", None)
+
+    @callback
+    def async_add_state_listener(self, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        """Keep the state of the main sensor up to date from now on and call ``listener`` whenever it changes."""
+        self._state_listeners.append(listener)
+        if self._state_data_type is None:
+            self._request_fetch()
+
+        @callback
+        def remove():
+            self._state_listeners.remove(listener)
+            self._schedule_poll()
+
+        return remove
+
+    @callback
+    def async_add_consumer(self, source: str, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        """Fetch ``source`` from now on and call ``listener`` whenever it changes."""
+        self._consumers[source].append(listener)
+        if self.data(source) is None:
+            self._first_fetch.add(source)
+            self._request_fetch()
+        self._schedule_poll()
+
+        @callback
+        def remove():
+            self._consumers[source].remove(listener)
+
+        return remove
+
+    def _request_fetch(self):
+        """Fetch for a new reader with nothing to show yet, instead of at the next poll.
+
+        Readers added together share one fetch. It runs after setup instead of
+        holding it up on CLP, as a task of the entry so an unload cancels it.
+        """
+        tasks = self._tasks
+        if tasks is not None:
+            tasks.async_call_later(0, self.async_update_now, f"{DOMAIN} first update {self._name}")
+
+    def _schedule_poll(self):
+        """Poll on behalf of the data entities while the main sensor is disabled, as nothing else updates them."""
+        tasks = self._tasks
+        if self._state_consumed or tasks is None or not any(self._consumers.values()):
+            return
+        tasks.async_call_later(MIN_TIME_BETWEEN_UPDATES.total_seconds(), self._async_poll, f"{DOMAIN} poll {self._name}")
+
+    async def _async_poll(self):
+        if self._state_consumed:
+            return
+        self._schedule_poll()
+        await self.async_update()
+
+    def _wants(self, source: str) -> bool:
+        """Whether ``source`` is kept, for the attributes or for an enabled data entity."""
+        flags = {
+            "account": self._get_acct,
+            "bills": self._get_bill,
+            "estimation": self._get_estimation,
+            "bimonthly": self._get_bimonthly,
+            "daily": self._get_daily,
+            "hourly": self._get_hourly,
+        }
+        return flags[source] or bool(self._consumers[source])
+
+    def _needed(self, fetch: Fetch) -> bool:
+        """Whether an enabled entity or attribute reads the result of ``fetch``."""
+        if self._wants(fetch.source):
+            return True
+        return self._state_consumed and fetch.state_type is not None and self._type.upper() == fetch.state_type
+
+    def _now(self) -> datetime.datetime:
+        return self._clock.now(self._timezone)
+
+    @property
+    def _domain_state(self):
         return self.hass.data[DOMAIN]
 
+    @property
+    def _token_state(self):
+        return self._domain_state["entries"][self._entry_id]
+
+    @property
+    def _config_entry(self):
+        return self.hass.config_entries.async_get_entry(self._entry_id) if self._entry_id else None
+
     @property
     def _access_token(self):
         return self._token_state.get("access_token")
@@ -348,12 +707,218 @@ class CLPSensor(SensorEntity):
     def _access_token_expiry_time(self, value):
         self._token_state["access_token_expiry_time"] = value
 
+    @property
+    def _tasks(self) -> BackgroundTasks | None:
+        """Background tasks of the entry, or None once the entry is unloaded."""
+        return self.hass.data.get(DOMAIN, {}).get("entries", {}).get(self._entry_id, {}).get("tasks")
+
+    @property
+    def _auth(self) -> AuthManager:
+        return self._token_state["auth"]
+
     @property
     def _session(self):
         return self._token_state["session"]
 
     @property
-    def extra_state_attributes(self) -> dict:
+    def _scheduler(self) -> RequestScheduler:
+        return self._domain_state["scheduler"]
+
+    def _circuit(self, url: str) -> CircuitBreaker:
+        circuits = self._domain_state["circuits"]
+        endpoint = endpoint_of(url)
+        if endpoint not in circuits:
+            circuits[endpoint] = CircuitBreaker(clock=self._clock)
+        return circuits[endpoint]
+
+    def _latency(self, url: str, json: dict = None) -> LatencyTracker:
+        # consumption/history is much slower in Bill mode than in Hourly mode, so track modes apart
+        key = endpoint_of(url)
+        if json and json.get("mode"):
+            key = f"{key}:{json['mode']}"
+        trackers = self._domain_state["latency"]
+        if key not in trackers:
+            trackers[key] = LatencyTracker()
+        return trackers[key]
+
+    def archive(self, series: str) -> SeriesArchive | None:
+        """Return the archive of ``series`` for the current account, once it is known."""
+        if not self._account_number:
+            return None
+        archives = self._token_state.setdefault("archives", {})
+        key = (self._account_number, series)
+        if key not in archives:
+            # Entries logged in to the same account write the same file, so they share one archive and its lock
+            path = self.hass.config.path(STORAGE_DIR, ARCHIVE_DIR, f"{self._account_number}_{series}.bin")
+            shared = self._domain_state.setdefault("archives", {})
+            if path not in shared:
+                shared[path] = SeriesArchive(path)
+            archives[key] = shared[path]
+        return archives[key]
+
+    async def _archive_rows(self, series: str, rows: list[tuple[str, float, int]]):
+        """Write ``(startDate, kwh, flags)`` rows as returned by CLP to the series archive."""
+        archive = self.archive(series)
+        if archive is None or not rows:
+            return
+        records = [
+            (int(datetime.datetime.strptime(start, '%Y%m%d%H%M%S').replace(tzinfo=self._timezone).timestamp()), float(kwh or 0), flags)
+            for start, kwh, flags in rows
+            if start
+        ]
+        try:
+            await self.hass.async_add_executor_job(archive.write, records)
+        except (OSError, ValueError) as e:
+            _LOGGER.warning("%s: Could not write %s archive: %s", self._name, series, e)
+
+    def cached(self, series: str) -> list[dict]:
+        """Return the ``bimonthly``, ``bills``, ``payments`` or ``fit`` rows held in memory."""
+        bills = getattr(self, '_bills', None)
+        if series == 'bimonthly':
+            return getattr(self, '_bimonthly', None) or []
+        if series in ('bills', 'payments') and isinstance(bills, dict):
+            return bills['bill' if series == 'bills' else 'payment']
+        if series == 'fit' and isinstance(bills, list):
+            return bills
+        return []
+
+    async def async_fetch_hourly_day(self, day: datetime.date, priority: int = PRIORITY_DEFAULT) -> int:
+        """Fetch the hourly readings of ``day`` into the archive, leaving the state alone.
+
+        A 4xx response fails the fetch but keeps the tokens of the entry.
+        Returns the number of validated readings CLP sent back.
+        """
+        if self._sensor_type == 'renewable_energy':
+            response = await self.api_request(
+                method="POST",
+                url=self._api_base_url + API_PATH_RENEW_DASHBOARD,
+                headers={
+                    "Authorization": self._access_token,
+                },
+                json={
+                    "caNo": self._account_number,
+                    "mode": "H",
+                    "startDate": day.strftime("%m/%d/%Y"),
+                },
+                priority=priority,
+                clear_tokens=False,
+            )
+            rows = (response['data'] or {}).get('consumptionData') or []
+            await self._archive_rows('renewable_hourly', [
+                (row['startdate'], row['kwhtotal'], 0 if row['validateStatus'] == 'Y' else FLAG_UNVALIDATED)
+                for row in rows
+            ])
+            return sum(1 for row in rows if row['validateStatus'] == 'Y')
+
+        response = await self.api_request(
+            method="POST",
+            url=self._api_base_url + API_PATH_CONSUMPTION_HISTORY,
+            headers={
+                "Authorization": self._access_token,
+            },
+            json={
+                "ca": self._account_number,
+                "fromDate": day.strftime("%Y%m%d000000"),
+                "mode": "Hourly",
+                "toDate": (day + datetime.timedelta(days=1)).strftime("%Y%m%d000000"),
+                "type": "Unit",
+            },
+            priority=priority,
+            clear_tokens=False,
+        )
+        rows = (response['data'] or {}).get('results') or []
+        await self._archive_rows('hourly', [(row['startDate'], row['kwhTotal'], 0) for row in rows])
+        return len(rows)
+
+    def _schedule_backfill(self):
+        """Start a backfill in the background when one is due and none is running."""
+        if not self._backfill_days or self._backfill_task is not None:
+            return
+        if not (self._wants('hourly') or (self._state_consumed and self._type.upper() in ('', 'HOURLY'))):
+            return
+        now = self._now()
+        if self._backfill_last_run and now < self._backfill_last_run + BACKFILL_INTERVAL:
+            return
+
+        tasks = self._tasks
+        if tasks is None:
+            return
+        self._backfill_last_run = now
+        self._backfill_task = tasks.async_create(self._async_backfill(), f"{DOMAIN} backfill {self._name}")
+        if self._backfill_task is not None:
+            self._backfill_task.add_done_callback(lambda _: setattr(self, '_backfill_task', None))
+
+    async def _async_backfill(self):
+        """Refetch the days of the last ``backfill_days`` with missing or unvalidated hours, newest first."""
+        series = 'renewable_hourly' if self._sensor_type == 'renewable_energy' else 'hourly'
+        archive = self.archive(series)
+        latest = self._hourly_tracker.latest_start
+        if archive is None or latest is None:
+            return
+
+        end = int(latest.timestamp()) + 3600
+        start = end - self._backfill_days * 86400
+        gaps = await self.hass.async_add_executor_job(find_gaps, archive, start, end)
+        now = self._now()
+        days = [
+            day for day in reversed(gap_days(gaps))
+            if not self._backfill_hold.is_suppressed(('backfill', day), now)
+        ][:BACKFILL_MAX_DAYS]
+
+        for day in days:
+            try:
+                await self.async_fetch_hourly_day(day, priority=PRIORITY_BACKGROUND)
+            except Exception as e:
+                _LOGGER.debug("%s: Backfill of %s stopped: %s", self._name, day, e)
+                return
+            self._metrics.backfilled_days += 1
+
+            remaining = await self.hass.async_add_executor_job(
+                find_gaps, archive, max(start, day_start(day)), min(end, day_start(day + datetime.timedelta(days=1)))
+            )
+            if remaining:
+                delay = self._backfill_hold.record(('backfill', day), self._now())
+                _LOGGER.debug("%s: %s still has %s gaps after backfill, holding off for %s.", self._name, day, len(remaining), delay)
+            else:
+                self._backfill_hold.clear(('backfill', day))
+
+    async def _send(self, latency: LatencyTracker, hedge_delay: float | None, **kwargs):
+        """Send a request, hedging it with a second copy if the first is slower than usual."""
+        if hedge_delay is None:
+            return await self._session.request(**kwargs)
+
+        primary = asyncio.create_task(self._session.request(**kwargs))
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+        if done or not self._scheduler.try_acquire():
+            return await primary
+
+        latency.hedged += 1
+        hedge = asyncio.create_task(self._session.request(**kwargs))
+        tasks = (primary, hedge)
+        winner = None
+        last_error = None
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    winner = await next_done
+                    break
+                except aiohttp.ClientError as ex:
+                    last_error = ex
+            else:
+                raise last_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled() and task.exception() is None and task.result() is not winner:
+                    task.result().release()
+
+        if hedge.done() and not hedge.cancelled() and hedge.exception() is None and hedge.result() is winner:
+            latency.hedge_wins += 1
+        return winner
+
+    def attributes(self) -> dict:
+        """Return the attributes of the main sensor."""
         attr = {
             "state_data_type": self._state_data_type,
             "error": self._error,
@@ -362,19 +927,19 @@ class CLPSensor(SensorEntity):
         if self._get_acct and hasattr(self, '_account'):
             attr["account"] = self._account
 
-        if self._get_bill and hasattr(self, '_bills'):
+        if self._series_attributes and self._get_bill and hasattr(self, '_bills'):
             attr["bills"] = self._bills
 
         if self._get_estimation and hasattr(self, '_estimation'):
             attr["estimation"] = self._estimation
 
-        if self._get_bimonthly and hasattr(self, '_bimonthly'):
+        if self._series_attributes and self._get_bimonthly and hasattr(self, '_bimonthly'):
             attr["bimonthly"] = self._bimonthly
 
-        if self._get_daily and hasattr(self, '_daily'):
+        if self._series_attributes and self._get_daily and hasattr(self, '_daily'):
             attr["daily"] = self._daily
 
-        if self._get_hourly and hasattr(self, '_hourly'):
+        if self._series_attributes and self._get_hourly and hasattr(self, '_hourly'):
             attr["hourly"] = self._hourly
 
         return attr
@@ -388,12 +953,15 @@ class CLPSensor(SensorEntity):
             json: dict = None,
             params: dict = None,
             retry_on_expired: bool = True,
+            priority: int = PRIORITY_DEFAULT,
+            clear_tokens: bool = True,
     ):
         if not self._access_token and 'eligibilityCheckAndLogin' not in url and 'refresh_token' not in url:
             raise Exception("Problematic authorization. Please configure again, or change your IP address.")
 
-        if json:
-            _LOGGER.debug(f"REQUEST {method} {headers} {url} {params} {json}")
+        debug = _LOGGER.isEnabledFor(logging.DEBUG)
+        if debug and json:
+            _LOGGER.debug("REQUEST method=%s url=%s headers=%s params=%s json=%s", method, url, Payload(headers), Payload(params), Payload(json))
 
         merged_headers = dict(API_DEFAULT_HEADERS)
         if json is not None:
@@ -401,113 +969,201 @@ class CLPSensor(SensorEntity):
         if headers:
             merged_headers.update(headers)
 
-        async with asyncio.timeout(self._timeout):
-            response = await self._session.request(
-                method,
-                url,
-                headers=merged_headers,
-                params=params,
-                json=json,
-            )
-
+        circuit = self._circuit(url)
+        if not circuit.allow():
+            raise CircuitOpenError(f"{endpoint_of(url)} is failing, skipping request for {circuit.retry_in():.0f}s")
+
+        is_auth = 'eligibilityCheckAndLogin' in url or 'refresh_token' in url
+        endpoint = endpoint_of(url)
+        latency = self._latency(url, json)
+        timeout = latency.timeout(self._timeout)
+        hedge_delay = latency.hedge_delay() if self._hedge_requests and method == "GET" else None
+        elapsed = None
+        body_error = None
+        # The slot is held until the body is read, and released before any token refresh and retry
+        async with self._scheduler.slot(PRIORITY_AUTH if is_auth else priority, self._entry_id) as waited:
+            if waited > 1:
+                _LOGGER.debug("Request scheduler held %s for %.1fs", url, waited)
             try:
-                response.raise_for_status()
-            except aiohttp.ClientResponseError as e:
-                error_message = f"{e.status} {e.request_info.url}"
-                error_data = None
-                
-                try:
-                    # Try to read the response content only once and store it
-                    error_content = await response.text()
+                async with asyncio.timeout(timeout):
+                    started = time.monotonic()
+                    response = await self._send(
+                        latency,
+                        hedge_delay,
+                        method=method,
+                        url=url,
+                        headers=merged_headers,
+                        params=params,
+                        json=json,
+                    )
+                    elapsed = time.monotonic() - started
+                    latency.record(elapsed)
                     try:
-                        error_data = jsonlib.loads(error_content)
-                        error_message += f" : {error_data}"
-                    except jsonlib.JSONDecodeError:
-                        error_message += f" : {error_content}"
-                except Exception as read_error:
-                    error_message += f" (Failed to read error response: {read_error})"
-                
-                _LOGGER.error(error_message)
-
-                if 400 <= e.status < 500:
-                    # Attempt token refresh on:
-                    # - Known expiry codes: 906 (token expired), 100001 (LR access_token error)
-                    # - 403 with unreadable body (connection closed before response could be read)
-                    error_code = error_data.get("code") if isinstance(error_data, dict) else None
-                    should_refresh = (
-                        retry_on_expired
-                        and "refresh_token" not in url
-                        and self._refresh_token
-                        and (
-                            error_code in (906, 100001)
-                            or (e.status == 403 and error_data is None)
-                        )
+                        raw = await response.read()
+                    except aiohttp.ClientError as ex:
+                        # An error status with an unreadable body is dealt with below
+                        if response.status < 400:
+                            raise
+                        raw, body_error = None, ex
+            except TimeoutError:
+                # Count the timeout as a slow sample so a too tight timeout widens again
+                if elapsed is None:
+                    latency.record(timeout)
+                circuit.record_failure()
+                self._metrics.record_error(endpoint, "timeout")
+                raise
+            except aiohttp.ClientError:
+                circuit.record_failure()
+                self._metrics.record_error(endpoint, "connection")
+                raise
+        self._metrics.record_request(endpoint, response.status, elapsed)
+        if response.status >= 500:
+            circuit.record_failure()
+        else:
+            circuit.record_success()
+
+        try:
+            response.raise_for_status()
+        except aiohttp.ClientResponseError as e:
+            # The endpoint, as the URL carries the CA number in its query
+            error_message = f"{e.status} {endpoint}"
+            error_data = None
+
+            if raw is None:
+                error_message += f" (Failed to read error response: {body_error})"
+            else:
+                error_content = raw.decode(errors="replace")
+                try:
+                    error_data = jsonlib.loads(error_content)
+                    error_message += f" : {Payload(error_data)}"
+                except jsonlib.JSONDecodeError:
+                    error_message += f" : {Payload(error_content)}"
+
+            _LOGGER.error(error_message)
+
+            if 400 <= e.status < 500:
+                # Attempt token refresh on:
+                # - Known expiry codes: 906 (token expired), 100001 (LR access_token error)
+                # - 403 with unreadable body (connection closed before response could be read)
+                error_code = error_data.get("code") if isinstance(error_data, dict) else None
+                should_refresh = (
+                    retry_on_expired
+                    and "refresh_token" not in url
+                    and self._refresh_token
+                    and (
+                        error_code in (906, 100001)
+                        or (e.status == 403 and error_data is None)
+                    )
+                )
+                if should_refresh:
+                    _LOGGER.debug("Access token likely expired (status=%s, code=%s, body_readable=%s). Refreshing and retrying once.", e.status, error_code, error_data is not None)
+                    await self._refresh_access_token(expired=(headers or {}).get("Authorization"))
+                    retry_headers = dict(headers or {})
+                    if "Authorization" in retry_headers:
+                        retry_headers["Authorization"] = self._access_token
+                    return await self.api_request(
+                        method=method,
+                        url=url,
+                        headers=retry_headers,
+                        json=json,
+                        params=params,
+                        retry_on_expired=False,
+                        priority=priority,
+                        clear_tokens=clear_tokens,
                     )
-                    if should_refresh:
-                        _LOGGER.debug("Access token likely expired (status=%s, code=%s, body_readable=%s). Refreshing and retrying once.", e.status, error_code, error_data is not None)
-                        await self._refresh_access_token()
-                        retry_headers = dict(headers or {})
-                        if "Authorization" in retry_headers:
-                            retry_headers["Authorization"] = self._access_token
-                        return await self.api_request(
-                            method=method,
-                            url=url,
-                            headers=retry_headers,
-                            json=json,
-                            params=params,
-                            retry_on_expired=False,
-                        )
-
-                    self._account_number = None
-                    self._access_token = None
-                    self._refresh_token = None
-                    self._access_token_expiry_time = None
-
-                    _LOGGER.debug(f"[SENSOR UPDATE] Clearing tokens from config entry.")
-                    config_entries = self.hass.config_entries.async_entries(DOMAIN)
-                    if config_entries:
-                        entry = config_entries[0]
-                        data = dict(entry.data)
-                        data["access_token"] = ""
-                        data["refresh_token"] = ""
-                        data["access_token_expiry_time"] = ""
-                        self.hass.config_entries.async_update_entry(entry, data=data)
-
-                    raise Exception('HTTP 4xx error retry limit reached')
-                    
-                raise e
 
-            try:
-                response_data = await response.json()
+                if not clear_tokens:
+                    # Extra fetches (missing days, backfill) must not log the entry out
+                    raise Exception(f'HTTP {e.status} error') from None
 
-                if not response_data or 'data' not in response_data:
-                    _LOGGER.error(f"RESPONSE {response.status} {response.url} : {response_data}")
-                    raise ValueError('Invalid response data')
+                self._account_number = None
+                self._access_token = None
+                self._refresh_token = None
+                self._access_token_expiry_time = None
 
-                _LOGGER.debug(f"RESPONSE {response.status} {response.url} : {response_data}")
+                _LOGGER.debug("[SENSOR UPDATE] Clearing tokens from config entry.")
+                self._persist_tokens(flush=True)
 
-                return response_data
-            except Exception as _:
-                response_text = await response.text()
-                _LOGGER.error(f"{response.status} {response.url} : {response_text}")
-                raise
+                raise Exception('HTTP 4xx error retry limit reached') from None
 
-    async def _refresh_access_token(self):
-        """Refresh access token using stored refresh token and persist it."""
+            # Raised without the aiohttp error, whose URL carries the CA number
+            raise Exception(f'HTTP {e.status} error') from None
+
+        self._metrics.record_bytes(endpoint, len(raw))
+        try:
+            response_data = jsonlib.loads(raw)
+        except ValueError:
+            _LOGGER.error("RESPONSE status=%s endpoint=%s : %s", response.status, endpoint, Payload(raw))
+            raise
+
+        if not isinstance(response_data, dict) or 'data' not in response_data:
+            _LOGGER.error("RESPONSE status=%s endpoint=%s : %s", response.status, endpoint, Payload(response_data))
+            raise ValueError('Invalid response data')
+
+        if debug:
+            if _PAYLOAD_SAMPLER(endpoint):
+                _LOGGER.debug("RESPONSE status=%s endpoint=%s bytes=%d elapsed=%.3f : %s", response.status, endpoint, len(raw), elapsed, Payload(response_data))
+            else:
+                _LOGGER.debug("RESPONSE status=%s endpoint=%s bytes=%d elapsed=%.3f", response.status, endpoint, len(raw), elapsed)
+
+        return response_data
+
+    async def _refresh_access_token(self, expired: str | None = None):
+        """Refresh access token using stored refresh token and persist it.
+
+        Sensors of an entry share its tokens and CLP only accepts a refresh
+        token once, so refreshes are serialised per entry, and a sensor
+        whose ``expired`` token was already replaced while it waited uses
+        the new one instead of refreshing again.
+        """
+        async with self._token_state.setdefault("refresh_lock", asyncio.Lock()):
+            if expired is not None and self._access_token and self._access_token != expired:
+                return
+            await self._async_refresh_access_token()
+
+    async def _async_refresh_access_token(self):
         if not self._refresh_token:
             raise Exception("No refresh token available")
 
         refresh_headers = dict(API_DEFAULT_HEADERS)
         refresh_headers["Content-Type"] = "application/json"
 
-        async with asyncio.timeout(self._timeout):
-            response = await self._session.request(
-                "POST",
-                "https://api.clp.com.hk/ts1/ms/profile/identity/manage/account/refresh_token",
-                headers=refresh_headers,
-                json={"refreshToken": self._refresh_token},
-            )
-            response_text = await response.text()
+        refresh_url = self._api_base_url + API_PATH_REFRESH_TOKEN
+        circuit = self._circuit(refresh_url)
+        if not circuit.allow():
+            raise CircuitOpenError(f"{endpoint_of(refresh_url)} is failing, skipping request for {circuit.retry_in():.0f}s")
+
+        latency = self._latency(refresh_url)
+        timeout = latency.timeout(self._timeout)
+        endpoint = endpoint_of(refresh_url)
+        async with self._scheduler.slot(PRIORITY_AUTH, self._entry_id):
+            try:
+                async with asyncio.timeout(timeout):
+                    started = time.monotonic()
+                    response = await self._session.request(
+                        "POST",
+                        refresh_url,
+                        headers=refresh_headers,
+                        json={"refreshToken": self._refresh_token},
+                    )
+                    elapsed = time.monotonic() - started
+                    latency.record(elapsed)
+                    response_text = await response.text()
+            except TimeoutError:
+                latency.record(timeout)
+                circuit.record_failure()
+                self._metrics.record_error(endpoint, "timeout")
+                raise
+            except aiohttp.ClientError:
+                circuit.record_failure()
+                self._metrics.record_error(endpoint, "connection")
+                raise
+        self._metrics.record_request(endpoint, response.status, elapsed)
+        self._metrics.record_bytes(endpoint, len(response_text))
+        if response.status >= 500:
+            circuit.record_failure()
+        else:
+            circuit.record_success()
 
         if 400 <= response.status < 500:
             await self._handle_refresh_auth_failure(response.status, response_text)
@@ -530,16 +1186,23 @@ class CLPSensor(SensorEntity):
         self._access_token = response_data['access_token']
         self._refresh_token = response_data['refresh_token']
         self._access_token_expiry_time = response_data['expires_in']
+        self._metrics.token_refreshes += 1
+
+        _LOGGER.debug("[SENSOR UPDATE] Scheduling refreshed tokens to be persisted to config entry.")
+        self._persist_tokens()
 
-        _LOGGER.debug(f"[SENSOR UPDATE] Persisting refreshed tokens to config entry.")
-        config_entries = self.hass.config_entries.async_entries(DOMAIN)
-        if config_entries:
-            entry = config_entries[0]
-            data = dict(entry.data)
-            data["access_token"] = self._access_token
-            data["refresh_token"] = self._refresh_token
-            data["access_token_expiry_time"] = self._access_token_expiry_time
-            self.hass.config_entries.async_update_entry(entry, data=data)
+    def _persist_tokens(self, flush: bool = False):
+        """Hand the current tokens to the debounced writer; cleared tokens are written at once."""
+        writer = self._token_state.get("token_writer")
+        if writer is None:
+            return
+        writer.async_schedule({
+            "access_token": self._access_token or "",
+            "refresh_token": self._refresh_token or "",
+            "access_token_expiry_time": self._access_token_expiry_time or "",
+        })
+        if flush:
+            writer.async_flush()
 
     async def _handle_refresh_auth_failure(self, status: int, body: str):
         """Clear tokens, notify frontend, and stop integration on refresh 4xx."""
@@ -547,17 +1210,11 @@ class CLPSensor(SensorEntity):
         self._access_token = None
         self._refresh_token = None
         self._access_token_expiry_time = None
+        self._persist_tokens(flush=True)
 
-        config_entries = self.hass.config_entries.async_entries(DOMAIN)
-        for entry in config_entries:
-            data = dict(entry.data)
-            data["access_token"] = ""
-            data["refresh_token"] = ""
-            data["access_token_expiry_time"] = ""
-            self.hass.config_entries.async_update_entry(entry, data=data)
-
+        entry = self._config_entry
         message = (
-            "CLPHK token refresh failed with HTTP "
+            f"CLPHK token refresh for {entry.title if entry else self._name} failed with HTTP "
             f"{status}. Tokens were cleared and the integration was stopped. "
             "Please reconfigure Access Token and Refresh Token.\n\n"
             f"Response: {body[:300]}"
@@ -569,90 +1226,46 @@ class CLPSensor(SensorEntity):
                 {
                     "title": "CLPHK Authentication Failed",
                     "message": message,
-                    "notification_id": "clphk_auth_failed",
+                    "notification_id": f"clphk_auth_failed_{self._entry_id}",
                 },
                 blocking=False,
             )
         except Exception:
             _LOGGER.warning("Failed to create persistent notification for CLPHK auth failure.")
 
-        for entry in config_entries:
+        # Not one of the entry's tasks, as the unload it runs cancels those
+        if entry and not self._token_state.get("unload_scheduled"):
+            self._token_state["unload_scheduled"] = True
             self.hass.async_create_task(self.hass.config_entries.async_unload(entry.entry_id))
 
 
-    @handle_errors
-    async def auth(self):
-        token_lock = self._token_state["token_lock"]
-        async with token_lock:
-            if not self._access_token and self.hass.states.get('sensor.clp_email_otp') is not None:
-                _LOGGER.debug("Requesting OTP")
-
-                state = self.hass.states.get('sensor.clp_email_otp')
-                original_otp = state.state if state else None
-
-                public_key = serialization.load_pem_public_key(CONF_CLP_PUBLIC_KEY.encode())
-                await self.api_request(
-                    method="POST",
-                    url="https://api.clp.com.hk/ts1/ms/profile/register/eligibilityCheckAndLogin",
-                    json={
-                        "email": base64.b64encode(public_key.encrypt(
-                            self._email.encode('utf-8'),
-                            padding.OAEP(
-                                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                                algorithm=hashes.SHA256(),
-                                label=None,
-                            )
-                        )).decode(),
-                        "phone": "",
-                        "type": base64.b64encode(public_key.encrypt(
-                            "email".encode('utf-8'),
-                            padding.OAEP(
-                                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                                algorithm=hashes.SHA256(),
-                                label=None,
-                            )
-                        )).decode(),
-                    },
-                )
-
-                await asyncio.sleep(10)
-
-                max_attempts = 15
-                attempt = 0
-                otp = None
-                while attempt < max_attempts:
-                    state = self.hass.states.get('sensor.clp_email_otp')
-                    otp = state.state if state else None
-
-                    if otp and otp != original_otp:
-                        break
-
-                    _LOGGER.debug(f"Waiting for OTP email (attempt {attempt+1}/{max_attempts})...")
-                    await asyncio.sleep(5)
-                    attempt += 1
-                if not otp:
-                    _LOGGER.error("OTP was not received in time. Please check your email/IMAP integration.")
-                    raise Exception("OTP not received from sensor.clp_email_otp")
+    async def async_request_otp(self):
+        """Ask CLP to email an OTP to the configured address."""
+        body = await self.hass.async_add_executor_job(encrypt_otp_request, self._email)
+        await self.api_request(
+            method="POST",
+            url=self._api_base_url + API_PATH_OTP_REQUEST,
+            json=body,
+        )
 
-                try:
-                    token_data = await verify_otp(self._session, self._email, otp)
-                    self._access_token = token_data.get("access_token")
-                    self._refresh_token = token_data.get("refresh_token")
-                    self._access_token_expiry_time = token_data.get("expires_in")
-                    _LOGGER.debug(f"Access token obtained: {self._access_token}")
-                except Exception as ex:
-                    _LOGGER.error(f"Failed to verify OTP and obtain access token: {ex}")
-                    raise
+    async def async_verify_otp(self, otp: str):
+        """Exchange the emailed OTP for tokens."""
+        async with self._scheduler.slot(PRIORITY_AUTH, self._entry_id):
+            token_data = await verify_otp(self._session, self._email, otp, base_url=self._api_base_url)
+        self._access_token = token_data.get("access_token")
+        self._refresh_token = token_data.get("refresh_token")
+        self._access_token_expiry_time = token_data.get("expires_in")
 
 
     @handle_errors
     async def main_get_account_detail(self):
         response = await self.api_request(
             method="GET",
-            url="https://api.clp.com.hk/ts1/ms/profile/accountdetails/myServicesCA",
+            url=self._api_base_url + API_PATH_ACCOUNT_DETAIL,
             headers={
                 "Authorization": self._access_token,
             },
+            priority=PRIORITY_ACCOUNT,
         )
         # Find the first entry with status 'Active'
         active_data = next((item for item in response['data'] if item.get('status') == 'Active'), None)
@@ -666,14 +1279,14 @@ class CLPSensor(SensorEntity):
                 'outstanding': float(active_data['outstandingAmount']),
                 'due_date': datetime.datetime.strptime(active_data['dueDate'], '%Y%m%d%H%M%S') if (active_data['dueDate'] is not None and active_data['dueDate'] != '') else None,
             }
-        self._single_task_last_fetch_time = datetime.datetime.now(self._timezone)
+        self._single_task_last_fetch_time = self._now()
 
 
     @handle_errors
     async def main_get_bill(self):
         response = await self.api_request(
             method="POST",
-            url="https://api.clp.com.hk/ts1/ms/billing/transaction/historyBilling",
+            url=self._api_base_url + API_PATH_BILLING_HISTORY,
             headers={
                 "Authorization": self._access_token,
             },
@@ -684,6 +1297,7 @@ class CLPSensor(SensorEntity):
                     },
                 ],
             },
+            priority=PRIORITY_BILLS,
         )
 
         if response['data']['transactions']:
@@ -709,20 +1323,21 @@ class CLPSensor(SensorEntity):
             bills['bill'] = sorted(bills['bill'], key=lambda x: x['transaction_date'], reverse=True)
             bills['payment'] = sorted(bills['payment'], key=lambda x: x['transaction_date'], reverse=True)
             self._bills = bills
-            self._daily_task_last_fetch_time = datetime.datetime.now(self._timezone)
+            self._daily_task_last_fetch_time = self._now()
 
 
     @handle_errors
     async def main_get_estimation(self):
         response = await self.api_request(
             method="GET",
-            url="https://api.clp.com.hk/ts1/ms/consumption/info",
+            url=self._api_base_url + API_PATH_CONSUMPTION_INFO,
             headers={
                 "Authorization": self._access_token,
             },
             params={
                 "ca": self._account_number,
             },
+            priority=PRIORITY_ACCOUNT,
         )
 
         if response['data']:
@@ -737,16 +1352,16 @@ class CLPSensor(SensorEntity):
                 "estimation_end_date": datetime.datetime.strptime(response['data']['projectedEndDate'], '%Y%m%d%H%M%S') if (response['data']['projectedEndDate'] is not None and response['data']['projectedEndDate'] != '') else None,
                 "estimation_start_date": datetime.datetime.strptime(response['data']['projectedStartDate'], '%Y%m%d%H%M%S') if (response['data']['projectedStartDate'] is not None and response['data']['projectedStartDate'] != '') else None,
             }
-            self._daily_task_last_fetch_time = datetime.datetime.now(self._timezone)
+            self._daily_task_last_fetch_time = self._now()
 
 
     @handle_errors
     async def main_get_bimonthly(self):
-        dates = get_dates(self._timezone)
+        dates = get_dates(self._timezone, self._now())
 
         response = await self.api_request(
             method="POST",
-            url="https://api.clp.com.hk/ts1/ms/consumption/history",
+            url=self._api_base_url + API_PATH_CONSUMPTION_HISTORY,
             headers={
                 "Authorization": self._access_token,
             },
@@ -757,15 +1372,16 @@ class CLPSensor(SensorEntity):
                 "toDate": dates["today"].strftime('%Y%m%d000000'),
                 "type": "Unit",
             },
+            priority=PRIORITY_BILLS,
         )
 
         if response['data']:
             if self._type == '' or self._type.upper() == 'BIMONTHLY':
                 self._state_data_type = 'BIMONTHLY'
-                self._attr_native_value = response['data']['results'][0]['totKwh']
-                self._attr_last_reset = datetime.datetime.strptime(response['data']['results'][0]['endabrpe'], '%Y%m%d')
+                self._native_value = response['data']['results'][0]['totKwh']
+                self._last_reset = datetime.datetime.strptime(response['data']['results'][0]['endabrpe'], '%Y%m%d')
 
-            if self._get_bimonthly:
+            if self._wants('bimonthly'):
                 bimonthly = []
                 for row in response['data']['results']:
                     bimonthly.append({
@@ -773,16 +1389,20 @@ class CLPSensor(SensorEntity):
                         'kwh': row['totKwh'],
                     })
                 self._bimonthly = sorted(bimonthly, key=lambda x: x['end'], reverse=True)
-            self._daily_task_last_fetch_time = datetime.datetime.now(self._timezone)
+            self._daily_task_last_fetch_time = self._now()
 
 
     @handle_errors
     async def main_get_daily(self):
-        dates = get_dates(self._timezone)
+        dates = get_dates(self._timezone, self._now())
+        cache_key = ('daily', dates["this_month"].strftime("%Y%m"))
+        if self._negative_cache.is_suppressed(cache_key, dates["today"]):
+            _LOGGER.debug("[SENSOR UPDATE] Daily data for %s was empty recently, skipping.", cache_key[1])
+            return
 
         response = await self.api_request(
             method="POST",
-            url="https://api.clp.com.hk/ts1/ms/consumption/history",
+            url=self._api_base_url + API_PATH_CONSUMPTION_HISTORY,
             headers={
                 "Authorization": self._access_token,
             },
@@ -795,14 +1415,22 @@ class CLPSensor(SensorEntity):
             },
         )
 
+        if not response['data'] or not response['data']['results']:
+            delay = self._negative_cache.record(cache_key, self._now())
+            _LOGGER.debug("[SENSOR UPDATE] Daily data for %s is empty, holding off for %s.", cache_key[1], delay)
+            return
+
+        self._negative_cache.clear(cache_key)
         if response['data']:
+            await self._archive_rows('daily', [(row['startDate'], row['kwhTotal'], 0) for row in response['data']['results']])
+
             if self._type == '' or self._type.upper() == 'DAILY':
                 self._state_data_type = 'DAILY'
-                self._attr_native_value = response['data']['results'][-1]['kwhTotal']
-                self._attr_last_reset = datetime.datetime.strptime(
+                self._native_value = response['data']['results'][-1]['kwhTotal']
+                self._last_reset = datetime.datetime.strptime(
                     response['data']['results'][-1]['expireDate'], '%Y%m%d%H%M%S')
 
-            if self._get_daily:
+            if self._wants('daily'):
                 daily = []
                 for row in response['data']['results']:
                     start = None
@@ -820,23 +1448,32 @@ class CLPSensor(SensorEntity):
                     })
                 self._daily = sorted(daily, key=lambda x: x['start'], reverse=True)
 
-            self._daily_task_last_fetch_time = datetime.datetime.now(self._timezone)
+            now = self._now()
+            starts = [row['startDate'] for row in response['data']['results'] if row['startDate']]
+            if starts:
+                latest_start = datetime.datetime.strptime(max(starts), '%Y%m%d%H%M%S').replace(tzinfo=self._timezone)
+                self._daily_tracker.observe(latest_start, now)
+            else:
+                self._daily_tracker.mark_polled(now)
 
 
     @handle_errors
     async def main_get_hourly(self):
         hourly = []
+        fetched = set()
+        data_day = self._hourly_tracker.data_day(self._now())
         for i in range(1, self._get_hourly_days + 1):
-            from_date = datetime.datetime.now(self._timezone) + datetime.timedelta(days=-(self._get_hourly_days - i))
-            to_date = datetime.datetime.now(self._timezone) + datetime.timedelta(days=-(self._get_hourly_days - i - 1))
+            from_date = data_day + datetime.timedelta(days=-(self._get_hourly_days - i))
+            to_date = data_day + datetime.timedelta(days=-(self._get_hourly_days - i - 1))
 
-            if datetime.time(0, 0) <= datetime.datetime.now(self._timezone).time() < datetime.time(4, 0):
-                from_date = from_date + datetime.timedelta(days=-1)
-                to_date = to_date + datetime.timedelta(days=-1)
+            cache_key = ('hourly', from_date.strftime("%Y%m%d"))
+            if self._negative_cache.is_suppressed(cache_key, self._now()):
+                _LOGGER.debug("[SENSOR UPDATE] Hourly data for %s was empty recently, skipping.", cache_key[1])
+                continue
 
             response = await self.api_request(
                 method="POST",
-                url="https://api.clp.com.hk/ts1/ms/consumption/history",
+                url=self._api_base_url + API_PATH_CONSUMPTION_HISTORY,
                 headers={
                     "Authorization": self._access_token,
                 },
@@ -849,33 +1486,43 @@ class CLPSensor(SensorEntity):
                 },
             )
 
-            if response['data']['results']:
+            if not response['data']['results']:
+                delay = self._negative_cache.record(cache_key, self._now())
+                _LOGGER.debug("[SENSOR UPDATE] Hourly data for %s is empty, holding off for %s.", cache_key[1], delay)
+            else:
+                self._negative_cache.clear(cache_key)
+                fetched.add(from_date.date())
+                await self._archive_rows('hourly', [(row['startDate'], row['kwhTotal'], 0) for row in response['data']['results']])
+
                 if i == self._get_hourly_days and (self._type == '' or self._type.upper() == 'HOURLY'):
                     self._state_data_type = 'HOURLY'
-                    self._attr_native_value = response['data']['results'][-1]['kwhTotal']
-                    self._attr_last_reset = datetime.datetime.strptime(
+                    self._native_value = response['data']['results'][-1]['kwhTotal']
+                    self._last_reset = datetime.datetime.strptime(
                         response['data']['results'][-1]['expireDate'], '%Y%m%d%H%M%S')
 
-                if self._get_hourly:
+                if self._wants('hourly'):
                     for row in response['data']['results']:
                         hourly.append({
                             'start': datetime.datetime.strptime(row['startDate'], '%Y%m%d%H%M%S'),
                             'kwh': row['kwhTotal'],
                         })
 
-                self._hourly_task_last_fetch_time = datetime.datetime.now(self._timezone)
+                latest_start = max(row['startDate'] for row in response['data']['results'])
+                self._hourly_tracker.observe(
+                    datetime.datetime.strptime(latest_start, '%Y%m%d%H%M%S').replace(tzinfo=self._timezone),
+                    self._now(),
+                )
 
-        if self._get_hourly:
-            self._hourly = sorted(hourly, key=lambda x: x['start'], reverse=True)
+        self._merge_hourly(hourly, data_day, fetched)
 
 
     @handle_errors
     async def renewable_get_bimonthly(self):
-        dates = get_dates(self._timezone)
+        dates = get_dates(self._timezone, self._now())
 
         response = await self.api_request(
             method="POST",
-            url="https://api.clp.com.hk/ts1/ms/renew/fit/dashboard",
+            url=self._api_base_url + API_PATH_RENEW_DASHBOARD,
             headers={
                 "Authorization": self._access_token,
             },
@@ -884,15 +1531,16 @@ class CLPSensor(SensorEntity):
                 "mode": "B",
                 "startDate": dates["today"].strftime("%m/%d/%Y"),
             },
+            priority=PRIORITY_BILLS,
         )
 
         if response['data']['consumptionData']:
             if self._type == '' or self._type.upper() == 'BIMONTHLY':
                 self._state_data_type = 'BIMONTHLY'
-                self._attr_native_value = float(response['data']['consumptionData'][-1]['kwhtotal'])
-                self._attr_last_reset = datetime.datetime.strptime(response['data']['consumptionData'][-1]['enddate'], '%Y%m%d%H%M%S')
+                self._native_value = float(response['data']['consumptionData'][-1]['kwhtotal'])
+                self._last_reset = datetime.datetime.strptime(response['data']['consumptionData'][-1]['enddate'], '%Y%m%d%H%M%S')
 
-            if self._get_bill:
+            if self._wants('bills'):
                 bills = []
                 for row in response['data']['consumptionData']:
                     bills.append({
@@ -902,16 +1550,20 @@ class CLPSensor(SensorEntity):
                     })
                 self._bills = sorted(bills, key=lambda x: x['start'], reverse=True)
 
-            self._daily_task_last_fetch_time = datetime.datetime.now(self._timezone)
+            self._daily_task_last_fetch_time = self._now()
 
 
     @handle_errors
     async def renewable_get_daily(self):
-        dates = get_dates(self._timezone)
+        dates = get_dates(self._timezone, self._now())
+        cache_key = ('daily', dates["today"].strftime("%Y%m%d"))
+        if self._negative_cache.is_suppressed(cache_key, dates["today"]):
+            _LOGGER.debug("[SENSOR UPDATE] Renewable daily data for %s was not validated recently, skipping.", cache_key[1])
+            return
 
         response = await self.api_request(
             method="POST",
-            url="https://api.clp.com.hk/ts1/ms/renew/fit/dashboard",
+            url=self._api_base_url + API_PATH_RENEW_DASHBOARD,
             headers={
                 "Authorization": self._access_token,
             },
@@ -922,16 +1574,27 @@ class CLPSensor(SensorEntity):
             },
         )
 
+        if not any(row['validateStatus'] == 'Y' for row in response['data']['consumptionData'] or []):
+            delay = self._negative_cache.record(cache_key, self._now())
+            _LOGGER.debug("[SENSOR UPDATE] Renewable daily data for %s is empty or not validated, holding off for %s.", cache_key[1], delay)
+            return
+
+        self._negative_cache.clear(cache_key)
         if response['data']['consumptionData']:
+            await self._archive_rows('renewable_daily', [
+                (row['startdate'], row['kwhtotal'], 0 if row['validateStatus'] == 'Y' else FLAG_UNVALIDATED)
+                for row in response['data']['consumptionData']
+            ])
+
             if self._type == '' or self._type.upper() == 'DAILY':
                 for row in sorted(response['data']['consumptionData'], key=lambda x: x['startdate'], reverse=True):
                     if row['validateStatus'] == 'Y':
                         self._state_data_type = 'DAILY'
-                        self._attr_native_value = float(row['kwhtotal'])
-                        self._attr_last_reset = datetime.datetime.strptime(row['startdate'], '%Y%m%d%H%M%S')
+                        self._native_value = float(row['kwhtotal'])
+                        self._last_reset = datetime.datetime.strptime(row['startdate'], '%Y%m%d%H%M%S')
                         break
 
-            if self._get_daily:
+            if self._wants('daily'):
                 daily = []
 
                 for row in response['data']['consumptionData']:
@@ -946,21 +1609,31 @@ class CLPSensor(SensorEntity):
 
                 self._daily = sorted(daily, key=lambda x: x['start'], reverse=True)
 
-            self._daily_task_last_fetch_time = datetime.datetime.now(self._timezone)
+            now = self._now()
+            validated = [row['startdate'] for row in response['data']['consumptionData'] if row['startdate'] and row['validateStatus'] == 'Y']
+            if validated:
+                latest_start = datetime.datetime.strptime(max(validated), '%Y%m%d%H%M%S').replace(tzinfo=self._timezone)
+                self._daily_tracker.observe(latest_start, now)
+            else:
+                self._daily_tracker.mark_polled(now)
 
 
     @handle_errors
     async def renewable_get_hourly(self):
         hourly = []
+        fetched = set()
+        data_day = self._hourly_tracker.data_day(self._now())
         for i in range(1, self._get_hourly_days + 1):
-            start_date = datetime.datetime.now(self._timezone) + datetime.timedelta(days=-(self._get_hourly_days - i))
+            start_date = data_day + datetime.timedelta(days=-(self._get_hourly_days - i))
 
-            if datetime.time(0, 0) <= datetime.datetime.now(self._timezone).time() < datetime.time(4, 0):
-                start_date = start_date + datetime.timedelta(days=-1)
+            cache_key = ('hourly', start_date.strftime("%Y%m%d"))
+            if self._negative_cache.is_suppressed(cache_key, self._now()):
+                _LOGGER.debug("[SENSOR UPDATE] Renewable hourly data for %s was not validated recently, skipping.", cache_key[1])
+                continue
 
             response = await self.api_request(
                 method="POST",
-                url="https://api.clp.com.hk/ts1/ms/renew/fit/dashboard",
+                url=self._api_base_url + API_PATH_RENEW_DASHBOARD,
                 headers={
                     "Authorization": self._access_token,
                 },
@@ -971,16 +1644,26 @@ class CLPSensor(SensorEntity):
                 },
             )
 
-            if response['data']['consumptionData']:
+            if not any(row['validateStatus'] == 'Y' for row in response['data']['consumptionData'] or []):
+                delay = self._negative_cache.record(cache_key, self._now())
+                _LOGGER.debug("[SENSOR UPDATE] Renewable hourly data for %s is empty or not validated, holding off for %s.", cache_key[1], delay)
+            else:
+                self._negative_cache.clear(cache_key)
+                fetched.add(start_date.date())
+                await self._archive_rows('renewable_hourly', [
+                    (row['startdate'], row['kwhtotal'], 0 if row['validateStatus'] == 'Y' else FLAG_UNVALIDATED)
+                    for row in response['data']['consumptionData']
+                ])
+
                 if i == 1 and (self._type == '' or self._type.upper() == 'HOURLY'):
                     for row in sorted(response['data']['consumptionData'], key=lambda x: x['startdate'], reverse=True):
                         if row['validateStatus'] == 'Y':
                             self._state_data_type = 'HOURLY'
-                            self._attr_native_value = float(row['kwhtotal'])
-                            self._attr_last_reset = datetime.datetime.strptime(row['startdate'], '%Y%m%d%H%M%S')
+                            self._native_value = float(row['kwhtotal'])
+                            self._last_reset = datetime.datetime.strptime(row['startdate'], '%Y%m%d%H%M%S')
                             break
 
-                if self._get_hourly:
+                if self._wants('hourly'):
                     for row in response['data']['consumptionData']:
                         if row['validateStatus'] == 'N':
                             continue
@@ -990,73 +1673,472 @@ class CLPSensor(SensorEntity):
                             'kwh': float(row['kwhtotal']),
                         })
 
-                self._hourly_task_last_fetch_time = datetime.datetime.now(self._timezone)
+                latest_start = max(row['startdate'] for row in response['data']['consumptionData'] if row['validateStatus'] == 'Y')
+                self._hourly_tracker.observe(
+                    datetime.datetime.strptime(latest_start, '%Y%m%d%H%M%S').replace(tzinfo=self._timezone),
+                    self._now(),
+                )
+
+        self._merge_hourly(hourly, data_day, fetched)
 
-        if self._get_hourly:
-            self._hourly = sorted(hourly, key=lambda x: x['start'], reverse=True)
+    def _merge_hourly(self, hourly: list[dict], data_day: datetime.datetime, fetched: set[datetime.date]):
+        """Replace the held hours of the ``fetched`` days, keeping those of the other days still in the window.
+
+        Days held off by the negative cache or returned empty are not fetched,
+        and their hours stay as they were instead of being wiped.
+        """
+        if not self._wants('hourly') or not fetched:
+            return
+        window = {(data_day - datetime.timedelta(days=i)).date() for i in range(self._get_hourly_days)}
+        kept = [row for row in self._hourly or [] if row['start'].date() in window - fetched]
+        self._hourly = sorted(hourly + kept, key=lambda x: x['start'], reverse=True)
 
 
-    @Throttle(MIN_TIME_BETWEEN_UPDATES)
     async def async_update(self) -> None:
+        # Throttled on the clock, so polls of the data entities and retries do not repeat requests
+        now = self._clock.monotonic()
+        if self._update_lock.locked() or (self._last_update is not None and now < self._last_update + MIN_TIME_BETWEEN_UPDATES.total_seconds()):
+            return
+        await self.async_update_now()
+
+    async def async_update_now(self) -> None:
+        """Run one update cycle once the one in flight is done, bypassing the throttle."""
+        async with self._update_lock:
+            self._last_update = self._clock.monotonic()
+            started = time.monotonic()
+            try:
+                await self._async_update_cycle()
+            finally:
+                # A cycle that outlived its entry is not one of the entry's cycles
+                if self._tasks is not None:
+                    self._metrics.update_cycle.observe(time.monotonic() - started)
+                    if self._metrics.first_update is None:
+                        self._metrics.first_update = time.monotonic() - self._metrics.started
+
+    def _state_snapshot(self) -> tuple:
+        return self._native_value, self._last_reset, self._state_data_type, self._error, self.attributes()
+
+    async def _async_update_cycle(self) -> None:
+        before = {source: self.data(source) for source, listeners in self._consumers.items() if listeners}
+        state_before = self._state_snapshot() if self._state_listeners else None
+        try:
+            await self._async_fetch()
+        finally:
+            # Only the entities reading changed data write their state
+            for source, previous in before.items():
+                if self.data(source) != previous:
+                    for listener in list(self._consumers[source]):
+                        listener()
+            if state_before is not None and self._state_snapshot() != state_before:
+                for listener in list(self._state_listeners):
+                    listener()
+
+    async def _async_fetch(self) -> None:
         _LOGGER.debug(f"[SENSOR UPDATE] Starting update for {self._sensor_type}, access_token_expiry_time={self._access_token_expiry_time}")
 
         if self._4xx_error_retry > HTTP_4xx_ERROR_RETRY_LIMIT:
             _LOGGER.debug(f"[SENSOR UPDATE] 4xx error retry limit reached, skipping update.")
             return
 
-        await self.auth()
+        self._auth.async_start()
 
         if not self._access_token:
             _LOGGER.debug(f"[SENSOR UPDATE] No access token, skipping data fetch.")
             return
 
-        if self._sensor_type == 'main':
-            if not self._single_task_last_fetch_time:
-                if not self._account_number or self._get_acct:
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching account detail.")
-                    await self.main_get_account_detail()
-
-            if not self._daily_task_last_fetch_time or datetime.datetime.now(self._timezone) > self._daily_task_last_fetch_time + DAILY_TASK_INTERVAL:
-                if self._get_bill:
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching bill.")
-                    await self.main_get_bill()
-
-                if self._get_estimation:
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching estimation.")
-                    await self.main_get_estimation()
-
-                if self._get_bimonthly or self._type == '' or self._type.upper() == 'BIMONTHLY':
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching bimonthly.")
-                    await self.main_get_bimonthly()
-
-                if self._get_daily or self._type == '' or self._type.upper() == 'DAILY':
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching daily.")
-                    await self.main_get_daily()
-
-            if not self._hourly_task_last_fetch_time or datetime.datetime.now(self._timezone) > self._hourly_task_last_fetch_time + HOURLY_TASK_INTERVAL:
-                if self._get_hourly or self._type == '' or self._type.upper() == 'HOURLY':
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching hourly.")
-                    await self.main_get_hourly()
-
-        elif self._sensor_type == 'renewable_energy':
-            if not self._single_task_last_fetch_time:
-                if not self._account_number:
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching renewable account detail.")
-                    await self.main_get_account_detail()
-
-            if not self._daily_task_last_fetch_time or datetime.datetime.now(self._timezone) > self._daily_task_last_fetch_time + DAILY_TASK_INTERVAL:
-                if self._get_bill or self._type == '' or self._type.upper() == 'BIMONTHLY':
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching renewable bimonthly.")
-                    await self.renewable_get_bimonthly()
-
-                if self._get_daily or self._type == '' or self._type.upper() == 'DAILY':
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching renewable daily.")
-                    await self.renewable_get_daily()
-
-            if not self._hourly_task_last_fetch_time or datetime.datetime.now(self._timezone) > self._hourly_task_last_fetch_time + HOURLY_TASK_INTERVAL:
-                if self._get_hourly or self._type == '' or self._type.upper() == 'HOURLY':
-                    _LOGGER.debug(f"[SENSOR UPDATE] Fetching renewable hourly.")
-                    await self.renewable_get_hourly()
+        now = self._now()
+        due = {
+            # Outstanding amount and due date change with every bill and payment
+            "once": not self._single_task_last_fetch_time or (
+                self._wants("account") and now > self._single_task_last_fetch_time + self._daily_task_interval
+            ),
+            "daily_task": not self._daily_task_last_fetch_time or now > self._daily_task_last_fetch_time + self._daily_task_interval,
+            "daily": self._daily_tracker.is_due(now),
+            "hourly": self._hourly_tracker.is_due(now),
+        }
+        graph = FETCH_GRAPH[self._sensor_type]
+        done = set()
+
+        for fetch in graph:
+            if self._needed(fetch) and (due[fetch.schedule] or fetch.source in self._first_fetch):
+                await self._async_run(fetch, done)
+
+        if self._type == '' and self._state_consumed:
+            # Stop at the first type with data instead of fetching all three
+            for state_type in AUTO_STATE_TYPES:
+                if self._state_data_type == state_type:
+                    break
+                fetch = next((fetch for fetch in graph if fetch.state_type == state_type), None)
+                if fetch is None or fetch in done or not due[fetch.schedule]:
+                    continue
+                await self._async_run(fetch, done)
+                if self._state_data_type == state_type:
+                    break
+
+        if not done:
+            _LOGGER.debug("[SENSOR UPDATE] Nothing due or consumed, no request made.")
 
         if self._type == '' and self._state_data_type is not None:
             self._type = self._state_data_type
+
+        self._first_fetch.clear()
+        self._schedule_backfill()
+
+    async def _async_run(self, fetch: Fetch, done: set):
+        """Run ``fetch`` once per cycle, after the account detail it depends on."""
+        if fetch in done:
+            return
+        done.add(fetch)
+        if fetch.schedule != "once" and not self._account_number:
+            await self._async_run(FETCH_GRAPH[self._sensor_type][0], done)
+        _LOGGER.debug("[SENSOR UPDATE] Fetching %s.", fetch.name)
+        await getattr(self, fetch.method)()
+
+
+class CLPSensor(SensorEntity):
+    """Energy of the configured (or most detailed available) type, with the held data as attributes."""
+
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _attr_state_class = SensorStateClass.TOTAL
+
+    def __init__(self, data: CLPData) -> None:
+        self.hass = data.hass
+        self._data = data
+        self._attr_name = data.name
+        self._attr_unique_id = data.key
+        # Set while Home Assistant polls, as it writes the state itself afterwards
+        self._polling = False
+
+    @property
+    def sensor_type(self):
+        return self._data.sensor_type
+
+    @property
+    def native_value(self):
+        return self._data.native_value
+
+    @property
+    def state(self):
+        return self._data.native_value
+
+    @property
+    def last_reset(self):
+        return self._data.last_reset
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        return self._data.attributes()
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(self._data.async_add_state_listener(self._async_data_changed))
+
+    @callback
+    def _async_data_changed(self):
+        if not self._polling:
+            self.async_write_ha_state()
+
+    async def async_update(self) -> None:
+        self._polling = True
+        try:
+            await self._data.async_update()
+        finally:
+            self._polling = False
+
+
+def _first(rows: list | None, key: str):
+    return rows[0][key] if rows else None
+
+
+def _local(value: datetime.datetime | None) -> datetime.datetime | None:
+    # CLP sends naive Hong Kong times
+    return value.replace(tzinfo=HKT) if value else None
+
+
+@dataclass(frozen=True, kw_only=True)
+class CLPDataSensorDescription(SensorEntityDescription):
+    sensor_type: str
+    source: str
+    value_fn: Callable[[Any], Any]
+
+
+DATA_SENSORS = (
+    CLPDataSensorDescription(
+        key="outstanding",
+        name="Outstanding",
+        sensor_type="main",
+        source="account",
+        device_class=SensorDeviceClass.MONETARY,
+        native_unit_of_measurement="HKD",
+        value_fn=lambda account: account["outstanding"],
+    ),
+    CLPDataSensorDescription(
+        key="due_date",
+        name="Due Date",
+        sensor_type="main",
+        source="account",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda account: _local(account["due_date"]),
+    ),
+    CLPDataSensorDescription(
+        key="latest_bill",
+        name="Latest Bill",
+        sensor_type="main",
+        source="bills",
+        device_class=SensorDeviceClass.MONETARY,
+        native_unit_of_measurement="HKD",
+        value_fn=lambda bills: _first(bills["bill"], "total"),
+    ),
+    CLPDataSensorDescription(
+        key="current_cost",
+        name="Current Cost",
+        sensor_type="main",
+        source="estimation",
+        device_class=SensorDeviceClass.MONETARY,
+        native_unit_of_measurement="HKD",
+        value_fn=lambda estimation: estimation["current_cost"],
+    ),
+    CLPDataSensorDescription(
+        key="projected_cost",
+        name="Projected Cost",
+        sensor_type="main",
+        source="estimation",
+        device_class=SensorDeviceClass.MONETARY,
+        native_unit_of_measurement="HKD",
+        value_fn=lambda estimation: estimation["estimation_cost"],
+    ),
+    CLPDataSensorDescription(
+        key="projected_consumption",
+        name="Projected Consumption",
+        sensor_type="main",
+        source="estimation",
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        value_fn=lambda estimation: estimation["estimation_consumption"],
+    ),
+    CLPDataSensorDescription(
+        key="latest_bimonthly",
+        name="Latest Bimonthly",
+        sensor_type="main",
+        source="bimonthly",
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        value_fn=lambda bimonthly: _first(bimonthly, "kwh"),
+    ),
+    CLPDataSensorDescription(
+        key="latest_day",
+        name="Latest Day",
+        sensor_type="main",
+        source="daily",
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        value_fn=lambda daily: _first(daily, "kwh"),
+    ),
+    CLPDataSensorDescription(
+        key="latest_hour",
+        name="Latest Hour",
+        sensor_type="main",
+        source="hourly",
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        value_fn=lambda hourly: _first(hourly, "kwh"),
+    ),
+    CLPDataSensorDescription(
+        key="fit_export",
+        name="FiT Export",
+        sensor_type="renewable_energy",
+        source="bills",
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        value_fn=lambda bills: _first(bills, "kwh"),
+    ),
+    CLPDataSensorDescription(
+        key="renewable_latest_day",
+        name="Latest Day",
+        sensor_type="renewable_energy",
+        source="daily",
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        value_fn=lambda daily: _first(daily, "kwh"),
+    ),
+    CLPDataSensorDescription(
+        key="renewable_latest_hour",
+        name="Latest Hour",
+        sensor_type="renewable_energy",
+        source="hourly",
+        device_class=SensorDeviceClass.ENERGY,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        value_fn=lambda hourly: _first(hourly, "kwh"),
+    ),
+)
+
+
+class CLPDataSensor(SensorEntity):
+    """One value out of a CLPData, written only when that value changes.
+
+    Enabling the entity is what makes the CLPData fetch it, so the entities
+    left disabled cost no requests. The entity is never polled: the CLPData
+    pushes new data, fetched with the main sensor or, while that one is
+    disabled, on its own.
+    """
+
+    _attr_entity_registry_enabled_default = False
+    _attr_should_poll = False
+    entity_description: CLPDataSensorDescription
+
+    def __init__(
+            self,
+            entry_id: str | None,
+            source: CLPData,
+            description: CLPDataSensorDescription,
+    ) -> None:
+        self.hass = source.hass
+        self.entity_description = description
+        self._source = source
+        self._attr_name = f"{source.name} {description.name}"
+        self._attr_unique_id = f"clphk_{entry_id}_{description.key}"
+
+    @property
+    def native_value(self):
+        data = self._source.data(self.entity_description.source)
+        return None if data is None else self.entity_description.value_fn(data)
+
+    async def async_added_to_hass(self) -> None:
+        self._written = self.native_value
+        self.async_on_remove(
+            self._source.async_add_consumer(self.entity_description.source, self._async_source_changed)
+        )
+
+    @callback
+    def _async_source_changed(self):
+        # A new bill list or hourly series often leaves this entity's value as it was
+        value = self.native_value
+        if value != self._written:
+            self._written = value
+            self.async_write_ha_state()
+
+
+def _sum_nested(counters: dict) -> int:
+    return sum(sum(counter.values()) for counter in counters.values())
+
+
+def _mean_latency(metrics: Metrics) -> float | None:
+    count = sum(histogram.count for histogram in metrics.latency.values())
+    if not count:
+        return None
+    return round(sum(histogram.total for histogram in metrics.latency.values()) / count, 3)
+
+
+@dataclass(frozen=True, kw_only=True)
+class CLPMetricSensorDescription(SensorEntityDescription):
+    value_fn: Callable[[Metrics, dict], float | int | None]
+    attributes_fn: Callable[[Metrics, dict], dict] | None = None
+
+
+METRIC_SENSORS = (
+    CLPMetricSensorDescription(
+        key="requests",
+        name="Requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics, shared: sum(metrics.requests.values()),
+        attributes_fn=lambda metrics, shared: {
+            "requests": dict(metrics.requests),
+            "statuses": {endpoint: dict(counter) for endpoint, counter in metrics.statuses.items()},
+            "circuits": {endpoint: circuit.stats() for endpoint, circuit in shared.get("circuits", {}).items()},
+        },
+    ),
+    CLPMetricSensorDescription(
+        key="request_errors",
+        name="Request Errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics, shared: _sum_nested(metrics.errors),
+        attributes_fn=lambda metrics, shared: {
+            endpoint: dict(counter) for endpoint, counter in metrics.errors.items()
+        },
+    ),
+    CLPMetricSensorDescription(
+        key="request_latency",
+        name="Request Latency",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics, shared: _mean_latency(metrics),
+        attributes_fn=lambda metrics, shared: {
+            "histograms": {endpoint: histogram.as_dict() for endpoint, histogram in metrics.latency.items()},
+            "timeouts": {endpoint: tracker.stats() for endpoint, tracker in shared.get("latency", {}).items()},
+        },
+    ),
+    CLPMetricSensorDescription(
+        key="bytes_received",
+        name="Bytes Received",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics, shared: sum(metrics.bytes_received.values()),
+        attributes_fn=lambda metrics, shared: dict(metrics.bytes_received),
+    ),
+    CLPMetricSensorDescription(
+        key="token_refreshes",
+        name="Token Refreshes",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics, shared: metrics.token_refreshes,
+    ),
+    CLPMetricSensorDescription(
+        key="retries_scheduled",
+        name="Retries Scheduled",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics, shared: metrics.retries_scheduled,
+    ),
+    CLPMetricSensorDescription(
+        key="update_cycle_duration",
+        name="Update Cycle Duration",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics, shared: None if metrics.update_cycle.last is None else round(metrics.update_cycle.last, 3),
+        attributes_fn=lambda metrics, shared: metrics.update_cycle.as_dict(),
+    ),
+    CLPMetricSensorDescription(
+        key="rate_limit_wait",
+        name="Rate Limit Wait",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics, shared: round(shared["scheduler"].last_wait, 3) if "scheduler" in shared else None,
+        attributes_fn=lambda metrics, shared: shared["scheduler"].stats() if "scheduler" in shared else {},
+    ),
+)
+
+
+class CLPMetricSensor(SensorEntity):
+    """Diagnostic view of the request and update-cycle metrics of one entry."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    entity_description: CLPMetricSensorDescription
+
+    def __init__(
+            self,
+            hass,
+            entry_id: str | None,
+            name: str,
+            metrics: Metrics,
+            description: CLPMetricSensorDescription,
+    ) -> None:
+        self.hass = hass
+        self.entity_description = description
+        self._metrics = metrics
+        self._attr_name = f"{name} {description.name}"
+        self._attr_unique_id = f"clphk_{entry_id}_{description.key}"
+
+    def _refresh(self):
+        shared = self.hass.data.get(DOMAIN, {})
+        self._native_value = self.entity_description.value_fn(self._metrics, shared)
+        if self.entity_description.attributes_fn is not None:
+            self._attr_extra_state_attributes = self.entity_description.attributes_fn(self._metrics, shared)
+
+    async def async_added_to_hass(self) -> None:
+        self._refresh()
+
+    async def async_update(self) -> None:
+        self._refresh()
@@ -0,0 +1,188 @@
+"""Services of the CLPHK integration."""
+from __future__ import annotations
+
+import datetime
+import functools
+import time
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+
+from .aggregate import OPERATIONS, PERIODS, aggregate
+from .clock import HKT, day_start
+from .const import ARCHIVE_SERIES, CONF_DOMAIN
+from .export import (
+    ARCHIVED,
+    CACHED,
+    EXPORT_SERIES,
+    FORMATS,
+    archived_rows,
+    async_fetch_days,
+    cached_rows,
+    missing_days,
+    write_export,
+)
+from .profiling import async_profile
+from .transport import PRIORITY_BACKGROUND
+
+SERVICE_PROFILE_UPDATE = "profile_update"
+PROFILE_UPDATE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("entry_id"): cv.string,
+        vol.Optional("top", default=25): vol.All(vol.Coerce(int), vol.Range(min=1, max=200)),
+        vol.Optional("write_file", default=False): cv.boolean,
+    }
+)
+
+SERVICE_AGGREGATE = "aggregate"
+AGGREGATE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("entry_id"): cv.string,
+        vol.Required("series"): vol.In(ARCHIVE_SERIES),
+        vol.Required("operation"): vol.In(OPERATIONS),
+        vol.Optional("period", default="day"): vol.In(PERIODS),
+        vol.Optional("start"): cv.date,
+        vol.Optional("end"): cv.date,
+        vol.Optional("percentiles", default=[50, 90, 95, 99]): vol.All(
+            cv.ensure_list, [vol.All(vol.Coerce(float), vol.Range(min=0, max=100))]
+        ),
+        vol.Optional("points", default=100): vol.All(vol.Coerce(int), vol.Range(min=2, max=2000)),
+    }
+)
+
+
+SERVICE_EXPORT_HISTORY = "export_history"
+# Most recent days fetched per series and call, so a long range does not hold the call on CLP for hours
+FETCH_MISSING_MAX_DAYS = 31
+EXPORT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional("entry_id"): cv.string,
+        vol.Optional("series", default=["hourly"]): vol.All(cv.ensure_list, [vol.In(EXPORT_SERIES)]),
+        vol.Required("start"): cv.date,
+        vol.Optional("end"): cv.date,
+        vol.Optional("format", default="csv"): vol.In(FORMATS),
+        vol.Optional("fetch_missing", default=False): cv.boolean,
+        vol.Optional("concurrency", default=2): vol.All(vol.Coerce(int), vol.Range(min=1, max=8)),
+    }
+)
+
+
+def _entries(hass: HomeAssistant, call: ServiceCall):
+    entries = hass.data.get(CONF_DOMAIN, {}).get("entries", {})
+    for entry_id, entry_state in entries.items():
+        if call.data.get("entry_id") and call.data["entry_id"] != entry_id:
+            continue
+        yield entry_id, entry_state
+
+
+def _epoch(date: datetime.date | None) -> int | None:
+    return None if date is None else day_start(date)
+
+
+def async_setup_services(hass: HomeAssistant):
+    """Register the integration services."""
+
+    async def async_profile_update(call: ServiceCall) -> ServiceResponse:
+        """Run one update cycle of each sensor under the profiler."""
+        results = {}
+        for _, entry_state in _entries(hass, call):
+            for data in entry_state.get("data", []):
+                profiler, summary = await async_profile(data.async_update_now, top=call.data["top"])
+                if call.data["write_file"]:
+                    path = hass.config.path(f"clphk_profile_{data.key}_{int(time.time())}.pstats")
+                    await hass.async_add_executor_job(profiler.dump_stats, path)
+                    summary["file"] = path
+                results[data.key] = summary
+        return {"results": results}
+
+    async def async_aggregate(call: ServiceCall) -> ServiceResponse:
+        """Aggregate an archived series of each entry."""
+        end = call.data.get("end")
+        results = []
+        for entry_id, entry_state in _entries(hass, call):
+            for (_, series), archive in entry_state.get("archives", {}).items():
+                if series != call.data["series"]:
+                    continue
+                result = await hass.async_add_executor_job(
+                    lambda: aggregate(
+                        archive,
+                        call.data["operation"],
+                        start=_epoch(call.data.get("start")),
+                        # End date is inclusive.
+                        end=_epoch(end + datetime.timedelta(days=1)) if end else None,
+                        period=call.data["period"],
+                        percentiles=call.data["percentiles"],
+                        points=call.data["points"],
+                    )
+                )
+                results.append({"entry_id": entry_id, "series": series, **result})
+        return {"results": results}
+
+    async def async_export_history(call: ServiceCall) -> ServiceResponse:
+        """Write the chosen series of each entry to a file in the config directory."""
+        first = call.data["start"]
+        last = call.data.get("end") or datetime.datetime.now(HKT).date()
+        fmt = call.data["format"]
+        results = []
+        for entry_id, entry_state in _entries(hass, call):
+            owners = {data.sensor_type: data for data in entry_state.get("data", [])}
+            fetched = failed = skipped = 0
+            sources = []
+            for series in call.data["series"]:
+                if series in CACHED:
+                    owner = owners.get(CACHED[series])
+                    if owner is not None:
+                        sources.append(cached_rows(series, list(owner.cached(series)), first, last))
+                    continue
+
+                owner = owners.get(ARCHIVED[series][0])
+                archive = owner.archive(series) if owner is not None else None
+                if archive is None:
+                    continue
+                if call.data["fetch_missing"] and series.endswith("hourly"):
+                    days = await hass.async_add_executor_job(missing_days, archive, first, last)
+                    skipped += max(0, len(days) - FETCH_MISSING_MAX_DAYS)
+                    days = days[-FETCH_MISSING_MAX_DAYS:]
+                    done, errors = await async_fetch_days(
+                        functools.partial(owner.async_fetch_hourly_day, priority=PRIORITY_BACKGROUND),
+                        days,
+                        call.data["concurrency"],
+                    )
+                    fetched += done
+                    failed += errors
+                sources.append(archived_rows(series, archive, day_start(first), day_start(last + datetime.timedelta(days=1))))
+
+            path = hass.config.path(f"clphk_export_{entry_id}_{int(time.time())}.{fmt}")
+            rows = await hass.async_add_executor_job(write_export, path, fmt, sources)
+            results.append({
+                "entry_id": entry_id,
+                "file": path,
+                "rows": rows,
+                "fetched_days": fetched,
+                "failed_days": failed,
+                "skipped_days": skipped,
+            })
+        return {"results": results}
+
+    hass.services.async_register(
+        CONF_DOMAIN,
+        SERVICE_PROFILE_UPDATE,
+        async_profile_update,
+        schema=PROFILE_UPDATE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        CONF_DOMAIN,
+        SERVICE_AGGREGATE,
+        async_aggregate,
+        schema=AGGREGATE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        CONF_DOMAIN,
+        SERVICE_EXPORT_HISTORY,
+        async_export_history,
+        schema=EXPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,74 @@
+"""Background tasks and timers owned by one config entry."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Coroutine
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .clock import Clock
+
+
+class BackgroundTasks:
+    """Track the tasks and timers of an entry so unloading can cancel them all.
+
+    Without this, a retry timer or a backfill started before an unload or
+    reload keeps running against the popped entry state. Once
+    :meth:`async_cancel_all` has run nothing new is started, so work racing
+    the unload is dropped instead of leaking.
+    """
+
+    def __init__(self, hass: HomeAssistant, clock: Clock | None = None):
+        self._hass = hass
+        self._clock = clock or Clock()
+        self._tasks: set[asyncio.Task] = set()
+        self._timers: dict[str, CALLBACK_TYPE] = {}
+        self.closed = False
+
+    @callback
+    def async_create(self, coro: Coroutine, name: str) -> asyncio.Task | None:
+        """Run ``coro`` as a background task of the entry, or drop it once unloading."""
+        if self.closed:
+            coro.close()
+            return None
+        task = self._hass.async_create_background_task(coro, name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    @callback
+    def async_call_later(self, delay: float, action: Callable[[], Coroutine], name: str) -> bool:
+        """Run ``action`` as a task after ``delay`` seconds, and return whether a timer was started.
+
+        Timers are keyed by ``name``: while one is pending, scheduling the
+        same name again does nothing, so repeated failures do not pile up
+        retries.
+        """
+        if self.closed or name in self._timers:
+            return False
+
+        @callback
+        def fire(_now):
+            self._timers.pop(name, None)
+            self.async_create(action(), name)
+
+        self._timers[name] = self._clock.call_later(self._hass, delay, fire)
+        return True
+
+    async def async_cancel_all(self):
+        self.closed = True
+        for cancel in self._timers.values():
+            cancel()
+        self._timers.clear()
+
+        tasks = [task for task in self._tasks if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "tasks": sorted(task.get_name() for task in self._tasks),
+            "timers": sorted(self._timers),
+            "closed": self.closed,
+        }
@@ -0,0 +1,75 @@
+"""Debounced persistence of rotated tokens to the config entry."""
+from __future__ import annotations
+
+import logging
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .clock import Clock
+
+_LOGGER = logging.getLogger(__name__)
+
+TOKEN_FIELDS = ("access_token", "refresh_token", "access_token_expiry_time")
+
+# Longest a rotated token stays in memory only
+PERSIST_DELAY = 10
+
+
+class TokenWriter:
+    """Write the tokens of one config entry at most once per ``delay`` seconds.
+
+    Every ``async_update_entry`` rewrites ``core.config_entries`` and wakes
+    the update listeners, so rotations within the window are coalesced and
+    only the latest tokens are written, merged into the data the entry has
+    at write time. :meth:`async_flush` writes straight away; it is called
+    when the tokens are cleared, on unload and when Home Assistant stops.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, delay: float = PERSIST_DELAY, clock: Clock | None = None):
+        self._hass = hass
+        self._clock = clock or Clock()
+        self._entry_id = entry_id
+        self._delay = delay
+        self._pending = None
+        self._cancel: CALLBACK_TYPE | None = None
+        self.writes = 0
+        self.coalesced = 0
+
+    @callback
+    def async_schedule(self, tokens: dict):
+        if self._pending is not None:
+            self.coalesced += 1
+        self._pending = {field: tokens.get(field) for field in TOKEN_FIELDS}
+        # Not pushed back by later rotations, so a write is never delayed more than once
+        if self._cancel is None:
+            self._cancel = self._clock.call_later(self._hass, self._delay, self._async_fire)
+
+    @callback
+    def _async_fire(self, _now):
+        self._cancel = None
+        self.async_flush()
+
+    @callback
+    def async_flush(self):
+        if self._cancel is not None:
+            self._cancel()
+            self._cancel = None
+        tokens, self._pending = self._pending, None
+        if tokens is None:
+            return
+
+        entry = self._hass.config_entries.async_get_entry(self._entry_id)
+        if entry is None:
+            return
+        if all(entry.data.get(field) == value for field, value in tokens.items()):
+            return
+        _LOGGER.debug("Persisting tokens to config entry %s", self._entry_id)
+        self._hass.config_entries.async_update_entry(entry, data={**entry.data, **tokens})
+        self.writes += 1
+
+    def stats(self) -> dict:
+        return {
+            "writes": self.writes,
+            "coalesced": self.coalesced,
+            "pending": self._pending is not None,
+        }
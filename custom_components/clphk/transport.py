@@ -0,0 +1,533 @@
+"""Request plumbing shared by every call to api.clp.com.hk."""
+from __future__ import annotations
+
+import asyncio
+import collections
+import contextlib
+import gzip
+import itertools
+import json
+import math
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from .clock import Clock
+
+# Scheduling classes, served lowest value first
+PRIORITY_AUTH = 0
+PRIORITY_CURRENT = 1
+PRIORITY_ACCOUNT = 2
+PRIORITY_BILLS = 3
+PRIORITY_BACKGROUND = 4
+PRIORITY_DEFAULT = PRIORITY_CURRENT
+PRIORITY_NAMES = {
+    PRIORITY_AUTH: "auth",
+    PRIORITY_CURRENT: "current",
+    PRIORITY_ACCOUNT: "account",
+    PRIORITY_BILLS: "bills",
+    PRIORITY_BACKGROUND: "background",
+}
+
+
+class RequestScheduler:
+    """Single queue in front of every request to CLP, shared by all entries.
+
+    Bursts of requests from one address get blocked by Akamai in front of the
+    CLP API, so a request needs a rate token (refilled at ``rate`` per second
+    up to ``burst``) and one of ``max_in_flight`` slots before it is sent.
+    Waiting requests are served by priority class first, so token refreshes
+    never queue behind data fetches and backfill never delays the current
+    hourly reading. Within a class, config entries take turns, and each
+    entry's own requests are first come first served.
+
+    Hedged copies take a rate token but no slot, so at most one extra request
+    per slot is ever in flight. Tokens are refilled and waited for on
+    ``clock``.
+
+    The rate limit is global: every entry states its own limits with
+    :meth:`set_limits`, and the strictest rate and burst among them apply to
+    all, since they share one address.
+    """
+
+    def __init__(self, rate: float, burst: int, max_in_flight: int = 4, clock: Clock | None = None):
+        self._clock = clock or Clock()
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self._tokens = float(burst)
+        self._updated = self._clock.monotonic()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._grants = 0
+        self._turns = {}
+        self._changed = None
+        self._limits = {}
+
+        self.waited_requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+        self.waits = collections.defaultdict(lambda: {"count": 0, "total": 0.0, "max": 0.0})
+
+    def configure(self, rate: float, burst: int, max_in_flight: int | None = None):
+        self._refill()
+        self.rate = rate
+        self.burst = burst
+        self._tokens = min(self._tokens, float(burst))
+        if max_in_flight is not None:
+            self.max_in_flight = max_in_flight
+        self._notify()
+
+    def set_limits(self, owner, rate: float, burst: int):
+        """Record the limits ``owner`` asks for and apply the strictest of all owners."""
+        self._limits[owner] = (rate, burst)
+        self._apply_limits()
+
+    def remove_limits(self, owner):
+        if self._limits.pop(owner, None) is not None and self._limits:
+            self._apply_limits()
+
+    def _apply_limits(self):
+        self.configure(
+            rate=min(rate for rate, _ in self._limits.values()),
+            burst=min(burst for _, burst in self._limits.values()),
+        )
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiting)
+
+    def _refill(self):
+        now = self._clock.monotonic()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _notify(self):
+        if self._changed is not None:
+            self._changed.set()
+
+    def _next(self):
+        """Return the waiter to serve next: best class, then the owner served least recently, then oldest."""
+        return min(
+            self._waiting,
+            key=lambda waiter: (waiter[0], self._turns.get(waiter[2], 0), waiter[1]),
+            default=None,
+        )
+
+    async def acquire(self, priority: int = PRIORITY_DEFAULT, owner=None) -> float:
+        """Wait for a rate token and a slot, and return how long the caller was queued.
+
+        Every successful call must be paired with :meth:`release`; prefer :meth:`slot`.
+        """
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        start = self._clock.monotonic()
+        waiter = (priority, next(self._sequence), owner)
+        self._waiting.append(waiter)
+        try:
+            while True:
+                self._refill()
+                delay = None
+                if self._next() is waiter and self.in_flight < self.max_in_flight:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self.in_flight += 1
+                        break
+                    delay = max((1 - self._tokens) / self.rate, 0.01)
+                self._changed.clear()
+                try:
+                    async with self._clock.timeout(delay):
+                        await self._changed.wait()
+                except TimeoutError:
+                    pass
+        finally:
+            self._waiting.remove(waiter)
+            self._notify()
+
+        self._grants += 1
+        self._turns[owner] = self._grants
+
+        waited = self._clock.monotonic() - start
+        self.last_wait = waited
+        if waited > 0.001:
+            self.waited_requests += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            stats = self.waits[priority]
+            stats["count"] += 1
+            stats["total"] += waited
+            stats["max"] = max(stats["max"], waited)
+        return waited
+
+    def release(self):
+        self.in_flight -= 1
+        self._notify()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_DEFAULT, owner=None):
+        """Hold a slot for the body of the ``async with`` block, yielding the time queued."""
+        waited = await self.acquire(priority, owner)
+        try:
+            yield waited
+        finally:
+            self.release()
+
+    def try_acquire(self) -> bool:
+        """Take a rate token only if one is free right now and nobody is queued."""
+        self._refill()
+        if self._tokens >= 1 and not self._waiting:
+            self._tokens -= 1
+            return True
+        return False
+
+    def stats(self) -> dict:
+        queued = collections.Counter(PRIORITY_NAMES.get(waiter[0], waiter[0]) for waiter in self._waiting)
+        return {
+            "rate_per_minute": round(self.rate * 60, 2),
+            "burst": self.burst,
+            "queued": self.queued,
+            "queued_by_priority": dict(queued),
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "waited_requests": self.waited_requests,
+            "last_wait": round(self.last_wait, 3),
+            "max_wait": round(self.max_wait, 3),
+            "total_wait": round(self.total_wait, 3),
+            "wait_by_priority": {
+                PRIORITY_NAMES.get(priority, priority): {
+                    "count": stats["count"],
+                    "mean": round(stats["total"] / stats["count"], 3),
+                    "max": round(stats["max"], 3),
+                }
+                for priority, stats in self.waits.items()
+            },
+        }
+
+
+def endpoint_of(url: str) -> str:
+    """Return the short endpoint name of a CLP URL, e.g. ``consumption/history``."""
+    path = url.split('://', 1)[-1].split('?', 1)[0]
+    return path.split('/ts1/ms/', 1)[-1].strip('/')
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Fail fast on an endpoint that keeps timing out or returning 5xx.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail immediately. Once ``cooldown`` seconds have passed a single
+    half-open probe is let through: success closes the circuit, failure opens
+    it again. Cooldowns run on ``clock``.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 300.0, clock: Clock | None = None):
+        self._clock = clock or Clock()
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._probe_started = None
+
+    def retry_in(self) -> float:
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.cooldown - self._clock.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and self.retry_in() == 0:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        if self.state == self.HALF_OPEN:
+            # A probe that never reported back (e.g. cancelled) must not wedge the circuit.
+            if self._probe_in_flight and self._clock.monotonic() < self._probe_started + self.cooldown:
+                return False
+            self._probe_in_flight = True
+            self._probe_started = self._clock.monotonic()
+            return True
+
+        return self.state == self.CLOSED
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self._opened_at = self._clock.monotonic()
+        self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in": round(self.retry_in()),
+        }
+
+
+class LatencyTracker:
+    """Recent latencies of one endpoint, used to size its timeout and hedge delay.
+
+    Until enough samples are collected the configured timeout is used as is.
+    Afterwards the timeout is a multiple of the observed p99, never above the
+    configured timeout and never below ``floor``.
+    """
+
+    def __init__(self, floor: float = 5.0, headroom: float = 3.0, size: int = 50, min_samples: int = 10):
+        self.floor = floor
+        self.headroom = headroom
+        self.min_samples = min_samples
+        self._samples = collections.deque(maxlen=size)
+
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+    def timeout(self, ceiling: float) -> float:
+        p99 = self.percentile(0.99)
+        if p99 is None:
+            return ceiling
+        return min(ceiling, max(self.floor, p99 * self.headroom))
+
+    def hedge_delay(self) -> float | None:
+        return self.percentile(0.95)
+
+    def stats(self) -> dict:
+        p50 = self.percentile(0.5)
+        p95 = self.percentile(0.95)
+        return {
+            "samples": len(self._samples),
+            "p50": None if p50 is None else round(p50, 3),
+            "p95": None if p95 is None else round(p95, 3),
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+        }
+
+
+REDACTED = "**REDACTED**"
+REDACT_KEYS = {
+    "authorization",
+    "access_token",
+    "refresh_token",
+    "refreshtoken",
+    "ca",
+    "cano",
+    "email",
+    "phone",
+}
+
+
+def redact(value):
+    """Return a copy of ``value`` with tokens, CA numbers and contact details masked."""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if str(key).lower() in REDACT_KEYS and value[key] not in (None, "") else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+class Payload:
+    """Render a payload for a log record only when the record is emitted.
+
+    Redacts it like :func:`redact`, parsing bytes and text as JSON first, and
+    cuts the dump at ``limit`` characters, so leaving debug logging on does
+    not stringify every hourly response.
+    """
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value, limit: int = 2000):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self):
+        value = self.value
+        if isinstance(value, bytes):
+            value = value.decode(errors="replace")
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        if isinstance(value, (dict, list)):
+            text = json.dumps(redact(value), separators=(",", ":"), ensure_ascii=False, default=str)
+        else:
+            text = str(value)
+        if len(text) > self.limit:
+            return f"{text[:self.limit]}... ({len(text)} chars)"
+        return text
+
+
+class LogSampler:
+    """Let the first payload of each key through, then one in ``every``."""
+
+    def __init__(self, every: int = 10):
+        self.every = every
+        self._seen = collections.Counter()
+
+    def __call__(self, key) -> bool:
+        count = self._seen[key]
+        self._seen[key] += 1
+        return count % self.every == 0
+
+
+def _exchange_key(method: str, path: str, body) -> tuple:
+    mode = body.get("mode") if isinstance(body, dict) else None
+    return method.upper(), path, mode
+
+
+class RecordingSession:
+    """Pass requests through to aiohttp and append every exchange to an archive.
+
+    The archive is gzip compressed JSON lines, one exchange per line, with
+    request and response payloads redacted. Lines are queued in the order
+    the exchanges complete and written by a single writer through one open
+    gzip stream, flushed whenever the queue runs dry. Call :meth:`async_close`
+    to write what is left and close the stream.
+    """
+
+    def __init__(self, hass, session, path: str):
+        self._hass = hass
+        self._session = session
+        self._path = path
+        self._queue: list[str] = []
+        self._archive = None
+        self._writer: asyncio.Task | None = None
+
+    def _write(self, lines: list[str]):
+        if self._archive is None:
+            self._archive = gzip.open(self._path, "at", encoding="utf-8")
+        self._archive.write("".join(line + "\n" for line in lines))
+        self._archive.flush()
+
+    def _close(self):
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    async def _async_drain(self):
+        while self._queue:
+            lines, self._queue = self._queue, []
+            await self._hass.async_add_executor_job(self._write, lines)
+
+    def _append(self, line: str):
+        self._queue.append(line)
+        if self._writer is None or self._writer.done():
+            self._writer = self._hass.async_create_background_task(self._async_drain(), "clphk recording writer")
+
+    async def async_close(self):
+        if self._writer is not None:
+            await self._writer
+        await self._hass.async_add_executor_job(self._close)
+
+    async def request(self, method, url, **kwargs):
+        started = time.monotonic()
+        response = await self._session.request(method, url, **kwargs)
+        text = await response.text()
+        elapsed = time.monotonic() - started
+
+        try:
+            body = redact(json.loads(text))
+        except ValueError:
+            body = text
+        line = json.dumps(
+            {
+                "m": method.upper(),
+                "p": urlsplit(str(url)).path,
+                "q": redact(kwargs.get("params")),
+                "j": redact(kwargs.get("json")),
+                "s": response.status,
+                "t": round(elapsed, 3),
+                "r": body,
+            },
+            separators=(",", ":"),
+            default=str,
+        )
+        self._append(line)
+        return response
+
+
+class ReplayResponse:
+    """The part of aiohttp.ClientResponse the integration relies on."""
+
+    def __init__(self, method: str, url: str, status: int, body):
+        self.method = method
+        self.url = URL(url)
+        self.status = status
+        self._text = body if isinstance(body, str) else json.dumps(body)
+        self.request_info = aiohttp.RequestInfo(self.url, method, CIMultiDictProxy(CIMultiDict()), self.url)
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(self.request_info, (), status=self.status, message="Replayed error")
+
+    async def text(self):
+        return self._text
+
+    async def read(self):
+        return self._text.encode()
+
+    async def json(self):
+        return json.loads(self._text)
+
+    def release(self):
+        pass
+
+
+class ReplaySession:
+    """Serve recorded exchanges instead of calling CLP.
+
+    Exchanges are matched on method, path and consumption ``mode`` rather than
+    on the full body, as recorded dates never match today's requests. Each
+    match is served in recorded order, cycling, after its recorded delay.
+    """
+
+    def __init__(self, exchanges: list[dict]):
+        self._exchanges = collections.defaultdict(list)
+        for exchange in exchanges:
+            self._exchanges[_exchange_key(exchange["m"], exchange["p"], exchange.get("j"))].append(exchange)
+        self._cursors = collections.Counter()
+
+    @classmethod
+    def load(cls, path: str) -> ReplaySession:
+        with gzip.open(path, "rt", encoding="utf-8") as archive:
+            return cls([json.loads(line) for line in archive if line.strip()])
+
+    async def request(self, method, url, **kwargs):
+        key = _exchange_key(method, urlsplit(str(url)).path, kwargs.get("json"))
+        candidates = self._exchanges.get(key)
+        if not candidates:
+            raise aiohttp.ClientConnectionError(f"No recorded exchange for {key[0]} {key[1]} mode={key[2]}")
+
+        exchange = candidates[self._cursors[key] % len(candidates)]
+        self._cursors[key] += 1
+        await asyncio.sleep(exchange["t"])
+        return ReplayResponse(method, str(url), exchange["s"], exchange["r"])
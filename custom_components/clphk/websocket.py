@@ -0,0 +1,92 @@
+"""Websocket API serving archived history to the frontend."""
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .aggregate import aggregate
+from .archive import RECORD
+from .const import ARCHIVE_SERIES, CONF_DOMAIN
+
+RESOLUTIONS = ("raw", "day", "week", "month")
+
+
+@callback
+def async_setup_websocket(hass: HomeAssistant):
+    websocket_api.async_register_command(hass, websocket_history)
+
+
+def _find_archive(hass: HomeAssistant, entry_id: str | None, series: str):
+    entries = hass.data.get(CONF_DOMAIN, {}).get("entries", {})
+    for current_id, entry_state in entries.items():
+        if entry_id and entry_id != current_id:
+            continue
+        for (_, archived_series), archive in entry_state.get("archives", {}).items():
+            if archived_series == series:
+                return archive
+    return None
+
+
+def _raw_page(archive, start: int | None, end: int | None, limit: int) -> tuple[list, int | None]:
+    view = archive.view(start, end)
+    records = [list(record) for record in RECORD.iter_unpack(view[:(limit + 1) * RECORD.size])]
+    if len(records) > limit:
+        return records[:limit], records[limit][0]
+    return records, None
+
+
+def _rollup_page(archive, start: int | None, end: int | None, resolution: str, limit: int) -> tuple[list, int | None]:
+    totals = aggregate(archive, "rollup", start=start, end=end, period=resolution).get("totals", [])
+    records = [[total["ts"], total["kwh"]] for total in totals]
+    if len(records) > limit:
+        return records[:limit], records[limit][0]
+    return records, None
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "clphk/history",
+        vol.Optional("entry_id"): str,
+        vol.Required("series"): vol.In(ARCHIVE_SERIES),
+        vol.Optional("resolution", default="raw"): vol.In(RESOLUTIONS),
+        vol.Optional("start"): vol.Coerce(int),
+        vol.Optional("end"): vol.Coerce(int),
+        vol.Optional("cursor"): vol.Coerce(int),
+        vol.Optional("limit", default=500): vol.All(vol.Coerce(int), vol.Range(min=1, max=5000)),
+    }
+)
+@websocket_api.async_response
+async def websocket_history(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]):
+    """Return a page of an archived series.
+
+    ``start`` and ``end`` are epoch seconds, ``end`` excluded. Raw records are
+    ``[ts, kwh, flags]``, rolled up ones ``[period_start_ts, kwh]``. Pass the
+    returned ``next_cursor`` back as ``cursor`` to get the following page.
+    """
+    archive = _find_archive(hass, msg.get("entry_id"), msg["series"])
+    if archive is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, f"No archive for {msg['series']}")
+        return
+
+    start = msg.get("cursor", msg.get("start"))
+    if msg["resolution"] == "raw":
+        records, next_cursor = await hass.async_add_executor_job(
+            _raw_page, archive, start, msg.get("end"), msg["limit"]
+        )
+    else:
+        records, next_cursor = await hass.async_add_executor_job(
+            _rollup_page, archive, start, msg.get("end"), msg["resolution"], msg["limit"]
+        )
+
+    connection.send_result(
+        msg["id"],
+        {
+            "series": msg["series"],
+            "resolution": msg["resolution"],
+            "records": records,
+            "next_cursor": next_cursor,
+        },
+    )
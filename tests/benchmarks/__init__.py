@@ -0,0 +1,4 @@
+"""Benchmarks of the CLPHK integration against the fake CLP API.
+
+Deselected by default, run them with ``pytest -m benchmark -s``.
+"""
@@ -0,0 +1,64 @@
+"""Helpers shared by the benchmarks."""
+from __future__ import annotations
+
+import statistics
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.clphk.const import CONF_DOMAIN
+from custom_components.clphk.sensor import DATA_SOURCES, MAX_IN_FLIGHT, CLPData
+
+from ..conftest import mock_entry
+from ..fake_clp import FakeCLP
+
+ALL_DATA = {
+    "get_account": True,
+    "get_bill": True,
+    "get_estimation": True,
+    "get_bimonthly": True,
+    "get_daily": True,
+    "get_hourly": True,
+    "renewable_energy_sensor_enable": True,
+    "renewable_energy_sensor_get_bill": True,
+    "renewable_energy_sensor_get_daily": True,
+    "renewable_energy_sensor_get_hourly": True,
+}
+
+
+async def setup_entry(hass: HomeAssistant, server: FakeCLP, title: str = "CLP", **options):
+    """Set up an entry against ``server`` and wait for its first update."""
+    entry = mock_entry(server, title=title, **options)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    return entry
+
+
+def sensors(hass: HomeAssistant, entry) -> list[CLPData]:
+    """The data behind each sensor of ``entry``, which runs its update cycles."""
+    return hass.data[CONF_DOMAIN]["entries"][entry.entry_id]["data"]
+
+
+def unthrottle(hass: HomeAssistant):
+    """Lift the request rate limit, so the benchmarks time the integration and not the token bucket."""
+    hass.data[CONF_DOMAIN]["scheduler"].configure(rate=1e6, burst=1_000_000, max_in_flight=MAX_IN_FLIGHT)
+
+
+def make_due(data: CLPData):
+    """Make every fetch the data has a reader for due in its next cycle."""
+    data._first_fetch.update(DATA_SOURCES)
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def summary(values: list[float]) -> str:
+    return (
+        f"mean={statistics.fmean(values) * 1000:8.2f}ms "
+        f"p50={percentile(values, 0.5) * 1000:8.2f}ms "
+        f"p99={percentile(values, 0.99) * 1000:8.2f}ms"
+    )
@@ -0,0 +1,93 @@
+"""Event-loop lag, cycle latency, memory and pool saturation as the number of entries grows.
+
+Each scenario sets up ``entries`` entries with every series enabled against
+one fake CLP API answering after ``LATENCY``, lifts the rate limit, then runs
+``ROUNDS`` rounds in which every sensor of every entry runs a full cycle at
+the same time. Alongside, a probe sleeps ``PROBE`` seconds at a time: how
+late it wakes up is the event-loop lag, and it samples the request
+scheduler to tell how often all ``max_in_flight`` slots were taken.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+import tracemalloc
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.clphk.const import CONF_DOMAIN
+
+from ..fake_clp import FakeCLP
+from .common import ALL_DATA, make_due, percentile, sensors, setup_entry, unthrottle
+
+pytestmark = pytest.mark.benchmark
+
+ROUNDS = 10
+LATENCY = 0.02
+PROBE = 0.005
+
+
+async def _probe(scheduler, lags: list[float], samples: list[tuple[int, int]]):
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(PROBE)
+        lags.append(loop.time() - started - PROBE)
+        samples.append((scheduler.in_flight, scheduler.queued))
+
+
+async def _timed(sensor) -> float:
+    started = time.perf_counter()
+    await sensor._async_update_cycle()
+    return time.perf_counter() - started
+
+
+@pytest.mark.parametrize("entries", [1, 2, 4, 8, 16])
+async def test_load(hass: HomeAssistant, fake_clp: FakeCLP, entries: int):
+    fake_clp.latency = LATENCY
+    config_entries = []
+    for index in range(entries):
+        config_entries.append(await setup_entry(hass, fake_clp, title=f"CLP {index}", **ALL_DATA))
+        # Later entries apply their own limits again
+        unthrottle(hass)
+    all_sensors = [sensor for entry in config_entries for sensor in sensors(hass, entry)]
+    scheduler = hass.data[CONF_DOMAIN]["scheduler"]
+    fake_clp.reset_counters()
+
+    loop = asyncio.get_running_loop()
+    debug = loop.get_debug()
+    # Debug mode, on under the test fixtures, would dominate the lag
+    loop.set_debug(False)
+    lags, samples, cycles = [], [], []
+    tracemalloc.start()
+    probe = asyncio.create_task(_probe(scheduler, lags, samples))
+    started = time.perf_counter()
+    try:
+        for _ in range(ROUNDS):
+            for sensor in all_sensors:
+                make_due(sensor)
+            cycles.extend(await asyncio.gather(*(_timed(sensor) for sensor in all_sensors)))
+    finally:
+        seconds = time.perf_counter() - started
+        probe.cancel()
+        await asyncio.gather(probe, return_exceptions=True)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        loop.set_debug(debug)
+
+    saturated = sum(1 for in_flight, _ in samples if in_flight >= scheduler.max_in_flight)
+    print(
+        f"\n{entries:2} entries: {sum(fake_clp.requests.values()) / seconds:6.1f} req/s "
+        f"cycle p50={percentile(cycles, 0.5) * 1000:7.1f}ms p99={percentile(cycles, 0.99) * 1000:7.1f}ms "
+        f"loop lag p50={percentile(lags, 0.5) * 1000:5.2f}ms p99={percentile(lags, 0.99) * 1000:5.2f}ms "
+        f"max={max(lags) * 1000:5.2f}ms peak memory={peak // 1024} KiB "
+        f"pool saturated {saturated / len(samples):4.0%} of samples, "
+        f"peak in flight {fake_clp.peak_in_flight}/{scheduler.max_in_flight}, "
+        f"peak queued {max(queued for _, queued in samples)}"
+    )
+    assert fake_clp.peak_in_flight <= 2 * scheduler.max_in_flight
+
+    for entry in config_entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
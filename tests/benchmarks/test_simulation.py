@@ -0,0 +1,38 @@
+"""Eight weeks of polling on the simulated clock, per configuration.
+
+Reports requests per day and endpoint, retries and the size of the series
+objects at the end of each day.
+"""
+from __future__ import annotations
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from ..fake_clp import CONSUMPTION_HISTORY, RENEW_DASHBOARD
+from ..simulation import simulate
+from .common import ALL_DATA
+
+pytestmark = pytest.mark.benchmark
+
+DAYS = 56
+
+SCENARIOS = {
+    "hourly state": ([{}], None),
+    "all data": ([ALL_DATA], None),
+    "all data, 7 backfill days": ([{**ALL_DATA, "backfill_days": 7}], None),
+    "all data, 2% 5xx": (
+        [ALL_DATA],
+        {
+            CONSUMPTION_HISTORY: {"status": 503, "rate": 0.02},
+            RENEW_DASHBOARD: {"status": 503, "rate": 0.02},
+        },
+    ),
+    "two entries": ([ALL_DATA, ALL_DATA], None),
+}
+
+
+@pytest.mark.parametrize("scenario", list(SCENARIOS))
+async def test_simulation(hass: HomeAssistant, socket_enabled, scenario: str):
+    entries, failures = SCENARIOS[scenario]
+    report = await simulate(hass, days=DAYS, entries=entries, failures=failures)
+    print(f"\n== {scenario}\n{report.format()}")
@@ -0,0 +1,137 @@
+"""Startup cost of the integration and event-loop blocking of the OTP login.
+
+* Import: ``import custom_components.clphk.sensor`` in a fresh interpreter
+  that has already loaded what Home Assistant itself needs, median of
+  ``IMPORT_RUNS``, and which heavy modules it was the first to load.
+* Setup: time for ``async_setup`` of an entry to return and until the main
+  sensor has its first state, against the fake CLP API answering after
+  ``LATENCY``.
+* Blocking: the longest the event loop went without running a probe that
+  sleeps ``PROBE`` seconds at a time, during setup and during an OTP request,
+  and the CPU time of the OTP encryption the request hands to the executor.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import pytest
+from homeassistant.const import STATE_UNKNOWN
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import aiohttp_client
+
+from custom_components.clphk import _clp_public_key, encrypt_otp_request, request_otp
+
+from ..conftest import mock_entry
+from ..fake_clp import FakeCLP
+
+pytestmark = pytest.mark.benchmark
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+IMPORT_RUNS = 5
+LATENCY = 0.1
+PROBE = 0.001
+HEAVY = ("cryptography", "pytz", "dateutil", "homeassistant.components.lock")
+
+IMPORT_SCRIPT = f"""
+import json, sys, time
+# Loaded by Home Assistant before any integration
+import aiohttp, voluptuous
+import homeassistant.core, homeassistant.helpers.config_validation, homeassistant.helpers.entity_platform
+import homeassistant.components.sensor
+before = set(sys.modules)
+started = time.perf_counter()
+import custom_components.clphk.sensor
+seconds = time.perf_counter() - started
+print(json.dumps({{"seconds": seconds, "heavy": [m for m in {HEAVY!r} if m in sys.modules and m not in before]}}))
+"""
+
+
+def import_time(root: str = ROOT) -> tuple[float, list[str]]:
+    """Median seconds to import the sensor platform from ``root``, and the heavy modules it loaded."""
+    runs = [
+        json.loads(subprocess.run(
+            [sys.executable, "-c", IMPORT_SCRIPT], cwd=root, check=True, capture_output=True, text=True
+        ).stdout)
+        for _ in range(IMPORT_RUNS)
+    ]
+    return statistics.median(run["seconds"] for run in runs), runs[0]["heavy"]
+
+
+class Stalls:
+    """Longest gap between two runs of a probe on the event loop."""
+
+    def __init__(self):
+        self.longest = 0.0
+        self._task = None
+
+    async def _probe(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(PROBE)
+            self.longest = max(self.longest, loop.time() - started - PROBE)
+
+    def __enter__(self):
+        self._task = asyncio.get_running_loop().create_task(self._probe())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+
+async def test_import():
+    seconds, heavy = import_time()
+    print(f"\nimport custom_components.clphk.sensor: {seconds * 1000:.1f}ms, heavy modules loaded: {heavy or 'none'}")
+
+
+async def test_otp_encryption():
+    _clp_public_key.cache_clear()
+    started = time.perf_counter()
+    encrypt_otp_request("user@example.com")
+    cold = time.perf_counter() - started
+    started = time.perf_counter()
+    encrypt_otp_request("user@example.com")
+    warm = time.perf_counter() - started
+    print(f"\nOTP encryption: {cold * 1000:.2f}ms with the key parsed, {warm * 1000:.2f}ms with it cached")
+
+
+async def test_setup_and_otp(hass: HomeAssistant, fake_clp: FakeCLP):
+    fake_clp.latency = LATENCY
+    loop = asyncio.get_running_loop()
+    debug = loop.get_debug()
+    # Debug mode, on under the test fixtures, slows every callback down
+    loop.set_debug(False)
+    try:
+        entry = mock_entry(fake_clp, get_account=True, get_hourly=True)
+        entry.add_to_hass(hass)
+        with Stalls() as setup_stalls:
+            started = time.perf_counter()
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            setup = time.perf_counter() - started
+            while (state := hass.states.get("sensor.clp")) is None or state.state == STATE_UNKNOWN:
+                await asyncio.sleep(PROBE)
+            first_state = time.perf_counter() - started
+
+        session = aiohttp_client.async_get_clientsession(hass)
+        with Stalls() as otp_stalls:
+            started = time.perf_counter()
+            await request_otp(session, "user@example.com", base_url=fake_clp.base_url)
+            otp = time.perf_counter() - started
+    finally:
+        loop.set_debug(debug)
+
+    print(
+        f"\nsetup {setup * 1000:.1f}ms, first state {first_state * 1000:.1f}ms, "
+        f"longest stall {setup_stalls.longest * 1000:.2f}ms"
+        f"\nOTP request {otp * 1000:.1f}ms, longest stall {otp_stalls.longest * 1000:.2f}ms"
+    )
+    assert setup < LATENCY
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
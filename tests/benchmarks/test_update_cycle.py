@@ -0,0 +1,67 @@
+"""Time, requests and CPU of one update cycle against the fake CLP API.
+
+Each scenario sets up an entry, then runs ``CYCLES`` full cycles, with every
+fetch due, and as many idle cycles, with nothing due. A cycle is timed from
+the start of the fetches to the last listener being called, on the wall
+clock and on the process CPU clock.
+"""
+from __future__ import annotations
+
+import time
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from ..fake_clp import FakeCLP
+from .common import ALL_DATA, make_due, sensors, setup_entry, summary, unthrottle
+
+pytestmark = pytest.mark.benchmark
+
+CYCLES = 50
+
+SCENARIOS = {
+    "hourly state": ({}, {}),
+    "all data": (ALL_DATA, {}),
+    "all data, 4 hourly days": ({**ALL_DATA, "get_hourly_days": 4, "renewable_energy_sensor_get_hourly_days": 4}, {}),
+    "all data, 2 KiB rows": (ALL_DATA, {"padding": 2048}),
+    "all data, 24 bills": (ALL_DATA, {"history": 24}),
+    "all data, 20 ms latency": (ALL_DATA, {"latency": 0.02}),
+}
+
+
+async def _cycles(hass: HomeAssistant, server: FakeCLP, entry, due: bool):
+    wall, cpu, requests = [], [], []
+    for _ in range(CYCLES):
+        before = sum(server.requests.values())
+        started, started_cpu = time.perf_counter(), time.process_time()
+        for sensor in sensors(hass, entry):
+            if due:
+                make_due(sensor)
+            await sensor._async_update_cycle()
+        wall.append(time.perf_counter() - started)
+        cpu.append(time.process_time() - started_cpu)
+        requests.append(sum(server.requests.values()) - before)
+    return wall, cpu, requests
+
+
+@pytest.mark.parametrize("scenario", list(SCENARIOS))
+async def test_update_cycle(hass: HomeAssistant, fake_clp: FakeCLP, scenario: str):
+    options, server_options = SCENARIOS[scenario]
+    for key, value in server_options.items():
+        setattr(fake_clp, key, value)
+    entry = await setup_entry(hass, fake_clp, **options)
+    unthrottle(hass)
+
+    for label, due in (("full", True), ("idle", False)):
+        wall, cpu, requests = await _cycles(hass, fake_clp, entry, due)
+        print(
+            f"\n{scenario:26} {label:4} cycle {summary(wall)} "
+            f"cpu {summary(cpu)} requests/cycle={sum(requests) / CYCLES:5.1f}"
+        )
+        if due:
+            assert min(requests) > 0
+        else:
+            assert max(requests) == 0
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
@@ -0,0 +1,58 @@
+"""Fixtures shared by the CLPHK tests."""
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+from aiohttp.resolver import ThreadedResolver
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.clphk.const import CONF_API_BASE_URL, CONF_DOMAIN
+
+from .fake_clp import FakeCLP
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    yield
+
+
+@pytest.fixture(autouse=True)
+def config_dir(hass, tmp_path):
+    # Archives and exports are written to the config directory, which the tests would otherwise share
+    hass.config.config_dir = str(tmp_path)
+
+
+@pytest.fixture(autouse=True)
+def threaded_resolver():
+    # The fake API is reached by IP; the c-ares resolver would leave its shutdown thread behind
+    with patch("homeassistant.helpers.aiohttp_client.AsyncResolver", ThreadedResolver):
+        yield
+
+
+@pytest.fixture
+async def fake_clp(socket_enabled):
+    server = FakeCLP()
+    await server.start()
+    yield server
+    await server.close()
+
+
+def mock_entry(server: FakeCLP, title: str = "CLP", pref_disable_polling: bool = False, **options) -> MockConfigEntry:
+    """A config entry logged in to ``server``, with ``options`` on top of the defaults."""
+    return MockConfigEntry(
+        domain=CONF_DOMAIN,
+        title=title,
+        pref_disable_polling=pref_disable_polling,
+        data={
+            "name": title,
+            "email_address": "user@example.com",
+            **server.issue_tokens(),
+        },
+        options={
+            CONF_API_BASE_URL: server.base_url,
+            **options,
+        },
+    )
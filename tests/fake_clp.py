@@ -0,0 +1,375 @@
+"""A fake CLP API for tests and benchmarks.
+
+Serves the endpoints the integration calls with responses shaped like the
+recorded CLP traffic, generated from the server's clock so the data moves
+on as (simulated) time passes:
+
+* ``profile/accountdetails/myServicesCA``
+* ``billing/transaction/historyBilling``
+* ``consumption/info``
+* ``consumption/history`` in ``Bill``, ``Daily`` and ``Hourly`` mode
+* ``renew/fit/dashboard`` in ``B``, ``D`` and ``H`` mode
+* ``profile/identity/manage/account/refresh_token`` and the OTP login
+
+Latency, payload size and failures are configurable per endpoint, and every
+request is counted so callers can assert on or report the traffic.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import json
+import random
+import secrets
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+from custom_components.clphk.const import (
+    API_PATH_ACCOUNT_DETAIL,
+    API_PATH_BILLING_HISTORY,
+    API_PATH_CONSUMPTION_HISTORY,
+    API_PATH_CONSUMPTION_INFO,
+    API_PATH_OTP_REQUEST,
+    API_PATH_OTP_VERIFY,
+    API_PATH_REFRESH_TOKEN,
+    API_PATH_RENEW_DASHBOARD,
+)
+from custom_components.clphk.clock import HKT
+from custom_components.clphk.transport import endpoint_of
+
+ACCOUNT_NUMBER = "0123456789"
+
+ACCOUNT_DETAIL = endpoint_of(API_PATH_ACCOUNT_DETAIL)
+BILLING_HISTORY = endpoint_of(API_PATH_BILLING_HISTORY)
+CONSUMPTION_INFO = endpoint_of(API_PATH_CONSUMPTION_INFO)
+CONSUMPTION_HISTORY = endpoint_of(API_PATH_CONSUMPTION_HISTORY)
+RENEW_DASHBOARD = endpoint_of(API_PATH_RENEW_DASHBOARD)
+REFRESH_TOKEN = endpoint_of(API_PATH_REFRESH_TOKEN)
+OTP_REQUEST = endpoint_of(API_PATH_OTP_REQUEST)
+OTP_VERIFY = endpoint_of(API_PATH_OTP_VERIFY)
+
+
+@dataclass
+class Failure:
+    """Answer ``status`` with ``body`` instead of the data.
+
+    ``count`` failures are served first, then each request fails with
+    probability ``rate``.
+    """
+
+    status: int
+    count: int = 0
+    rate: float = 0.0
+    body: dict = field(default_factory=lambda: {"code": 500, "message": "injected"})
+
+
+def _kwh(at: datetime.datetime, scale: float = 1.0) -> float:
+    """Deterministic reading for the hour starting at ``at``."""
+    return round(scale * (0.2 + (hash((at.year, at.month, at.day, at.hour)) % 900) / 1000), 2)
+
+
+def _fmt(value: datetime.datetime) -> str:
+    return value.strftime("%Y%m%d%H%M%S")
+
+
+class FakeCLP:
+    """An aiohttp application standing in for ``api.clp.com.hk``.
+
+    ``now`` is the clock the data is generated from. Hourly readings are
+    published ``hourly_lag`` after the hour, daily readings the day after
+    and renewable readings are validated ``renewable_lag`` later.
+    ``latency`` (seconds, or a callable of the endpoint name) delays every
+    answer, ``padding`` adds that many bytes to every row and ``history``
+    is the number of bills and bimonthly periods returned. Access tokens
+    expire after ``token_lifetime`` seconds and are then rejected with the
+    906 code CLP uses.
+    """
+
+    def __init__(
+            self,
+            *,
+            now: Callable[[], datetime.datetime] | None = None,
+            latency: float | Callable[[str], float] = 0.0,
+            padding: int = 0,
+            history: int = 7,
+            hourly_lag: datetime.timedelta = datetime.timedelta(hours=4),
+            renewable_lag: datetime.timedelta = datetime.timedelta(days=2),
+            token_lifetime: int = 86400,
+            seed: int = 0,
+    ):
+        self._now = now or (lambda: datetime.datetime.now(HKT))
+        self.latency = latency
+        self.padding = padding
+        self.history = history
+        self.hourly_lag = hourly_lag
+        self.renewable_lag = renewable_lag
+        self.token_lifetime = token_lifetime
+        self.failures: dict[str, Failure] = {}
+        self.requests: Counter[str] = Counter()
+        # consumption/history and renew/fit/dashboard requests by mode
+        self.modes: Counter[str] = Counter()
+        self.responses: Counter[tuple[str, int]] = Counter()
+        self.bytes_sent = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.otp = "123456"
+        self._random = random.Random(seed)
+        self._tokens: dict[str, datetime.datetime] = {}
+        self._refresh_tokens: set[str] = set()
+        self._runner: web.AppRunner | None = None
+        self.base_url: str | None = None
+
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.router.add_get(API_PATH_ACCOUNT_DETAIL, self._account_detail)
+        self.app.router.add_post(API_PATH_BILLING_HISTORY, self._billing_history)
+        self.app.router.add_get(API_PATH_CONSUMPTION_INFO, self._consumption_info)
+        self.app.router.add_post(API_PATH_CONSUMPTION_HISTORY, self._consumption_history)
+        self.app.router.add_post(API_PATH_RENEW_DASHBOARD, self._renew_dashboard)
+        self.app.router.add_post(API_PATH_REFRESH_TOKEN, self._refresh_token)
+        self.app.router.add_post(API_PATH_OTP_REQUEST, self._otp_request)
+        self.app.router.add_post(API_PATH_OTP_VERIFY, self._otp_verify)
+
+    async def start(self) -> str:
+        """Listen on a free local port and return the base URL to configure."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f"http://127.0.0.1:{port}"
+        return self.base_url
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def now(self) -> datetime.datetime:
+        return self._now().astimezone(HKT)
+
+    def fail(self, endpoint: str, status: int, *, count: int = 0, rate: float = 0.0, body: dict | None = None):
+        """Inject failures on ``endpoint`` (a name such as :data:`CONSUMPTION_HISTORY`)."""
+        failure = Failure(status, count=count, rate=rate)
+        if body is not None:
+            failure.body = body
+        self.failures[endpoint] = failure
+
+    def issue_tokens(self) -> dict:
+        """Mint a token pair, as the OTP login or a refresh would."""
+        access_token = secrets.token_hex(16)
+        refresh_token = secrets.token_hex(16)
+        self._tokens[access_token] = self.now() + datetime.timedelta(seconds=self.token_lifetime)
+        self._refresh_tokens.add(refresh_token)
+        return {
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "expires_in": self.token_lifetime,
+        }
+
+    def reset_counters(self):
+        self.requests.clear()
+        self.modes.clear()
+        self.responses.clear()
+        self.bytes_sent = 0
+        self.peak_in_flight = 0
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        endpoint = endpoint_of(request.path)
+        self.requests[endpoint] += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            latency = self.latency(endpoint) if callable(self.latency) else self.latency
+            if latency:
+                await asyncio.sleep(latency)
+            response = self._injected(endpoint)
+            if response is None and endpoint not in (OTP_REQUEST, OTP_VERIFY, REFRESH_TOKEN):
+                response = self._check_token(request)
+            if response is None:
+                response = await handler(request)
+        finally:
+            self.in_flight -= 1
+        self.responses[(endpoint, response.status)] += 1
+        self.bytes_sent += len(response.body or b"")
+        return response
+
+    def _injected(self, endpoint: str) -> web.Response | None:
+        failure = self.failures.get(endpoint)
+        if failure is None:
+            return None
+        if failure.count > 0:
+            failure.count -= 1
+        elif not (failure.rate and self._random.random() < failure.rate):
+            return None
+        return self._json(failure.body, status=failure.status)
+
+    def _check_token(self, request: web.Request) -> web.Response | None:
+        expiry = self._tokens.get(request.headers.get("Authorization", ""))
+        if expiry is None or expiry <= self.now():
+            return self._json({"code": 906, "message": "Token expired"}, status=401)
+        return None
+
+    def _json(self, payload: dict, status: int = 200) -> web.Response:
+        return web.Response(body=json.dumps(payload).encode(), status=status, content_type="application/json")
+
+    def _row(self, row: dict) -> dict:
+        if self.padding:
+            row["padding"] = "x" * self.padding
+        return row
+
+    def _bill_ends(self) -> list[datetime.datetime]:
+        """End of the last ``history`` bimonthly periods, newest first."""
+        today = self.now().replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+        return [today - datetime.timedelta(days=5 + 61 * i) for i in range(self.history)]
+
+    def _hours(self, start: datetime.datetime, end: datetime.datetime, published: datetime.datetime):
+        hour = start
+        while hour < end and hour + datetime.timedelta(hours=1) <= published:
+            yield hour
+            hour += datetime.timedelta(hours=1)
+
+    async def _otp_request(self, request: web.Request):
+        await request.json()
+        return self._json({"data": {"otpSent": True}})
+
+    async def _otp_verify(self, request: web.Request):
+        body = await request.json()
+        if body.get("otp") != self.otp:
+            return self._json({"code": 400, "message": "Invalid OTP"}, status=400)
+        return self._json({"data": self.issue_tokens()})
+
+    async def _refresh_token(self, request: web.Request):
+        body = await request.json()
+        refresh_token = body.get("refreshToken")
+        if refresh_token not in self._refresh_tokens:
+            return self._json({"code": 401, "message": "Invalid refresh token"}, status=401)
+        self._refresh_tokens.discard(refresh_token)
+        return self._json({"data": self.issue_tokens()})
+
+    async def _account_detail(self, request: web.Request):
+        due = self._bill_ends()[0] + datetime.timedelta(days=21)
+        return self._json({"data": [
+            self._row({"status": "Inactive", "caNo": "9999999999", "outstandingAmount": "0", "dueDate": ""}),
+            self._row({
+                "status": "Active",
+                "caNo": ACCOUNT_NUMBER,
+                "outstandingAmount": "512.30",
+                "dueDate": _fmt(due),
+            }),
+        ]})
+
+    async def _billing_history(self, request: web.Request):
+        await request.json()
+        transactions = []
+        for end in self._bill_ends():
+            start = end - datetime.timedelta(days=61)
+            transactions.append(self._row({
+                "type": "bill",
+                "total": "%.2f" % (400 + end.toordinal() % 200),
+                "tranDate": _fmt(end + datetime.timedelta(days=1)),
+                "fromDate": _fmt(start),
+                "toDate": _fmt(end),
+            }))
+            transactions.append(self._row({
+                "type": "payment",
+                "total": "%.2f" % (400 + end.toordinal() % 200),
+                "tranDate": _fmt(end + datetime.timedelta(days=15)),
+            }))
+        return self._json({"data": {"transactions": transactions}})
+
+    async def _consumption_info(self, request: web.Request):
+        start = self._bill_ends()[0] + datetime.timedelta(days=1)
+        end = start + datetime.timedelta(days=61)
+        return self._json({"data": {
+            "currentConsumption": "321.5",
+            "currentCost": "402.1",
+            "currentStartDate": _fmt(start),
+            "currentEndDate": _fmt(self.now().replace(tzinfo=None)),
+            "deviationPercent": "-3.2",
+            "projectedConsumption": "640.0",
+            "projectedCost": "801.7",
+            "projectedStartDate": _fmt(start),
+            "projectedEndDate": _fmt(end),
+        }})
+
+    async def _consumption_history(self, request: web.Request):
+        body = await request.json()
+        mode = body.get("mode")
+        self.modes[f"{CONSUMPTION_HISTORY}:{mode}"] += 1
+        if body.get("ca") != ACCOUNT_NUMBER:
+            return self._json({"code": 400, "message": "Unknown account"}, status=400)
+
+        if mode == "Bill":
+            results = [
+                self._row({"totKwh": 500 + end.toordinal() % 300, "endabrpe": end.strftime("%Y%m%d")})
+                for end in self._bill_ends()
+            ]
+            return self._json({"data": {"results": results}})
+
+        start = datetime.datetime.strptime(body["fromDate"], "%Y%m%d%H%M%S")
+        end = datetime.datetime.strptime(body["toDate"], "%Y%m%d%H%M%S")
+        now = self.now().replace(tzinfo=None)
+        results = []
+        if mode == "Hourly":
+            for hour in self._hours(start, end, now - self.hourly_lag):
+                results.append(self._row({
+                    "startDate": _fmt(hour),
+                    "expireDate": _fmt(hour + datetime.timedelta(hours=1)),
+                    "kwhTotal": _kwh(hour),
+                }))
+        elif mode == "Daily":
+            day = start
+            published = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            while day < end and day + datetime.timedelta(days=1) <= published:
+                results.append(self._row({
+                    "startDate": _fmt(day),
+                    "expireDate": _fmt(day + datetime.timedelta(days=1)),
+                    "kwhTotal": round(sum(_kwh(day + datetime.timedelta(hours=h)) for h in range(24)), 2),
+                }))
+                day += datetime.timedelta(days=1)
+        else:
+            return self._json({"code": 400, "message": f"Unknown mode {mode}"}, status=400)
+        return self._json({"data": {"results": results}})
+
+    async def _renew_dashboard(self, request: web.Request):
+        body = await request.json()
+        mode = body.get("mode")
+        self.modes[f"{RENEW_DASHBOARD}:{mode}"] += 1
+        if body.get("caNo") != ACCOUNT_NUMBER:
+            return self._json({"code": 400, "message": "Unknown account"}, status=400)
+
+        now = self.now().replace(tzinfo=None)
+        validated = now - self.renewable_lag
+        rows = []
+        if mode == "B":
+            for end in reversed(self._bill_ends()):
+                rows.append(self._row({
+                    "startdate": _fmt(end - datetime.timedelta(days=61)),
+                    "enddate": _fmt(end),
+                    "kwhtotal": "%.2f" % (100 + end.toordinal() % 50),
+                    "validateStatus": "Y",
+                }))
+        elif mode in ("D", "H"):
+            day = datetime.datetime.strptime(body["startDate"], "%m/%d/%Y")
+            if mode == "D":
+                starts = [day - datetime.timedelta(days=i) for i in range(6, -1, -1)]
+                step = datetime.timedelta(days=1)
+            else:
+                starts = list(self._hours(day, day + datetime.timedelta(days=1), now))
+                step = datetime.timedelta(hours=1)
+            for start in starts:
+                if start + step > now:
+                    continue
+                rows.append(self._row({
+                    "startdate": _fmt(start),
+                    "enddate": _fmt(start + step),
+                    "kwhtotal": "%.2f" % (_kwh(start, 0.3) * (24 if mode == "D" else 1)),
+                    "validateStatus": "Y" if start + step <= validated else "N",
+                }))
+        else:
+            return self._json({"code": 400, "message": f"Unknown mode {mode}"}, status=400)
+        return self._json({"data": {"consumptionData": rows}})
@@ -0,0 +1,332 @@
+"""Weeks of polling in seconds: the integration on a simulated clock against the fake CLP API.
+
+:class:`SimulatedClock` replaces the clock in ``hass.data[DOMAIN]["clock"]``,
+so the sensors, throttle, scheduler, circuit breakers, login, retry timers
+and token writer all run on virtual time, and so does the fake API. The
+driver polls every entity Home Assistant would poll once per
+``scan_interval`` of virtual time. Between polls the clock jumps straight to
+the next timer once every task of the integration is done or waiting on the
+clock, so an idle week takes as long as the requests it makes.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import datetime
+import heapq
+import itertools
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity_platform import async_get_platforms
+
+from custom_components.clphk.clock import Clock
+from custom_components.clphk.const import CONF_DOMAIN
+from custom_components.clphk.clock import HKT
+
+from .conftest import mock_entry
+from .fake_clp import FakeCLP
+
+START = datetime.datetime(2026, 1, 5, tzinfo=HKT)
+
+# Attributes of a CLPData that hold series or grow with the data
+SERIES_ATTRIBUTES = (
+    "_account", "_bills", "_estimation", "_bimonthly", "_daily", "_hourly",
+    "_hourly_tracker", "_daily_tracker", "_negative_cache", "_backfill_hold",
+)
+
+
+class SimulatedClock(Clock):
+    """A clock that only moves when told to.
+
+    ``waiting`` counts the :meth:`timeout` blocks in progress, which is how
+    the driver tells a task waiting on virtual time from one still busy.
+    """
+
+    def __init__(self, start: datetime.datetime = START):
+        self._time = start.timestamp()
+        self._timers = []
+        self._sequence = itertools.count()
+        self.waiting = 0
+
+    def now(self, tz: datetime.tzinfo = datetime.timezone.utc) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self._time, tz)
+
+    def monotonic(self) -> float:
+        return self._time
+
+    def call_later(self, hass, delay, action):
+        timer = [self._time + max(delay, 0), next(self._sequence), action]
+        heapq.heappush(self._timers, timer)
+
+        def cancel():
+            timer[2] = None
+
+        return cancel
+
+    @contextlib.asynccontextmanager
+    async def timeout(self, delay):
+        loop = asyncio.get_running_loop()
+        woken = False
+        self.waiting += 1
+        async with asyncio.timeout(None) as timeout:
+
+            def expire(_now):
+                nonlocal woken
+                woken = True
+                self.waiting -= 1
+                timeout.reschedule(loop.time())
+
+            cancel = None if delay is None else self.call_later(None, delay, expire)
+            try:
+                yield timeout
+            finally:
+                if cancel is not None:
+                    cancel()
+                if not woken:
+                    self.waiting -= 1
+
+    def next_deadline(self) -> float | None:
+        while self._timers and self._timers[0][2] is None:
+            heapq.heappop(self._timers)
+        return self._timers[0][0] if self._timers else None
+
+    def fire_next(self):
+        deadline, _, action = heapq.heappop(self._timers)
+        self._time = max(self._time, deadline)
+        action(self.now())
+
+    def set(self, timestamp: float):
+        self._time = max(self._time, timestamp)
+
+
+def deep_size(value, seen: set | None = None) -> int:
+    """Bytes held by ``value`` and everything it references, counted once."""
+    if seen is None:
+        seen = set()
+    if id(value) in seen or isinstance(value, (type, HomeAssistant)):
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in value)
+    elif hasattr(value, "__dict__"):
+        size += deep_size(vars(value), seen)
+    return size
+
+
+@dataclass
+class Report:
+    days: float
+    seconds: float
+    requests: Counter
+    modes: Counter
+    retries: int
+    token_refreshes: int
+    backfilled_days: int
+    errors: dict
+    polls: int
+    # Bytes of the series objects of all sensors at the end of each simulated day
+    series_bytes: list[int] = field(default_factory=list)
+    # Bytes allocated by Python and still held at the end of each simulated day
+    traced_bytes: list[int] = field(default_factory=list)
+
+    def per_day(self, counter: Counter) -> dict[str, float]:
+        return {key: round(count / self.days, 1) for key, count in sorted(counter.items())}
+
+    def format(self) -> str:
+        lines = [f"{self.days:.0f} simulated days in {self.seconds:.1f}s, {self.polls} polls"]
+        lines.append("requests per day:")
+        for key, value in self.per_day(self.requests + self.modes).items():
+            lines.append(f"  {key:45} {value:8.1f}")
+        lines.append(
+            f"retries scheduled={self.retries} token refreshes={self.token_refreshes} "
+            f"backfilled days={self.backfilled_days} errors={self.errors}"
+        )
+        lines.append(
+            f"series objects: day 1 {self.series_bytes[0]} B, last day {self.series_bytes[-1]} B, "
+            f"max {max(self.series_bytes)} B"
+        )
+        lines.append(
+            f"traced memory: day 1 {self.traced_bytes[0] // 1024} KiB, "
+            f"last day {self.traced_bytes[-1] // 1024} KiB"
+        )
+        return "\n".join(lines)
+
+
+class Simulation:
+    """Drive the entries of ``hass`` on ``clock`` against ``server``."""
+
+    def __init__(self, hass: HomeAssistant, server: FakeCLP, clock: SimulatedClock, scan_interval: float = 30):
+        self.hass = hass
+        self.server = server
+        self.clock = clock
+        self.scan_interval = scan_interval
+        self.polls = 0
+        self._polling: dict[str, asyncio.Task] = {}
+
+    def _busy(self) -> int:
+        current = asyncio.current_task()
+        return sum(
+            1 for task in asyncio.all_tasks()
+            if task is not current and not task.done() and task.get_name().startswith(CONF_DOMAIN)
+        )
+
+    async def settle(self, limit: float = 30):
+        """Return once every task of the integration is done or waiting on the clock."""
+        deadline = time.monotonic() + limit
+        stable = 0
+        while stable < 3:
+            await asyncio.sleep(0)
+            if self._busy() <= self.clock.waiting:
+                stable += 1
+                continue
+            stable = 0
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{self._busy()} tasks still busy, {self.clock.waiting} waiting on the clock")
+            await asyncio.sleep(0.0005)
+        await self.hass.async_block_till_done()
+
+    def _poll(self):
+        for platform in async_get_platforms(self.hass, CONF_DOMAIN):
+            for entity in platform.entities.values():
+                previous = self._polling.get(entity.entity_id)
+                if not entity.should_poll or (previous is not None and not previous.done()):
+                    continue
+                self.polls += 1
+                self._polling[entity.entity_id] = self.hass.async_create_background_task(
+                    entity.async_update_ha_state(True), f"{CONF_DOMAIN} poll {entity.entity_id}"
+                )
+
+    async def run(self, seconds: float, on_day=None):
+        """Advance the clock by ``seconds``, polling and firing timers on the way."""
+        end = self.clock.monotonic() + seconds
+        next_poll = self.clock.monotonic()
+        next_day = self.clock.monotonic() + 86400
+        while True:
+            deadline = self.clock.next_deadline()
+            upcoming = min(d for d in (deadline, next_poll, next_day) if d is not None)
+            if upcoming > end:
+                break
+            if deadline is not None and deadline == upcoming:
+                self.clock.fire_next()
+            elif upcoming == next_poll:
+                self.clock.set(next_poll)
+                self._poll()
+                next_poll += self.scan_interval
+            else:
+                self.clock.set(next_day)
+                next_day += 86400
+                await self.settle()
+                if on_day is not None:
+                    on_day()
+                continue
+            await self.settle()
+        self.clock.set(end)
+        await self.settle()
+
+
+def series_bytes(hass: HomeAssistant) -> int:
+    seen = set()
+    total = 0
+    for entry_state in hass.data[CONF_DOMAIN]["entries"].values():
+        for data in entry_state.get("data", []):
+            total += sum(deep_size(getattr(data, name, None), seen) for name in SERIES_ATTRIBUTES)
+        total += deep_size(entry_state["metrics"], seen)
+    for key in ("circuits", "latency", "scheduler"):
+        total += deep_size(hass.data[CONF_DOMAIN].get(key), seen)
+    return total
+
+
+async def simulate(
+        hass: HomeAssistant,
+        *,
+        days: float,
+        entries: list[dict],
+        scan_interval: float = 30,
+        failures: dict | None = None,
+        server_options: dict | None = None,
+        entities: dict[str, bool] | None = None,
+) -> Report:
+    """Run ``entries`` (options of each config entry) for ``days`` of virtual time and report.
+
+    ``entities`` enables or disables entities of every entry, by the key that
+    ends their unique ID (``main``, ``outstanding``...).
+    """
+    clock = SimulatedClock()
+    hass.data.setdefault(CONF_DOMAIN, {})["clock"] = clock
+    server = FakeCLP(now=lambda: clock.now(HKT), **(server_options or {}))
+    await server.start()
+    for endpoint, failure in (failures or {}).items():
+        server.fail(endpoint, **failure)
+
+    config_entries = []
+    try:
+        for index, options in enumerate(entries):
+            # Polled by the simulation, on the simulated clock
+            entry = mock_entry(server, title=f"CLP {index}" if index else "CLP", pref_disable_polling=True, **options)
+            entry.add_to_hass(hass)
+            registry = er.async_get(hass)
+            for key, enabled in (entities or {}).items():
+                registry.async_get_or_create(
+                    "sensor", CONF_DOMAIN, f"clphk_{entry.entry_id}_{key}", config_entry=entry,
+                    disabled_by=None if enabled else er.RegistryEntryDisabler.USER,
+                )
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            config_entries.append(entry)
+
+        simulation = Simulation(hass, server, clock, scan_interval)
+        await simulation.settle()
+
+        # Debug mode, on under the test fixtures, records a traceback for every callback
+        loop = asyncio.get_running_loop()
+        debug = loop.get_debug()
+        loop.set_debug(False)
+        tracemalloc.start()
+        started = time.monotonic()
+        series, traced = [], []
+
+        def on_day():
+            series.append(series_bytes(hass))
+            traced.append(tracemalloc.get_traced_memory()[0])
+
+        try:
+            await simulation.run(days * 86400, on_day)
+        finally:
+            seconds = time.monotonic() - started
+            tracemalloc.stop()
+            loop.set_debug(debug)
+
+        states = hass.data[CONF_DOMAIN]["entries"].values()
+        errors = Counter()
+        for entry_state in states:
+            for endpoint, kinds in entry_state["metrics"].errors.items():
+                errors.update({f"{endpoint}:{kind}": count for kind, count in kinds.items()})
+            for endpoint, statuses in entry_state["metrics"].statuses.items():
+                errors.update({f"{endpoint}:{status}": count for status, count in statuses.items() if status >= 400})
+        report = Report(
+            days=days,
+            seconds=seconds,
+            requests=Counter(server.requests),
+            modes=Counter(server.modes),
+            retries=sum(state["metrics"].retries_scheduled for state in states),
+            token_refreshes=sum(state["metrics"].token_refreshes for state in states),
+            backfilled_days=sum(state["metrics"].backfilled_days for state in states),
+            errors=dict(errors),
+            polls=simulation.polls,
+            series_bytes=series,
+            traced_bytes=traced,
+        )
+    finally:
+        for entry in config_entries:
+            await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+        await server.close()
+    return report
@@ -0,0 +1,158 @@
+"""Set up and unload of the CLPHK integration against the fake CLP API."""
+import asyncio
+import gc
+import logging
+import tracemalloc
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.clphk.const import CONF_DOMAIN
+from custom_components.clphk.sensor import CLPData, CLPSensor
+from custom_components.clphk.tasks import BackgroundTasks
+
+from .conftest import mock_entry
+from .fake_clp import ACCOUNT_DETAIL, ACCOUNT_NUMBER, CONSUMPTION_HISTORY, FakeCLP
+
+RELOADS = 200
+
+
+def _held() -> int:
+    """Bytes allocated by the integration's own code and still held."""
+    snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, "*/custom_components/clphk/*")])
+    return sum(stat.size for stat in snapshot.statistics("filename"))
+
+
+def _drop_captured_records() -> set[type]:
+    """Return the exception types logged so far, and drop the records pytest captured.
+
+    The records hold on to the tracebacks, and through them to the sensors.
+    """
+    errors = set()
+    for handler in logging.getLogger().handlers:
+        if hasattr(handler, "records"):
+            errors.update(record.exc_info[0] for record in handler.records if record.exc_info)
+            handler.reset()
+    return errors
+
+
+def _listeners(hass: HomeAssistant) -> dict[str, int]:
+    # Pending registry writes listen for the final write and come and go
+    return {event: count for event, count in hass.bus.async_listeners().items() if event != "homeassistant_final_write"}
+
+
+async def test_setup_fetches_and_unloads(hass: HomeAssistant, fake_clp: FakeCLP):
+    entry = mock_entry(fake_clp, get_account=True, get_hourly=True)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    state = hass.states.get("sensor.clp")
+    assert state is not None
+    assert state.attributes["state_data_type"] == "HOURLY"
+    assert float(state.state) > 0
+    assert fake_clp.requests[ACCOUNT_DETAIL] == 1
+    assert fake_clp.requests[CONSUMPTION_HISTORY] >= 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert entry.state is ConfigEntryState.NOT_LOADED
+    assert CONF_DOMAIN not in hass.data or not hass.data[CONF_DOMAIN].get("entries")
+
+
+async def test_unique_ids_are_migrated_to_the_entry_id(hass: HomeAssistant, fake_clp: FakeCLP):
+    entry = mock_entry(fake_clp, renewable_energy_sensor_enable=True)
+    entry.add_to_hass(hass)
+    registry = er.async_get(hass)
+    main = registry.async_get_or_create("sensor", CONF_DOMAIN, "clphk_main_clp", config_entry=entry, suggested_object_id="clp")
+    renewable = registry.async_get_or_create(
+        "sensor", CONF_DOMAIN, "clphk_renewable_energy_clp_renewable_energy", config_entry=entry,
+        suggested_object_id="clp_renewable_energy",
+    )
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert entry.minor_version == 2
+    assert registry.async_get(main.entity_id).unique_id == f"clphk_{entry.entry_id}_main"
+    assert registry.async_get(renewable.entity_id).unique_id == f"clphk_{entry.entry_id}_renewable_energy"
+    assert hass.states.get(main.entity_id) is not None
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_entries_with_the_same_name_and_account(hass: HomeAssistant, fake_clp: FakeCLP):
+    first = mock_entry(fake_clp, get_hourly=True, rate_limit=30)
+    second = mock_entry(fake_clp, get_hourly=True, rate_limit=12, rate_burst=4)
+    for entry in (first, second):
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    registry = er.async_get(hass)
+    ids = {entry.entry_id: er.async_entries_for_config_entry(registry, entry.entry_id) for entry in (first, second)}
+    assert all(any(e.unique_id == f"clphk_{entry_id}_main" for e in entities) for entry_id, entities in ids.items())
+
+    # The strictest limits apply to both entries, until the entry asking for them goes
+    scheduler = hass.data[CONF_DOMAIN]["scheduler"]
+    assert (scheduler.rate * 60, scheduler.burst) == (12, 4)
+
+    # Both entries write the hourly series of the same account through one archive
+    entries = hass.data[CONF_DOMAIN]["entries"]
+    first_archives = entries[first.entry_id]["archives"]
+    second_archives = entries[second.entry_id]["archives"]
+    key = (ACCOUNT_NUMBER, "hourly")
+    assert first_archives[key] is second_archives[key]
+    archive = first_archives[key]
+
+    assert await hass.config_entries.async_unload(second.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert (scheduler.rate * 60, scheduler.burst) == (30, 10)
+    assert hass.data[CONF_DOMAIN]["archives"][archive.path] is archive
+    assert archive._file is not None
+
+    assert await hass.config_entries.async_unload(first.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert archive._file is None
+
+
+async def test_reloads_leave_nothing_behind(hass: HomeAssistant, fake_clp: FakeCLP):
+    # Half the reads fail, so retries are pending or running when the entry goes
+    fake_clp.fail(CONSUMPTION_HISTORY, 500, rate=0.5)
+    entry = mock_entry(fake_clp, get_account=True, get_hourly=True, retry_delay=1, rate_limit=6000, rate_burst=1000)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    loop = asyncio.get_running_loop()
+    debug = loop.get_debug()
+    loop.set_debug(False)
+    errors = set()
+    tracemalloc.start()
+    try:
+        for reload in range(RELOADS):
+            # Let the first update of the entry get going before it is unloaded again
+            await asyncio.sleep(0.002 * (reload % 3))
+            assert await hass.config_entries.async_reload(entry.entry_id)
+            errors.update(_drop_captured_records())
+            if reload == RELOADS // 10:
+                await hass.async_block_till_done(wait_background_tasks=True)
+                gc.collect()
+                baseline = _held()
+                listeners = _listeners(hass)
+        await hass.async_block_till_done(wait_background_tasks=True)
+        errors.update(_drop_captured_records())
+        gc.collect()
+        grown = _held() - baseline
+    finally:
+        tracemalloc.stop()
+        loop.set_debug(debug)
+
+    assert KeyError not in errors
+    assert _listeners(hass) == listeners
+    assert sum(isinstance(value, (CLPData, CLPSensor, BackgroundTasks)) for value in gc.get_objects()) == 3
+    assert grown < 64 * 1024, f"{grown} bytes held by the integration after {RELOADS} reloads"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert CONF_DOMAIN not in hass.data
+    assert not [task for task in asyncio.all_tasks() if task.get_name().startswith(CONF_DOMAIN) and not task.done()]
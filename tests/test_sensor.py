@@ -0,0 +1,100 @@
+"""Update cycles of the CLP sensors against the fake CLP API."""
+import asyncio
+import logging
+
+import pytest
+from homeassistant.const import STATE_UNKNOWN
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.clphk.const import CONF_DOMAIN
+
+from .benchmarks.common import make_due
+from .conftest import mock_entry
+from .fake_clp import ACCOUNT_NUMBER, CONSUMPTION_HISTORY, CONSUMPTION_INFO, FakeCLP
+
+
+async def _setup(hass: HomeAssistant, fake_clp: FakeCLP, entities: dict[str, bool] | None = None, **options):
+    entry = mock_entry(fake_clp, **options)
+    entry.add_to_hass(hass)
+    registry = er.async_get(hass)
+    for key, enabled in (entities or {}).items():
+        registry.async_get_or_create(
+            "sensor", CONF_DOMAIN, f"clphk_{entry.entry_id}_{key}", config_entry=entry,
+            disabled_by=None if enabled else er.RegistryEntryDisabler.USER,
+        )
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    return entry, hass.data[CONF_DOMAIN]["entries"][entry.entry_id]["data"][0]
+
+
+async def test_held_off_hours_are_kept(hass: HomeAssistant, fake_clp: FakeCLP):
+    entry, sensor = await _setup(hass, fake_clp, get_hourly=True)
+    hourly = sensor.data("hourly")
+    assert hourly
+
+    day = sensor._hourly_tracker.data_day(sensor._now())
+    sensor._negative_cache.record(("hourly", day.strftime("%Y%m%d")), sensor._now())
+    fake_clp.reset_counters()
+    await sensor.main_get_hourly()
+    assert fake_clp.requests[CONSUMPTION_HISTORY] == 0
+    assert sensor.data("hourly") == hourly
+    assert hass.states.get("sensor.clp").attributes["hourly"]
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+
+@pytest.mark.parametrize("status", [200, 400])
+async def test_logged_responses_are_redacted(hass: HomeAssistant, fake_clp: FakeCLP, caplog, status: int):
+    # An answer without data, or an error, echoing the CA number sent in the query
+    fake_clp.fail(CONSUMPTION_INFO, status, count=1, body={"code": status, "caNo": ACCOUNT_NUMBER})
+    caplog.set_level(logging.DEBUG, logger="custom_components.clphk")
+    entry, _ = await _setup(hass, fake_clp, get_estimation=True)
+
+    responses = [record for record in caplog.records if "consumption/info" in record.getMessage() and record.levelno >= logging.ERROR]
+    assert len(responses) == 1
+    assert ACCOUNT_NUMBER not in caplog.text
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+
+async def test_immediate_updates_wait_for_the_cycle_in_flight(hass: HomeAssistant, fake_clp: FakeCLP):
+    entry, sensor = await _setup(hass, fake_clp, get_account=True, get_hourly=True)
+    fake_clp.latency = 0.01
+    running = peak = 0
+    cycle = sensor._async_update_cycle
+
+    async def counted():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            make_due(sensor)
+            await cycle()
+        finally:
+            running -= 1
+
+    sensor._async_update_cycle = counted
+    sensor._last_update = None
+    # A scheduled poll, an auth change and a profile_update call at once
+    await asyncio.gather(sensor.async_update(), sensor.async_update_now(), sensor.async_update_now())
+    assert peak == 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+
+async def test_data_entities_get_data_without_the_main_sensor(hass: HomeAssistant, fake_clp: FakeCLP):
+    entry, _ = await _setup(hass, fake_clp, entities={"main": False, "latest_hour": True})
+
+    assert hass.states.get("sensor.clp") is None
+    registry = er.async_get(hass)
+    entity_id = registry.async_get_entity_id("sensor", CONF_DOMAIN, f"clphk_{entry.entry_id}_latest_hour")
+    # Fetched when the entity is added, not at the first poll 5 minutes later
+    assert hass.states.get(entity_id).state not in (STATE_UNKNOWN, None)
+    assert fake_clp.requests[CONSUMPTION_HISTORY] == 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
@@ -0,0 +1,43 @@
+"""Services of the CLPHK integration against the fake CLP API."""
+import datetime
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.clphk.const import CONF_DOMAIN
+from custom_components.clphk.clock import HKT
+from custom_components.clphk.services import FETCH_MISSING_MAX_DAYS, SERVICE_EXPORT_HISTORY
+
+from .conftest import mock_entry
+from .fake_clp import CONSUMPTION_HISTORY, FakeCLP
+
+
+async def _export(hass: HomeAssistant, **data) -> dict:
+    response = await hass.services.async_call(
+        CONF_DOMAIN, SERVICE_EXPORT_HISTORY, data, blocking=True, return_response=True
+    )
+    return response["results"][0]
+
+
+async def test_export_fetches_missing_days_only_when_asked(hass: HomeAssistant, fake_clp: FakeCLP):
+    entry = mock_entry(fake_clp, get_hourly=True, rate_burst=60)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    start = datetime.datetime.now(HKT).date() - datetime.timedelta(days=60)
+
+    fake_clp.reset_counters()
+    result = await _export(hass, start=start)
+    assert fake_clp.requests[CONSUMPTION_HISTORY] == 0
+    assert result["fetched_days"] == 0
+
+    # A refused fetch fails its days without logging the entry out
+    fake_clp.fail(CONSUMPTION_HISTORY, 400, rate=1.0, body={"code": 400})
+    result = await _export(hass, start=start, fetch_missing=True)
+    assert result["failed_days"] == FETCH_MISSING_MAX_DAYS
+    assert result["skipped_days"] > 0
+    entry_state = hass.data[CONF_DOMAIN]["entries"][entry.entry_id]
+    assert entry_state["access_token"]
+    assert entry_state["refresh_token"]
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
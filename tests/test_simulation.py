@@ -0,0 +1,82 @@
+"""Long running behaviour of the integration, on the simulated clock."""
+import datetime
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.clphk.clock import HKT
+from custom_components.clphk.sensor import get_dates
+
+from .fake_clp import ACCOUNT_DETAIL, CONSUMPTION_HISTORY, REFRESH_TOKEN
+from .simulation import simulate
+
+ALL_MAIN = {
+    "get_account": True,
+    "get_bill": True,
+    "get_estimation": True,
+    "get_bimonthly": True,
+    "get_daily": True,
+    "get_hourly": True,
+}
+
+
+async def test_a_week_of_polling(hass: HomeAssistant, socket_enabled):
+    report = await simulate(hass, days=7, entries=[ALL_MAIN])
+    per_day = report.per_day(report.requests + report.modes)
+    # Below one request per 5 minute throttle window
+    assert 24 <= per_day[f"{CONSUMPTION_HISTORY}:Hourly"] < 288
+    assert per_day[f"{CONSUMPTION_HISTORY}:Daily"] < 12
+    assert per_day[f"{CONSUMPTION_HISTORY}:Bill"] <= 2
+    # Access tokens live a day on the fake API
+    assert 6 <= report.requests[REFRESH_TOKEN] <= 8
+    assert report.requests[ACCOUNT_DETAIL] >= 1
+    assert report.retries == 0
+    # The series kept in memory are bounded, not growing with every day
+    assert report.series_bytes[-1] < 1.5 * report.series_bytes[1]
+
+
+async def test_failures_are_retried(hass: HomeAssistant, socket_enabled):
+    report = await simulate(
+        hass,
+        days=3,
+        entries=[ALL_MAIN],
+        failures={CONSUMPTION_HISTORY: {"status": 500, "rate": 0.2}},
+    )
+    assert report.retries > 0
+    assert report.errors[f"{CONSUMPTION_HISTORY}:500"] > 0
+
+
+async def test_sensors_of_an_entry_share_one_refresh(hass: HomeAssistant, socket_enabled):
+    # Both sensors find the token expired at once; CLP only accepts a refresh token once
+    report = await simulate(
+        hass,
+        days=3,
+        entries=[{**ALL_MAIN, "renewable_energy_sensor_enable": True, "renewable_energy_sensor_get_hourly": True}],
+    )
+    assert report.requests[REFRESH_TOKEN] == report.token_refreshes == 3
+    assert not any(key.startswith(REFRESH_TOKEN) for key in report.errors)
+    assert report.retries == 0
+
+
+async def test_data_entities_without_the_main_sensor(hass: HomeAssistant, socket_enabled):
+    # Nothing polls the data entities; their data polls by itself while the main sensor is disabled
+    report = await simulate(
+        hass,
+        days=3,
+        entries=[{}],
+        entities={"main": False, "outstanding": True, "latest_hour": True},
+    )
+    per_day = report.per_day(report.requests + report.modes)
+    assert per_day[f"{CONSUMPTION_HISTORY}:Hourly"] >= 24
+    # The outstanding amount is fetched again every daily_interval (12 hours)
+    assert 1.5 <= per_day[ACCOUNT_DETAIL] <= 3
+    assert report.polls == 0
+    assert report.retries == 0
+
+
+def test_dates_at_month_ends():
+    # 30 April is 28 February a year and two months before, with no 30th
+    day = datetime.datetime(2023, 1, 1, tzinfo=HKT)
+    while day.year == 2023:
+        earlier = get_dates(HKT, day)["one_year_two_months_ago"]
+        assert (day.year - earlier.year) * 12 + day.month - earlier.month == 14
+        day += datetime.timedelta(days=1)
@@ -0,0 +1,56 @@
+"""Record and replay of CLP traffic, and redaction of logged payloads."""
+import gzip
+import json
+import zlib
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from custom_components.clphk import request_otp, verify_otp
+from custom_components.clphk.const import API_PATH_ACCOUNT_DETAIL
+from custom_components.clphk.transport import REDACTED, Payload, RecordingSession, ReplaySession
+
+from .fake_clp import FakeCLP
+
+
+def _members(path) -> int:
+    data = open(path, "rb").read()
+    members = 0
+    while data:
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        decompressor.decompress(data)
+        data = decompressor.unused_data
+        members += 1
+    return members
+
+
+async def test_record_then_replay_otp_login(hass: HomeAssistant, fake_clp: FakeCLP, tmp_path):
+    path = str(tmp_path / "traffic.jsonl.gz")
+    recording = RecordingSession(hass, async_get_clientsession(hass), path)
+
+    await request_otp(recording, "user@example.com", base_url=fake_clp.base_url)
+    tokens = await verify_otp(recording, "user@example.com", fake_clp.otp, base_url=fake_clp.base_url)
+    for _ in range(20):
+        response = await recording.request(
+            "GET", fake_clp.base_url + API_PATH_ACCOUNT_DETAIL, headers={"Authorization": tokens["access_token"]}
+        )
+        assert response.status == 200
+    await recording.async_close()
+
+    assert _members(path) == 1
+    with gzip.open(path, "rt") as archive:
+        paths = [json.loads(line)["p"] for line in archive]
+    assert len(paths) == 22
+    assert paths[0].endswith("eligibilityCheckAndLogin")
+    assert paths[1].endswith("otpverify")
+
+    replay = await hass.async_add_executor_job(ReplaySession.load, path)
+    replayed = await verify_otp(replay, "user@example.com", fake_clp.otp, base_url="https://api.clp.com.hk")
+    # Tokens are redacted in the recording
+    assert set(replayed) == set(tokens)
+
+
+def test_payload_redacts_raw_bodies():
+    for body in ('{"caNo":"123","kwh":1}', b'{"caNo":"123","kwh":1}'):
+        assert str(Payload(body)) == f'{{"caNo":"{REDACTED}","kwh":1}}'
+    assert str(Payload(b"<html>busy</html>")) == "<html>busy</html>"